@@ -0,0 +1,165 @@
+import logging
+import pickle
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.core.cache import caches
+from django.db import connections, transaction
+from django.utils.encoding import force_str
+
+from rest_framework_extensions.bulk_operations.limits import bulk_semaphore
+from rest_framework_extensions.bulk_operations.signals import send_post_bulk_change_on_commit
+from rest_framework_extensions.settings import extensions_api_settings
+
+logger = logging.getLogger('rest_framework_extensions.bulk_operations')
+
+PENDING = 'pending'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+
+class BulkJobStore:
+    """
+    Keeps status and progress of bulk operation jobs in the cache, so they could be
+    polled from any process.
+    """
+    key_prefix = 'rest_framework_extensions.bulk_jobs'
+
+    def __init__(self, cache=None):
+        self._cache = cache
+
+    def get_cache(self):
+        return caches[self._cache or extensions_api_settings.DEFAULT_BULK_JOB_CACHE]
+
+    def get_key(self, job_id):
+        return '{0}.{1}'.format(self.key_prefix, job_id)
+
+    def create(self, operation, user_id=None):
+        job = {
+            'id': uuid.uuid4().hex,
+            'operation': operation,
+            'status': PENDING,
+            'processed': 0,
+            'result': None,
+            'error': None,
+            'user_id': user_id,
+        }
+        self.set(job)
+        return job
+
+    def get(self, job_id):
+        return self.get_cache().get(self.get_key(job_id))
+
+    def set(self, job):
+        self.get_cache().set(self.get_key(job['id']), job, extensions_api_settings.DEFAULT_BULK_JOB_TIMEOUT)
+
+    def update(self, job_id, **fields):
+        # jobs are changed only by the worker running them, so read-modify-write is safe
+        job = self.get(job_id) or {'id': job_id}
+        job.update(fields)
+        self.set(job)
+        return job
+
+
+bulk_job_store = BulkJobStore()
+
+
+def get_pk_batches(queryset, batch_size):
+    """
+    Walks primary keys in order, every batch starts after the last key of the previous one.
+    """
+    pks_queryset = queryset.order_by('pk').values_list('pk', flat=True)
+    pks = list(pks_queryset[:batch_size])
+    while pks:
+        yield pks
+        if len(pks) < batch_size:
+            return
+        pks = list(pks_queryset.filter(pk__gt=pks[-1])[:batch_size])
+
+
+def get_job_spec(queryset, operation, batch_size, values=None, semaphore_slot=None):
+    """
+    Picklable description of the job: the query is pickled without evaluation.
+    `semaphore_slot` of the bulk semaphore is held until the job is finished.
+    """
+    return {
+        'model': queryset.model._meta.label,
+        'using': queryset.db,
+        'query': pickle.dumps(queryset.query),
+        'operation': operation,
+        'batch_size': batch_size,
+        'values': values,
+        'semaphore_slot': semaphore_slot,
+    }
+
+
+def run_bulk_job(job_id, spec):
+    """
+    Runs `update` or `delete` job in batches of primary keys, every batch is committed
+    separately and the progress is saved to the job store after it.
+    """
+    model = apps.get_model(spec['model'])
+    queryset = model._default_manager.db_manager(spec['using']).all()
+    queryset.query = pickle.loads(spec['query'])
+    bulk_job_store.update(job_id, status=RUNNING)
+    processed, deleted = 0, {}
+    try:
+        for pks in get_pk_batches(queryset, spec['batch_size']):
+            with transaction.atomic(using=spec['using']):
+                batch_queryset = queryset.filter(pk__in=pks)
+                if spec['operation'] == 'delete':
+                    for label, count in batch_queryset.delete()[1].items():
+                        if count:
+                            deleted[label] = deleted.get(label, 0) + count
+                else:
+                    batch_queryset.update(**spec['values'])
+                send_post_bulk_change_on_commit(model, pks, spec['operation'], spec['using'])
+            processed += len(pks)
+            bulk_job_store.update(job_id, processed=processed)
+    except Exception as e:
+        logger.exception('Bulk job %s failed', job_id)
+        bulk_job_store.update(job_id, status=FAILED, error=force_str(e))
+        return
+    finally:
+        if spec.get('semaphore_slot'):
+            bulk_semaphore.release(spec['semaphore_slot'])
+    if spec['operation'] == 'delete':
+        result = {'deleted': sum(deleted.values()), 'deleted_by_model': deleted}
+    else:
+        result = {'updated': processed}
+    bulk_job_store.update(job_id, status=SUCCEEDED, result=result)
+
+
+_thread_pool = None
+_thread_pool_lock = threading.Lock()
+
+
+def thread_pool_executor(func, *args):
+    """
+    Default executor, runs jobs in a thread pool of the current process.
+    """
+    global _thread_pool
+    with _thread_pool_lock:
+        if _thread_pool is None:
+            _thread_pool = ThreadPoolExecutor(
+                max_workers=extensions_api_settings.DEFAULT_BULK_JOB_MAX_WORKERS,
+                thread_name_prefix='bulk_job'
+            )
+    _thread_pool.submit(_run_in_thread, func, *args)
+
+
+def _run_in_thread(func, *args):
+    try:
+        func(*args)
+    finally:
+        connections.close_all()
+
+
+def immediate_executor(func, *args):
+    """
+    Runs jobs in the request, useful for tests and development.
+    """
+    func(*args)
@@ -0,0 +1,46 @@
+import uuid
+
+from django.core.cache import caches
+
+from rest_framework_extensions.settings import extensions_api_settings
+
+
+class BulkOperationSemaphore:
+    """
+    Limits the number of bulk operations running at once for every client with
+    slots in the cache: an operation takes the first free slot with `cache.add`.
+    Slots expire after `DEFAULT_BULK_CONCURRENCY_TIMEOUT`, so slots of crashed
+    processes don't block the client forever.
+    """
+    key_prefix = 'rest_framework_extensions.bulk_semaphore'
+
+    def __init__(self, cache=None):
+        self._cache = cache
+
+    def get_cache(self):
+        return caches[self._cache or extensions_api_settings.DEFAULT_BULK_CONCURRENCY_CACHE]
+
+    def get_key(self, ident, slot):
+        return '{0}.{1}.{2}'.format(self.key_prefix, ident, slot)
+
+    def acquire(self, ident, limit):
+        """
+        Returns the taken slot or None, if all `limit` slots are taken.
+        """
+        cache = self.get_cache()
+        token = uuid.uuid4().hex
+        for slot in range(limit):
+            key = self.get_key(ident, slot)
+            if cache.add(key, token, extensions_api_settings.DEFAULT_BULK_CONCURRENCY_TIMEOUT):
+                return key, token
+        return None
+
+    def release(self, slot):
+        key, token = slot
+        cache = self.get_cache()
+        # the slot could expire and be taken by another operation
+        if cache.get(key) == token:
+            cache.delete(key)
+
+
+bulk_semaphore = BulkOperationSemaphore()
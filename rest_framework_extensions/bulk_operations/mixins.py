@@ -1,12 +1,50 @@
+import operator
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from functools import reduce
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+from django.urls import NoReverseMatch
 from django.utils.encoding import force_str
 
 from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
+from rest_framework.throttling import BaseThrottle
+from rest_framework.validators import UniqueValidator, UniqueTogetherValidator
+from rest_framework_extensions.bulk_operations.jobs import (
+    bulk_job_store, get_job_spec, get_pk_batches, run_bulk_job
+)
+from rest_framework_extensions.bulk_operations.limits import bulk_semaphore
+from rest_framework_extensions.bulk_operations.parsers import StreamedItems
+from rest_framework_extensions.bulk_operations.signals import post_bulk_change, send_post_bulk_change_on_commit
+from rest_framework_extensions.etag.decorators import (
+    ETag, ANY_ETAG, PRECONDITION_EXCEPTIONS, parse_etags,
+    get_precondition_failure_response, raise_precondition_failed, raise_precondition_required
+)
+from rest_framework_extensions.exceptions import BulkOperationThrottledException, BulkOperationTooLargeException
 from rest_framework_extensions.settings import extensions_api_settings
 from rest_framework_extensions import utils
 
 
 class BulkOperationBaseMixin:
+    # list ETag function, e.g. 'api_list_etag_func' of APIListETAGMixin.
+    # If defined, bulk operations require matching If-Match header
+    bulk_etag_func = None
+    # None means DEFAULT_BULK_OPERATION_REPORT setting
+    bulk_operation_report = None
+    # None means DEFAULT_BULK_MAX_ROWS setting
+    bulk_max_rows = None
+    # None means DEFAULT_BULK_MAX_ITEMS setting
+    bulk_max_items = None
+    # None means DEFAULT_BULK_MAX_CONCURRENT_OPERATIONS setting
+    bulk_max_concurrent_operations = None
+    _bulk_semaphore_slot = None
+
     def is_object_operation(self):
         return bool(self.get_object_lookup_value())
 
@@ -25,25 +63,382 @@ class BulkOperationBaseMixin:
         else:
             return True, {}
 
+    def is_bulk_payload(self, data):
+        return isinstance(data, (list, StreamedItems))
+
+    def get_bulk_payload_batches(self, data, batch_size):
+        """
+        The whole list at once or batches of items streamed by `StreamingJSONParser` or `NDJSONParser`.
+        """
+        if isinstance(data, StreamedItems) and batch_size:
+            return self.get_limited_bulk_payload_batches(data.batches(batch_size))
+        data = list(data)
+        self.check_bulk_items_limit(len(data))
+        return [data]
+
+    def get_limited_bulk_payload_batches(self, batches):
+        count = 0
+        for batch in batches:
+            count += len(batch)
+            self.check_bulk_items_limit(count)
+            yield batch
+
+    def get_bulk_payload_errors(self, data, errors, offset):
+        """
+        Errors of every item for lists, only errors of invalid items with their indexes
+        for streamed items, which are not kept in memory.
+        """
+        if isinstance(data, StreamedItems):
+            return [{'index': offset + i, 'errors': error} for i, error in enumerate(errors) if error]
+        return errors
+
+    def get_bulk_max_rows(self):
+        if self.bulk_max_rows is None:
+            return extensions_api_settings.DEFAULT_BULK_MAX_ROWS
+        return self.bulk_max_rows
+
+    def get_bulk_max_items(self):
+        if self.bulk_max_items is None:
+            return extensions_api_settings.DEFAULT_BULK_MAX_ITEMS
+        return self.bulk_max_items
+
+    def get_bulk_max_concurrent_operations(self):
+        if self.bulk_max_concurrent_operations is None:
+            return extensions_api_settings.DEFAULT_BULK_MAX_CONCURRENT_OPERATIONS
+        return self.bulk_max_concurrent_operations
+
+    def check_bulk_rows_limit(self, queryset):
+        """
+        Counts at most `max_rows + 1` objects, so the check is cheap for a table of any size.
+        """
+        max_rows = self.get_bulk_max_rows()
+        if max_rows is not None and queryset[:max_rows + 1].count() > max_rows:
+            raise BulkOperationTooLargeException(
+                detail='Bulk operation affects more than {0} objects. '
+                       'Narrow down the filters or split the operation into several requests.'.format(max_rows)
+            )
+
+    def check_bulk_items_limit(self, count):
+        max_items = self.get_bulk_max_items()
+        if max_items is not None and count > max_items:
+            raise BulkOperationTooLargeException(
+                detail='Bulk operation payload has more than {0} items. '
+                       'Split it into several requests.'.format(max_items)
+            )
+
+    @contextmanager
+    def bulk_operation_slot(self, request):
+        """
+        Holds a slot of the client in the bulk semaphore while the operation is running.
+        """
+        limit = self.get_bulk_max_concurrent_operations()
+        if not limit:
+            yield
+            return
+        slot = bulk_semaphore.acquire(self.get_bulk_operation_ident(request), limit)
+        if slot is None:
+            raise BulkOperationThrottledException(
+                detail='Too many bulk operations are running, the limit is {0} per client. '
+                       'Try again after they finish.'.format(limit)
+            )
+        self._bulk_semaphore_slot = slot
+        try:
+            yield
+        finally:
+            # background jobs take the slot over and release it when finished
+            if self._bulk_semaphore_slot is not None:
+                bulk_semaphore.release(self._bulk_semaphore_slot)
+            self._bulk_semaphore_slot = None
+
+    def get_bulk_operation_ident(self, request):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return 'user.{0}'.format(user.pk)
+        return 'ident.{0}'.format(BaseThrottle().get_ident(request))
+
+    def is_bulk_operation_report_on(self):
+        if self.bulk_operation_report is None:
+            return extensions_api_settings.DEFAULT_BULK_OPERATION_REPORT
+        return self.bulk_operation_report
+
+    def report_bulk_operation(self, operation, rows, started_at, data):
+        """
+        Sends number of affected rows and duration of the operation to the metrics hook and
+        adds the duration to the response data, if the report is on. Returns whether it's on.
+        """
+        duration = time.perf_counter() - started_at
+        tags = {'operation': operation, 'view': self.__class__.__name__}
+        utils.send_metric('bulk_operation_rows', rows, **tags)
+        utils.send_metric('bulk_operation_duration', duration, **tags)
+        if self.is_bulk_operation_report_on():
+            data['duration'] = round(duration, 6)
+            return True
+        return False
+
+    def get_bulk_change_pks(self, queryset):
+        """
+        Primary keys of objects, which are going to be changed by the write of the queryset.
+        Queried only if `post_bulk_change` has receivers for the model.
+        """
+        if not post_bulk_change.has_listeners(queryset.model):
+            return []
+        return list(queryset.values_list('pk', flat=True))
+
+    def send_bulk_change(self, model, pks, operation, using):
+        send_post_bulk_change_on_commit(model, pks, operation, using)
+
+    def get_bulk_etag_func(self):
+        if isinstance(self.bulk_etag_func, str):
+            return getattr(self, self.bulk_etag_func)
+        return self.bulk_etag_func
+
+    def check_bulk_preconditions(self, request, queryset):
+        """
+        Compares `If-Match` header with the ETag the list (with the same filters) would have
+        for `GET`. Must be called inside of the transaction with the bulk operation.
+        """
+        bulk_etag_func = self.get_bulk_etag_func()
+        if bulk_etag_func is None:
+            return
+        if_match = request.META.get(utils.prepare_header_name('if-match'))
+        if not if_match:
+            raise_precondition_required(request, 'If-Match')
+        etags = parse_etags(if_match)
+        if ANY_ETAG in etags:
+            return
+        if transaction.get_connection(queryset.db).features.has_select_for_update:
+            # lock the rows, so they can't be changed between the check and the write
+            list(queryset.select_for_update().values_list('pk', flat=True))
+        res_etag = bulk_etag_func(
+            view_instance=self,
+            view_method=getattr(self, 'list', None) or getattr(self, request.method.lower()),
+            request=request,
+            args=self.args,
+            kwargs=self.kwargs,
+        )
+        # the list without an ETag can't match any
+        if res_etag is None or ETag(res_etag.strip('"'), False) not in etags:
+            raise_precondition_failed(request)
+
+    def run_bulk_operation(self, request, operation, *args, **kwargs):
+        """
+        Runs the bulk operation method holding a semaphore slot of the client,
+        precondition failures are returned as responses logged only once.
+        """
+        with self.bulk_operation_slot(request):
+            try:
+                return operation(request, *args, **kwargs)
+            except PRECONDITION_EXCEPTIONS as exc:
+                return get_precondition_failure_response(self, exc)
+
+
+class BulkJobMixin(BulkOperationBaseMixin):
+    # run bulk operations as background jobs for requests with `Prefer: respond-async` header
+    bulk_jobs = False
+    # None means DEFAULT_BULK_JOB_BATCH_SIZE setting
+    bulk_job_batch_size = None
+
+    def is_bulk_job_requested(self, request):
+        if not self.bulk_jobs:
+            return False
+        prefer = request.META.get(utils.prepare_header_name('prefer'), '')
+        return 'respond-async' in [token.split(';')[0].strip().lower() for token in prefer.split(',')]
+
+    def start_bulk_job(self, request, queryset, operation, values=None):
+        """
+        Saves the job and passes it to the executor after the current transaction is committed.
+        """
+        user = getattr(request, 'user', None)
+        job = bulk_job_store.create(
+            operation, user_id=user.pk if user is not None and user.is_authenticated else None)
+        spec = get_job_spec(queryset, operation, self.get_bulk_job_batch_size(), values,
+                            semaphore_slot=self._bulk_semaphore_slot)
+        self._bulk_semaphore_slot = None
+        executor = extensions_api_settings.DEFAULT_BULK_JOB_EXECUTOR
+        transaction.on_commit(lambda: executor(run_bulk_job, job['id'], spec), using=queryset.db)
+        data = self.get_bulk_job_data(job)
+        headers = {'Location': data['url']} if data['url'] else None
+        return Response(data, status=status.HTTP_202_ACCEPTED, headers=headers)
+
+    def get_bulk_job_data(self, job):
+        data = {key: value for key, value in job.items() if key != 'user_id'}
+        data['url'] = self.get_bulk_job_url(job['id'])
+        return data
+
+    def get_bulk_job_url(self, job_id):
+        try:
+            return self.reverse_action('bulk-job', kwargs={'job_id': job_id})
+        except (AttributeError, NoReverseMatch):
+            return None
+
+    def get_bulk_job_batch_size(self):
+        if self.bulk_job_batch_size is None:
+            return extensions_api_settings.DEFAULT_BULK_JOB_BATCH_SIZE
+        return self.bulk_job_batch_size
+
+
+class BulkJobStatusMixin(BulkJobMixin):
+    """
+    Enables bulk jobs and adds `bulk-jobs/<id>/` route for their status to the viewset.
+    """
+    bulk_jobs = True
+
+    @action(detail=False, url_path=r'bulk-jobs/(?P<job_id>[0-9a-f]{32})', url_name='bulk-job')
+    def bulk_job(self, request, job_id=None, *args, **kwargs):
+        job = bulk_job_store.get(job_id)
+        user = getattr(request, 'user', None)
+        user_id = user.pk if user is not None and user.is_authenticated else None
+        if job is None or job.get('user_id') not in (None, user_id):
+            raise NotFound()
+        return Response(self.get_bulk_job_data(job))
+
+
+class ListCreateModelMixin(BulkOperationBaseMixin):
+    # None means DEFAULT_BULK_CREATE_BATCH_SIZE setting
+    bulk_create_batch_size = None
+
+    def create(self, request, *args, **kwargs):
+        if self.is_bulk_payload(request.data):
+            return self.run_bulk_operation(request, self.create_bulk, *args, **kwargs)
+        else:
+            return super().create(request, *args, **kwargs)
+
+    def create_bulk(self, request, *args, **kwargs):
+        is_valid, errors = self.is_valid_bulk_operation()
+        if is_valid:
+            started_at = time.perf_counter()
+            queryset = self.get_queryset()
+            assert transaction.get_connection(queryset.db).features.can_return_rows_from_bulk_insert, (
+                '{0} can\'t return ids of created objects: the database doesn\'t return rows from bulk inserts, '
+                'use bulk upsert instead'.format(self.__class__.__name__)
+            )
+            batch_size = self.get_bulk_create_batch_size()
+            ids, offset = [], 0
+            with transaction.atomic(using=queryset.db):
+                for batch in self.get_bulk_payload_batches(request.data, batch_size):
+                    serializer = self.get_serializer(data=batch, many=True)
+                    if not serializer.is_valid():
+                        transaction.set_rollback(True, using=queryset.db)
+                        return Response(self.get_bulk_payload_errors(request.data, serializer.errors, offset),
+                                        status=status.HTTP_400_BAD_REQUEST)
+                    instances = self.get_bulk_create_instances(queryset.model, serializer.validated_data)
+                    self.pre_create_bulk(instances)
+                    instances = queryset.bulk_create(instances, batch_size=batch_size)
+                    self.post_create_bulk(instances)
+                    self.send_bulk_change(queryset.model, [instance.pk for instance in instances], 'create',
+                                          queryset.db)
+                    ids.extend(instance.pk for instance in instances)
+                    offset += len(batch)
+            data = {'ids': ids}
+            self.report_bulk_operation('create', len(ids), started_at, data)
+            return Response(data, status=status.HTTP_201_CREATED)
+        else:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+    def get_bulk_create_instances(self, model, validated_data):
+        """
+        Unsaved instances for `bulk_create`. Override it, if the serializer has fields which
+        are not model fields, e.g. many-to-many or nested ones.
+        """
+        return [model(**attrs) for attrs in validated_data]
+
+    def get_bulk_create_batch_size(self):
+        if self.bulk_create_batch_size is None:
+            return extensions_api_settings.DEFAULT_BULK_CREATE_BATCH_SIZE
+        return self.bulk_create_batch_size
+
+    def pre_create_bulk(self, instances):
+        """
+        Placeholder method for calling before creating instances.
+        """
+        pass
+
+    def post_create_bulk(self, instances):
+        """
+        Placeholder method for calling after creating instances.
+        """
+        pass
+
+
+class ListDestroyModelMixin(BulkJobMixin):
+    # None means DEFAULT_BULK_DELETE_BATCH_SIZE setting
+    bulk_delete_batch_size = None
+    # delete all batches in one transaction, otherwise every batch is committed separately
+    bulk_delete_atomic = True
 
-class ListDestroyModelMixin(BulkOperationBaseMixin):
     def delete(self, request, *args, **kwargs):
         if self.is_object_operation():
             return super().destroy(request, *args, **kwargs)
         else:
-            return self.destroy_bulk(request, *args, **kwargs)
+            return self.run_bulk_operation(request, self.destroy_bulk, *args, **kwargs)
 
     def destroy_bulk(self, request, *args, **kwargs):
         is_valid, errors = self.is_valid_bulk_operation()
         if is_valid:
             queryset = self.filter_queryset(self.get_queryset())
-            self.pre_delete_bulk(queryset)  # todo: test and document me
-            queryset.delete()
-            self.post_delete_bulk(queryset)  # todo: test and document me
+            self.check_bulk_rows_limit(queryset)
+            if self.is_bulk_job_requested(request):
+                with transaction.atomic(using=queryset.db):
+                    self.check_bulk_preconditions(request, queryset)
+                    return self.start_bulk_job(request, queryset, 'delete')
+            batch_size = self.get_bulk_delete_batch_size()
+            if batch_size:
+                return self.destroy_bulk_in_batches(request, queryset, batch_size)
+            started_at = time.perf_counter()
+            with transaction.atomic(using=queryset.db):
+                self.check_bulk_preconditions(request, queryset)
+                self.pre_delete_bulk(queryset)  # todo: test and document me
+                pks = self.get_bulk_change_pks(queryset)
+                deleted = queryset.delete()[1]
+                self.post_delete_bulk(queryset)  # todo: test and document me
+                self.send_bulk_change(queryset.model, pks, 'delete', queryset.db)
+            data = self.get_bulk_delete_data(deleted)
+            if self.report_bulk_operation('delete', data['deleted'], started_at, data):
+                return Response(data)
             return Response(status=status.HTTP_204_NO_CONTENT)
         else:
             return Response(errors, status=status.HTTP_400_BAD_REQUEST)
 
+    def destroy_bulk_in_batches(self, request, queryset, batch_size):
+        """
+        Deletes objects in batches of primary keys, so collected objects and locks are
+        bounded by the batch size. Responds with the number of deleted objects per model.
+        """
+        assert self.bulk_delete_atomic or self.get_bulk_etag_func() is None, (
+            '{0} can\'t check bulk_etag_func preconditions with bulk_delete_atomic = False, the lock of '
+            'the check is released before the first batch is deleted'.format(self.__class__.__name__)
+        )
+        started_at = time.perf_counter()
+        using = queryset.db
+        with transaction.atomic(using=using) if self.bulk_delete_atomic else nullcontext():
+            with transaction.atomic(using=using):
+                self.check_bulk_preconditions(request, queryset)
+            self.pre_delete_bulk(queryset)
+            deleted = Counter()
+            for pks in self.get_bulk_delete_pk_batches(queryset, batch_size):
+                with transaction.atomic(using=using):
+                    deleted.update(queryset.filter(pk__in=pks).delete()[1])
+                    self.send_bulk_change(queryset.model, pks, 'delete', using)
+            self.post_delete_bulk(queryset)
+        data = self.get_bulk_delete_data(deleted)
+        self.report_bulk_operation('delete', data['deleted'], started_at, data)
+        return Response(data)
+
+    def get_bulk_delete_data(self, deleted):
+        deleted = {label: count for label, count in deleted.items() if count}
+        return {
+            'deleted': sum(deleted.values()),
+            'deleted_by_model': deleted
+        }
+
+    def get_bulk_delete_pk_batches(self, queryset, batch_size):
+        return get_pk_batches(queryset, batch_size)
+
+    def get_bulk_delete_batch_size(self):
+        if self.bulk_delete_batch_size is None:
+            return extensions_api_settings.DEFAULT_BULK_DELETE_BATCH_SIZE
+        return self.bulk_delete_batch_size
+
     def pre_delete_bulk(self, queryset):
         """
         Placeholder method for calling before deleting an queryset.
@@ -57,34 +452,130 @@ class ListDestroyModelMixin(BulkOperationBaseMixin):
         pass
 
 
-class ListUpdateModelMixin(BulkOperationBaseMixin):
+class ListUpdateModelMixin(BulkJobMixin):
+    # unique model field identifying objects in list payloads
+    bulk_update_lookup_field = 'id'
+    # None means DEFAULT_BULK_UPDATE_BATCH_SIZE setting
+    bulk_update_batch_size = None
+
     def patch(self, request, *args, **kwargs):
         if self.is_object_operation():
             return super().partial_update(request, *args, **kwargs)
         else:
-            return self.partial_update_bulk(request, *args, **kwargs)
+            return self.run_bulk_operation(request, self.partial_update_bulk, *args, **kwargs)
 
     def partial_update_bulk(self, request, *args, **kwargs):
         is_valid, errors = self.is_valid_bulk_operation()
-        if is_valid:
+        if is_valid and self.is_bulk_payload(request.data):
+            return self.partial_update_bulk_list(request, *args, **kwargs)
+        elif is_valid:
             queryset = self.filter_queryset(self.get_queryset())
+            self.check_bulk_rows_limit(queryset)
             update_bulk_dict = self.get_update_bulk_dict(
                 serializer=self.get_serializer_class()(), data=request.data)
-            # todo: test and document me
-            self.pre_save_bulk(queryset, update_bulk_dict)
-            try:
-                queryset.update(**update_bulk_dict)
-            except ValueError as e:
-                errors = {
-                    'detail': force_str(e)
-                }
-                return Response(errors, status=status.HTTP_400_BAD_REQUEST)
-            # todo: test and document me
-            self.post_save_bulk(queryset, update_bulk_dict)
+            with transaction.atomic(using=queryset.db):
+                self.check_bulk_preconditions(request, queryset)
+                if self.is_bulk_job_requested(request):
+                    return self.start_bulk_job(request, queryset, 'update', values=update_bulk_dict)
+                started_at = time.perf_counter()
+                # todo: test and document me
+                self.pre_save_bulk(queryset, update_bulk_dict)
+                pks = self.get_bulk_change_pks(queryset)
+                try:
+                    updated = queryset.update(**update_bulk_dict)
+                except ValueError as e:
+                    errors = {
+                        'detail': force_str(e)
+                    }
+                    return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+                # todo: test and document me
+                self.post_save_bulk(queryset, update_bulk_dict)
+                self.send_bulk_change(queryset.model, pks, 'update', queryset.db)
+            data = {'updated': updated}
+            if self.report_bulk_operation('update', updated, started_at, data):
+                return Response(data)
             return Response(status=status.HTTP_204_NO_CONTENT)
         else:
             return Response(errors, status=status.HTTP_400_BAD_REQUEST)
 
+    def partial_update_bulk_list(self, request, *args, **kwargs):
+        """
+        Updates every object with its own values from the list of payloads
+        with `bulk_update_lookup_field`, e.g. `[{"id": 1, "email": "..."}, ...]`.
+        """
+        started_at = time.perf_counter()
+        queryset = self.filter_queryset(self.get_queryset())
+        batch_size = self.get_bulk_update_batch_size()
+        offset = 0
+        with transaction.atomic(using=queryset.db):
+            self.check_bulk_preconditions(request, queryset)
+            for batch in self.get_bulk_payload_batches(request.data, batch_size):
+                errors = self.update_bulk_list_batch(queryset, batch, batch_size)
+                if any(errors):
+                    transaction.set_rollback(True, using=queryset.db)
+                    return Response(self.get_bulk_payload_errors(request.data, errors, offset),
+                                    status=status.HTTP_400_BAD_REQUEST)
+                offset += len(batch)
+        data = {'updated': offset}
+        if self.report_bulk_operation('update', offset, started_at, data):
+            return Response(data)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def update_bulk_list_batch(self, queryset, batch, batch_size):
+        """
+        Validates and updates objects of the batch of payloads, returns errors of every payload.
+        """
+        lookup_field = self.bulk_update_lookup_field
+        lookup_values, errors = self.get_bulk_update_lookup_values(queryset.model, batch)
+        instances = queryset.in_bulk(
+            [value for value in lookup_values if value is not None], field_name=lookup_field)
+        serializers = []
+        for i, (data, value) in enumerate(zip(batch, lookup_values)):
+            if errors[i]:
+                continue
+            if value not in instances:
+                errors[i] = {lookup_field: ['Not found.']}
+                continue
+            serializer = self.get_serializer(instances[value], data=data, partial=True)
+            if serializer.is_valid():
+                serializers.append(serializer)
+            else:
+                errors[i] = serializer.errors
+        if any(errors):
+            return errors
+
+        fields = set()
+        for serializer in serializers:
+            for attr, value in serializer.validated_data.items():
+                setattr(serializer.instance, attr, value)
+                fields.add(attr)
+        if fields:
+            changed = [serializer.instance for serializer in serializers]
+            queryset.bulk_update(changed, fields, batch_size=batch_size)
+            self.send_bulk_change(queryset.model, [instance.pk for instance in changed], 'update', queryset.db)
+        return errors
+
+    def get_bulk_update_lookup_values(self, model, data):
+        field = model._meta.get_field(self.bulk_update_lookup_field)
+        lookup_values, errors = [], []
+        for item in data:
+            value, error = None, {}
+            if not isinstance(item, dict) or item.get(self.bulk_update_lookup_field) is None:
+                error = {self.bulk_update_lookup_field: ['This field is required.']}
+            else:
+                try:
+                    value = field.to_python(item[self.bulk_update_lookup_field])
+                except ValidationError as e:
+                    error = {self.bulk_update_lookup_field: e.messages}
+            lookup_values.append(value)
+            errors.append(error)
+        return lookup_values, errors
+
+    def get_bulk_update_batch_size(self):
+        if self.bulk_update_batch_size is None:
+            return extensions_api_settings.DEFAULT_BULK_UPDATE_BATCH_SIZE
+        return self.bulk_update_batch_size
+
     def get_update_bulk_dict(self, serializer, data):
         update_bulk_dict = {}
         for field_name, field in serializer.fields.items():
@@ -103,3 +594,169 @@ class ListUpdateModelMixin(BulkOperationBaseMixin):
         Placeholder method for calling after deleting an queryset.
         """
         pass
+
+
+class ListUpsertModelMixin(BulkOperationBaseMixin):
+    # model fields identifying objects, must be unique together
+    bulk_upsert_unique_fields = None
+    # model fields to update in existing objects, None means all fields of the payload
+    bulk_upsert_update_fields = None
+    # None means DEFAULT_BULK_CREATE_BATCH_SIZE setting
+    bulk_upsert_batch_size = None
+
+    def put(self, request, *args, **kwargs):
+        if self.is_object_operation():
+            return super().update(request, *args, **kwargs)
+        else:
+            return self.run_bulk_operation(request, self.upsert_bulk, *args, **kwargs)
+
+    def upsert_bulk(self, request, *args, **kwargs):
+        assert self.bulk_upsert_unique_fields, (
+            '{0} requires bulk_upsert_unique_fields with a list of model fields identifying objects'.format(
+                self.__class__.__name__)
+        )
+        is_valid, errors = self.is_valid_bulk_operation()
+        if not is_valid:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        data = request.data
+        if isinstance(data, StreamedItems):
+            # items are validated and deduplicated all together, so streamed ones are read
+            # into a list, counting them against the limit while they are read
+            data = [item for batch in self.get_limited_bulk_payload_batches(data.batches(1)) for item in batch]
+        elif isinstance(data, list):
+            self.check_bulk_items_limit(len(data))
+        serializer = self.get_bulk_upsert_serializer(data=data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        model = queryset.model
+        attnames = [model._meta.get_field(field).attname for field in self.bulk_upsert_unique_fields]
+        instances = [model(**attrs) for attrs in serializer.validated_data]
+        keys = [tuple(getattr(instance, attname) for attname in attnames) for instance in instances]
+        errors = [{} for instance in instances]
+        seen_keys = set()
+        for i, key in enumerate(keys):
+            if None in key:
+                errors[i] = {'non_field_errors': ['Fields {0} are required.'.format(
+                    ', '.join(self.bulk_upsert_unique_fields))]}
+            elif key in seen_keys:
+                errors[i] = {'non_field_errors': ['Duplicate item.']}
+            seen_keys.add(key)
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        started_at = time.perf_counter()
+        batch_size = self.get_bulk_upsert_batch_size()
+        with transaction.atomic(using=queryset.db):
+            self.check_bulk_preconditions(request, queryset)
+            existing_pks = self.get_bulk_upsert_existing_pks(model, queryset.db, attnames, keys, batch_size)
+            existing_instances = queryset.in_bulk(list(existing_pks.values()))
+            for i, key in enumerate(keys):
+                if key in existing_pks and existing_pks[key] not in existing_instances:
+                    # the object is out of the queryset, e.g. doesn't belong to the user
+                    errors[i] = {'non_field_errors': ['Not found.']}
+            if any(errors):
+                return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+            update_fields = self.get_bulk_upsert_update_fields(serializer.validated_data)
+            connection = transaction.get_connection(queryset.db)
+            if getattr(connection.features, 'supports_update_conflicts_with_target', False) and update_fields:
+                instances = queryset.bulk_create(
+                    instances,
+                    batch_size=batch_size,
+                    update_conflicts=True,
+                    unique_fields=self.bulk_upsert_unique_fields,
+                    update_fields=update_fields,
+                )
+            else:
+                instances = self.upsert_bulk_by_select(
+                    queryset, instances, keys, existing_pks, existing_instances, update_fields, batch_size)
+            created_keys = [key for key, instance in zip(keys, instances)
+                            if key not in existing_pks and instance.pk is None]
+            if created_keys:
+                # the backend hasn't returned primary keys of inserted rows, e.g. ON CONFLICT
+                # inserts before Django 5.0 or inserts on MySQL, so they are selected by the keys
+                created_pks = self.get_bulk_upsert_existing_pks(model, queryset.db, attnames, created_keys, batch_size)
+            else:
+                created_pks = {}
+            ids = [existing_pks.get(key, created_pks.get(key, instance.pk)) for key, instance in zip(keys, instances)]
+            self.send_bulk_change(model, ids, 'upsert', queryset.db)
+        # the response is a list of outcomes, so the report goes only to the metrics hook
+        self.report_bulk_operation('upsert', len(instances), started_at, {})
+        return Response([
+            {
+                'id': pk,
+                'status': 'updated' if key in existing_pks else 'created'
+            } for key, pk in zip(keys, ids)
+        ])
+
+    def upsert_bulk_by_select(self, queryset, instances, keys, existing_pks, existing_instances,
+                              update_fields, batch_size):
+        """
+        Fallback for databases without `INSERT ... ON CONFLICT` support: updates existing
+        objects with `bulk_update` and creates the rest with `bulk_create`.
+        """
+        updated, created = [], []
+        for i, (key, instance) in enumerate(zip(keys, instances)):
+            if key in existing_pks:
+                existing_instance = existing_instances[existing_pks[key]]
+                for field in update_fields:
+                    setattr(existing_instance, field, getattr(instance, field))
+                instances[i] = existing_instance
+                updated.append(existing_instance)
+            else:
+                created.append(instance)
+        if updated and update_fields:
+            queryset.bulk_update(updated, update_fields, batch_size=batch_size)
+        if created:
+            queryset.bulk_create(created, batch_size=batch_size)
+        return instances
+
+    def get_bulk_upsert_serializer(self, data):
+        """
+        Serializer for the whole payload. Unique validators of identifying fields are removed,
+        because existing objects are expected, and they would make a query per item.
+        """
+        serializer = self.get_serializer(data=data, many=True)
+        for field_name, field in serializer.child.fields.items():
+            if (field.source or field_name) in self.bulk_upsert_unique_fields:
+                field.validators = [
+                    validator for validator in field.validators if not isinstance(validator, UniqueValidator)
+                ]
+        serializer.child.validators = [
+            validator for validator in serializer.child.get_validators()
+            if not isinstance(validator, UniqueTogetherValidator)
+        ]
+        return serializer
+
+    def get_bulk_upsert_existing_pks(self, model, using, attnames, keys, batch_size):
+        """
+        Primary keys of all existing objects with the keys, looked up in batches.
+        """
+        existing_pks = {}
+        batch_size = batch_size or max(len(keys), 1)
+        for i in range(0, len(keys), batch_size):
+            batch = keys[i:i + batch_size]
+            if len(attnames) == 1:
+                condition = Q(**{attnames[0] + '__in': [key[0] for key in batch]})
+            else:
+                condition = reduce(operator.or_, (Q(**dict(zip(attnames, key))) for key in batch))
+            for row in model._default_manager.using(using).filter(condition).values_list('pk', *attnames):
+                existing_pks[tuple(row[1:])] = row[0]
+        return existing_pks
+
+    def get_bulk_upsert_update_fields(self, validated_data):
+        if self.bulk_upsert_update_fields is not None:
+            return list(self.bulk_upsert_update_fields)
+        update_fields = []
+        for attrs in validated_data:
+            for field in attrs:
+                if field not in update_fields and field not in self.bulk_upsert_unique_fields:
+                    update_fields.append(field)
+        return update_fields
+
+    def get_bulk_upsert_batch_size(self):
+        if self.bulk_upsert_batch_size is None:
+            return extensions_api_settings.DEFAULT_BULK_CREATE_BATCH_SIZE
+        return self.bulk_upsert_batch_size
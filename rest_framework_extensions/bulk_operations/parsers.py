@@ -0,0 +1,160 @@
+import codecs
+import json
+
+from django.conf import settings
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.utils.json import strict_constant
+
+from rest_framework_extensions.settings import extensions_api_settings
+
+
+# a number could be cut by the end of the chunk anywhere, e.g. "1." + "25" or "1e" + "5"
+NUMBER_CHARS = frozenset('0123456789+-.eE')
+
+
+class StreamedItems:
+    """
+    Items of JSON array or NDJSON request body, decoded lazily while the body is read
+    in chunks, so only one chunk and one batch of items are kept in memory.
+    Could be iterated only once.
+    """
+
+    def __init__(self, stream, decoder, buffer='', ndjson=False, strict=True, chunk_size=None):
+        self.stream = stream
+        self.decoder = decoder
+        self.buffer = buffer
+        self.ndjson = ndjson
+        self.json_decoder = json.JSONDecoder(parse_constant=strict_constant if strict else None)
+        self.chunk_size = chunk_size or extensions_api_settings.DEFAULT_BULK_STREAM_CHUNK_SIZE
+        self.eof = False
+        self.consumed = False
+
+    def __iter__(self):
+        if self.consumed:
+            raise RuntimeError('Streamed items could be iterated only once.')
+        self.consumed = True
+        try:
+            if self.ndjson:
+                yield from self._iter_lines()
+            else:
+                yield from self._iter_array()
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+    def batches(self, batch_size):
+        batch = []
+        for item in self:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _read(self):
+        chunk = self.stream.read(self.chunk_size)
+        if chunk:
+            self.buffer += self.decoder.decode(chunk)
+        else:
+            self.buffer += self.decoder.decode(b'', final=True)
+            self.eof = True
+
+    def _iter_lines(self):
+        while True:
+            lines = self.buffer.split('\n')
+            self.buffer = lines.pop()
+            for line in lines:
+                if line.strip():
+                    yield self.json_decoder.decode(line)
+            if self.eof:
+                break
+            self._read()
+        if self.buffer.strip():
+            yield self.json_decoder.decode(self.buffer)
+
+    def _iter_array(self):
+        # the opening bracket is consumed by the parser
+        pos, expect_item, is_empty = 0, True, True
+        while True:
+            pos = self._skip_whitespace(pos)
+            if pos == len(self.buffer):
+                if self.eof:
+                    raise ValueError('Unterminated array')
+                self.buffer, pos = '', 0
+                self._read()
+                continue
+            char = self.buffer[pos]
+            if char == ']' and (is_empty or not expect_item):
+                return
+            if not expect_item:
+                if char != ',':
+                    raise ValueError('Expecting \',\' delimiter')
+                expect_item = True
+                pos += 1
+                continue
+            try:
+                item, end = self.json_decoder.raw_decode(self.buffer, pos)
+            except ValueError:
+                if self.eof:
+                    raise
+                end = None
+            # the item could be cut by the end of the chunk, e.g. a number
+            if end is None or (not self.eof and self._is_number_cut(end)):
+                self.buffer, pos = self.buffer[pos:], 0
+                self._read()
+                continue
+            yield item
+            pos, expect_item, is_empty = end, False, False
+
+    def _is_number_cut(self, end):
+        # a number decoded up to the cut is followed only by number characters
+        rest = self.buffer[end:]
+        return not rest.strip(''.join(NUMBER_CHARS)) and self.buffer[end - 1] in NUMBER_CHARS
+
+    def _skip_whitespace(self, pos):
+        while pos < len(self.buffer) and self.buffer[pos] in ' \t\n\r':
+            pos += 1
+        return pos
+
+
+class StreamingJSONParser(JSONParser):
+    """
+    Parses JSON arrays into lazy `StreamedItems` for bulk operations,
+    other documents are parsed as by `JSONParser`.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        decoder = codecs.getincrementaldecoder(encoding)()
+        chunk_size = extensions_api_settings.DEFAULT_BULK_STREAM_CHUNK_SIZE
+        head = ''
+        while not head.strip():
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            head += decoder.decode(chunk)
+        head = head.lstrip()
+        if head.startswith('['):
+            return StreamedItems(stream, decoder, head[1:], strict=self.strict, chunk_size=chunk_size)
+        try:
+            data = head + decoder.decode(stream.read(), final=True)
+            parse_constant = strict_constant if self.strict else None
+            return json.loads(data, parse_constant=parse_constant)
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parses newline delimited JSON into lazy `StreamedItems`.
+    """
+    media_type = 'application/x-ndjson'
+    strict = JSONParser.strict
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        return StreamedItems(stream, codecs.getincrementaldecoder(encoding)(), ndjson=True, strict=self.strict)
@@ -0,0 +1,18 @@
+from django.db import transaction
+from django.dispatch import Signal
+
+
+# Sent by bulk operations, which don't send `post_save` or `post_delete` for every object,
+# after the transaction with the written objects is committed. Arguments: `sender` (the model),
+# `pks` (primary keys of changed objects), `operation` ('create', 'update', 'upsert' or 'delete')
+# and `using` (the database alias).
+post_bulk_change = Signal()
+
+
+def send_post_bulk_change_on_commit(model, pks, operation, using):
+    if pks and post_bulk_change.has_listeners(model):
+        pks = list(pks)
+        transaction.on_commit(
+            lambda: post_bulk_change.send(sender=model, pks=pks, operation=operation, using=using),
+            using=using
+        )
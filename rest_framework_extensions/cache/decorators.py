@@ -1,9 +1,21 @@
+import hashlib
+import json
+import logging
+import random
+import uuid
+from contextlib import nullcontext
 from functools import wraps, WRAPPER_ASSIGNMENTS
 
 from django.http.response import HttpResponse
+from django.utils.cache import cc_delim_re
+from django.utils.http import quote_etag
+from django.utils.translation import override
 
 
 from rest_framework_extensions.settings import extensions_api_settings
+from rest_framework_extensions.utils import prepare_header_name, get_view_context, get_content_hash
+
+logger = logging.getLogger('rest_framework_extensions.cache')
 
 
 def get_cache(alias):
@@ -28,7 +40,13 @@ class CacheResponse:
                  timeout=None,
                  key_func=None,
                  cache=None,
-                 cache_errors=None):
+                 cache_errors=None,
+                 respect_cache_control=None,
+                 allow_cache_bypass=None,
+                 respect_vary=None,
+                 shadow=None,
+                 shadow_sample_rate=None,
+                 content_etag=None):
         if timeout is None:
             self.timeout = extensions_api_settings.DEFAULT_CACHE_RESPONSE_TIMEOUT
         else:
@@ -44,6 +62,36 @@ class CacheResponse:
         else:
             self.cache_errors = cache_errors
 
+        if respect_cache_control is None:
+            self.respect_cache_control = extensions_api_settings.DEFAULT_CACHE_RESPECT_CACHE_CONTROL
+        else:
+            self.respect_cache_control = respect_cache_control
+
+        if allow_cache_bypass is None:
+            self.allow_cache_bypass = extensions_api_settings.DEFAULT_CACHE_ALLOW_BYPASS
+        else:
+            self.allow_cache_bypass = allow_cache_bypass
+
+        if respect_vary is None:
+            self.respect_vary = extensions_api_settings.DEFAULT_CACHE_RESPECT_VARY
+        else:
+            self.respect_vary = respect_vary
+
+        if shadow is None:
+            self.shadow = extensions_api_settings.DEFAULT_CACHE_SHADOW
+        else:
+            self.shadow = shadow
+
+        if shadow_sample_rate is None:
+            self.shadow_sample_rate = extensions_api_settings.DEFAULT_CACHE_SHADOW_SAMPLE_RATE
+        else:
+            self.shadow_sample_rate = shadow_sample_rate
+
+        if content_etag is None:
+            self.content_etag = extensions_api_settings.DEFAULT_CACHE_CONTENT_ETAG
+        else:
+            self.content_etag = content_etag
+
         self.cache = get_cache(cache or extensions_api_settings.DEFAULT_USE_CACHE)
 
     def __call__(self, func):
@@ -58,6 +106,7 @@ class CacheResponse:
                 args=args,
                 kwargs=kwargs,
             )
+        inner.cache_response = this
         return inner
 
     def process_cache_response(self,
@@ -66,6 +115,14 @@ class CacheResponse:
                                request,
                                args,
                                kwargs):
+        if self.shadow:
+            return self.process_shadow_response(
+                view_instance=view_instance,
+                view_method=view_method,
+                request=request,
+                args=args,
+                kwargs=kwargs
+            )
 
         key = self.calculate_key(
             view_instance=view_instance,
@@ -77,25 +134,29 @@ class CacheResponse:
 
         timeout = self.calculate_timeout(view_instance=view_instance)
 
-        response_triple = self.cache.get(key)
+        if self.is_cache_bypassed(view_instance=view_instance, request=request):
+            response_triple = None
+        else:
+            response_triple = self.get_response_triple(key=key, request=request)
         if not response_triple:
             # render response to create and cache the content byte string
             response = view_method(view_instance, request, *args, **kwargs)
             response = view_instance.finalize_response(request, response, *args, **kwargs)
             response.render()
 
-            if not response.status_code >= 400 or self.cache_errors:
-                # django 3.0 has not .items() method, django 3.2 has not ._headers
-                if hasattr(response, '_headers'):
-                    headers = response._headers.copy()
-                else:
-                    headers = {k: (k, v) for k, v in response.items()}
-                response_triple = (
-                    response.rendered_content,
-                    response.status_code,
-                    headers
+            if self.should_store_response(response, request=request):
+                if self.content_etag and not response.has_header('ETag'):
+                    # stored with the response, so hits are not hashed again
+                    response['ETag'] = quote_etag(get_content_hash(response.rendered_content))
+                response_triple = self.get_response_triple_from_response(response)
+                timeout = self.calculate_response_timeout(response, timeout)
+                self.set_response_triple(
+                    key=key,
+                    request=request,
+                    response=response,
+                    response_triple=response_triple,
+                    timeout=timeout
                 )
-                self.cache.set(key, response_triple, timeout)
         else:
             # build smaller Django HttpResponse
             content, status, headers = response_triple
@@ -107,16 +168,112 @@ class CacheResponse:
 
         return response
 
+    def process_shadow_response(self,
+                                view_instance,
+                                view_method,
+                                request,
+                                args,
+                                kwargs):
+        """
+        Always serve the fresh response. For sampled requests compare it with
+        the response the cache would have returned and record any mismatch,
+        which means that the key doesn't cover every input of the view.
+        """
+        is_sampled = random.random() < self.shadow_sample_rate
+        if is_sampled:
+            key = self.calculate_key(
+                view_instance=view_instance,
+                view_method=view_method,
+                request=request,
+                args=args,
+                kwargs=kwargs
+            )
+            timeout = self.calculate_timeout(view_instance=view_instance)
+
+        response = view_method(view_instance, request, *args, **kwargs)
+        response = view_instance.finalize_response(request, response, *args, **kwargs)
+        if not is_sampled:
+            return response
+
+        response.render()
+        if self.should_store_response(response, request=request):
+            response_triple = self.get_response_triple_from_response(response)
+            cached_response_triple = self.get_response_triple(key=key, request=request)
+            if not cached_response_triple:
+                self.set_response_triple(
+                    key=key,
+                    request=request,
+                    response=response,
+                    response_triple=response_triple,
+                    timeout=self.calculate_response_timeout(response, timeout)
+                )
+            elif cached_response_triple[:2] != response_triple[:2]:
+                self.record_shadow_mismatch(
+                    key=key,
+                    cached_response_triple=cached_response_triple,
+                    response_triple=response_triple,
+                    view_instance=view_instance,
+                    view_method=view_method,
+                    request=request,
+                    args=args,
+                    kwargs=kwargs
+                )
+        return response
+
+    def record_shadow_mismatch(self,
+                               key,
+                               cached_response_triple,
+                               response_triple,
+                               view_instance,
+                               view_method,
+                               request,
+                               args,
+                               kwargs):
+        key_func = self.get_key_func(view_instance)
+        if hasattr(key_func, 'get_data_from_bits'):
+            key_bits = key_func.get_data_from_bits(
+                view_instance=view_instance,
+                view_method=view_method,
+                request=request,
+                args=args,
+                kwargs=kwargs
+            )
+        else:
+            key_bits = None
+        logger.warning('Cached response mismatch: %s', request.path,
+                       extra={
+                           'cache_key': key,
+                           'key_bits': key_bits,
+                           'cached_status_code': cached_response_triple[1],
+                           'status_code': response_triple[1],
+                           'request': request
+                       }
+                       )
+
+    def get_response_triple_from_response(self, response):
+        # django 3.0 has not .items() method, django 3.2 has not ._headers
+        if hasattr(response, '_headers'):
+            headers = response._headers.copy()
+        else:
+            headers = {k: (k, v) for k, v in response.items()}
+        return (
+            response.rendered_content,
+            response.status_code,
+            headers
+        )
+
+    def get_key_func(self, view_instance):
+        if isinstance(self.key_func, str):
+            return getattr(view_instance, self.key_func)
+        return self.key_func
+
     def calculate_key(self,
                       view_instance,
                       view_method,
                       request,
                       args,
                       kwargs):
-        if isinstance(self.key_func, str):
-            key_func = getattr(view_instance, self.key_func)
-        else:
-            key_func = self.key_func
+        key_func = self.get_key_func(view_instance)
         return key_func(
             view_instance=view_instance,
             view_method=view_method,
@@ -130,5 +287,181 @@ class CacheResponse:
             self.timeout = getattr(view_instance, self.timeout)
         return self.timeout
 
+    def get_response_triple(self, key, request):
+        if self.respect_vary:
+            vary_index = self.cache.get(self.get_vary_index_key(key))
+            if vary_index is None:
+                return None
+            key = self.calculate_vary_key(key, request, vary_index)
+        return self.cache.get(key)
+
+    def set_response_triple(self, key, request, response, response_triple, timeout):
+        if self.respect_vary:
+            # remember which request headers the response varies on,
+            # so lookups could build the same key before evaluating the view.
+            # Keys of variants include the index generation, so deleting the index
+            # makes every variant stored before unreachable
+            index_key = self.get_vary_index_key(key)
+            vary_index = self.cache.get(index_key)
+            vary_index = {
+                'headers': self.get_vary_headers(response),
+                'generation': vary_index['generation'] if vary_index else uuid.uuid4().hex,
+            }
+            self.cache.set(index_key, vary_index, timeout)
+            key = self.calculate_vary_key(key, request, vary_index)
+        self.cache.set(key, response_triple, timeout)
+
+    def invalidate(self,
+                   view_class,
+                   view_method,
+                   kwargs_list=None,
+                   query_params=None,
+                   method='GET',
+                   headers=None,
+                   user=None,
+                   languages=None,
+                   request=None):
+        """
+        Delete responses stored for `view_method` of `view_class` with one
+        `delete_many` call. Keys are calculated for every url kwargs dict
+        from `kwargs_list` as if the view was requested with them, in every
+        language of `languages` (the active language by default).
+
+        Returns the deleted keys.
+        """
+        if isinstance(view_method, str):
+            view_method = getattr(view_class, view_method)
+        view_method = getattr(view_method, '__wrapped__', view_method)
+        keys = []
+        for language in languages or [None]:
+            # `None` keeps the active language
+            with override(language) if language else nullcontext():
+                for kwargs in kwargs_list or [{}]:
+                    key = self.calculate_key(**get_view_context(
+                        view_class=view_class,
+                        view_method=view_method,
+                        kwargs=kwargs,
+                        query_params=query_params,
+                        method=method,
+                        headers=headers,
+                        user=user,
+                        request=request
+                    ))
+                    keys.extend(self.get_invalidation_keys(key))
+        self.cache.delete_many(keys)
+        return keys
+
+    def get_invalidation_keys(self, key):
+        if self.respect_vary:
+            # without the index the generation of variant keys is rotated on the next store
+            return [self.get_vary_index_key(key)]
+        return [key]
+
+    def get_vary_index_key(self, key):
+        return '{0}.vary'.format(key)
+
+    def get_vary_headers(self, response):
+        """
+        >> get_vary_headers(response)  # Vary: Accept, Accept-Language
+        ['accept', 'accept-language']
+        """
+        if not response.has_header('Vary'):
+            return []
+        return sorted({
+            header.strip().lower()
+            for header in cc_delim_re.split(response['Vary'])
+            if header.strip()
+        })
+
+    def calculate_vary_key(self, key, request, vary_index):
+        vary_headers = vary_index['headers']
+        values = [request.META.get(prepare_header_name(header)) for header in vary_headers]
+        return '{0}.{1}'.format(
+            key,
+            hashlib.md5(json.dumps([vary_index['generation'], vary_headers, values]).encode('utf-8')).hexdigest()
+        )
+
+    def is_cache_bypassed(self, view_instance, request):
+        """
+        Whether the request asks to skip the stored response (RFC 7234 `no-cache`
+        or `no-store`) and is trusted to do so. The fresh response replaces the stored one.
+        """
+        if not self.respect_cache_control:
+            return False
+        directives = self.get_request_cache_control_directives(request)
+        if 'no-cache' not in directives and 'no-store' not in directives:
+            # HTTP/1.0 clients, see RFC 7234 section 5.4
+            if directives or request.META.get(prepare_header_name('pragma')) != 'no-cache':
+                return False
+        allow_cache_bypass = self.allow_cache_bypass
+        if isinstance(allow_cache_bypass, str):
+            allow_cache_bypass = getattr(view_instance, allow_cache_bypass)
+        if callable(allow_cache_bypass):
+            allow_cache_bypass = allow_cache_bypass(request)
+        return bool(allow_cache_bypass)
+
+    def should_store_response(self, response, request=None):
+        if response.status_code >= 400 and not self.cache_errors:
+            return False
+        if self.respect_vary and '*' in self.get_vary_headers(response):
+            return False
+        if self.respect_cache_control:
+            if request is not None and 'no-store' in self.get_request_cache_control_directives(request):
+                return False
+            directives = self.get_cache_control_directives(response.get('Cache-Control'))
+            # stored responses are served without revalidation, so `no-cache` ones are not stored
+            if 'no-store' in directives or 'private' in directives or 'no-cache' in directives:
+                return False
+            if self._get_max_age(directives) == 0:
+                return False
+        return True
+
+    def calculate_response_timeout(self, response, timeout):
+        """
+        Shared cache lifetime set by the view (`s-maxage` over `max-age`)
+        takes precedence over the decorator timeout.
+        """
+        if self.respect_cache_control:
+            max_age = self._get_max_age(
+                self.get_cache_control_directives(response.get('Cache-Control')))
+            if max_age is not None:
+                return max_age
+        return timeout
+
+    def get_request_cache_control_directives(self, request):
+        return self.get_cache_control_directives(request.META.get(prepare_header_name('cache-control')))
+
+    def get_cache_control_directives(self, header_value):
+        """
+        >> get_cache_control_directives('no-cache, max-age=60')
+        {'no-cache': None, 'max-age': '60'}
+        """
+        directives = {}
+        if header_value:
+            for directive in cc_delim_re.split(header_value.strip()):
+                if directive:
+                    name, _, value = directive.partition('=')
+                    directives[name.strip().lower()] = value.strip().strip('"') or None
+        return directives
+
+    def _get_max_age(self, directives):
+        for name in ('s-maxage', 'max-age'):
+            try:
+                return max(int(directives[name]), 0)
+            except (KeyError, TypeError, ValueError):
+                continue
+        return None
+
+
+def invalidate_cache_response(view_class, view_method, **kwargs):
+    """
+    Invalidate responses stored by `@cache_response` decorated `view_method`
+    of `view_class`. Look at `CacheResponse.invalidate` for arguments.
+
+    >> invalidate_cache_response(UserViewSet, 'retrieve', kwargs_list=[{'pk': '1'}, {'pk': '2'}])
+    """
+    view_method = getattr(view_class, view_method)
+    return view_method.cache_response.invalidate(view_class, view_method, **kwargs)
+
 
 cache_response = CacheResponse
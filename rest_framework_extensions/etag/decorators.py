@@ -1,40 +1,92 @@
 import logging
-from functools import wraps, WRAPPER_ASSIGNMENTS
+import re
+from collections import namedtuple
+from functools import lru_cache, wraps, WRAPPER_ASSIGNMENTS
 
-from django.utils.http import parse_etags, quote_etag
+from django.utils.http import quote_etag
 
 from rest_framework import status
 from rest_framework.permissions import SAFE_METHODS
+from rest_framework.request import Request
 from rest_framework.response import Response
-from rest_framework_extensions.exceptions import PreconditionRequiredException
+from rest_framework_extensions.exceptions import PreconditionFailedException, PreconditionRequiredException
 
-from rest_framework_extensions.utils import prepare_header_name
+from rest_framework_extensions.utils import prepare_header_name, get_content_hash, log_precondition_failure
 from rest_framework_extensions.settings import extensions_api_settings
 
 logger = logging.getLogger('django.request')
 
+WEAK_ETAG_PREFIX = 'W/'
+
+PRECONDITION_EXCEPTIONS = (PreconditionRequiredException, PreconditionFailedException)
+
+
+def is_weak_etag(etag):
+    return etag.startswith(WEAK_ETAG_PREFIX)
+
+
+def get_opaque_tag(etag):
+    """
+    >> get_opaque_tag('W/"123"')
+    '123'
+    """
+    if is_weak_etag(etag):
+        etag = etag[len(WEAK_ETAG_PREFIX):]
+    return etag.strip('"')
+
+
+ETag = namedtuple('ETag', ['tag', 'weak'])
+ANY_ETAG = ETag('*', False)
+
+# quoted tag with optional weak prefix or, for sloppy clients, unquoted one
+ETAG_TOKEN_RE = re.compile(r'(W/)?"([^"]*)"|([^\s,"]+)')
+
+
+@lru_cache(maxsize=256)
+def parse_etags(header_value):
+    """
+    Parses If-None-Match or If-Match header value in one pass. The same values
+    are sent by many clients, so results are memoized.
+
+    >> parse_etags('W/"123", "456" 789')
+    frozenset({ETag(tag='123', weak=True), ETag(tag='456', weak=False), ETag(tag='789', weak=False)})
+    """
+    return frozenset(
+        ETag(quoted_tag, False) if quoted_tag == '*' else ETag(quoted_tag or tag, bool(weak_prefix))
+        for weak_prefix, quoted_tag, tag in ETAG_TOKEN_RE.findall(header_value)
+    )
+
 
 class ETAGProcessor:
     """Based on https://github.com/django/django/blob/master/django/views/decorators/http.py"""
 
-    def __init__(self, etag_func=None, rebuild_after_method_evaluation=False):
+    def __init__(self, etag_func=None, rebuild_after_method_evaluation=False, reuse_unchanged_bits=False,
+                 weak=False):
         if not etag_func:
             etag_func = extensions_api_settings.DEFAULT_ETAG_FUNC
         self.etag_func = etag_func
         self.rebuild_after_method_evaluation = rebuild_after_method_evaluation
+        self.reuse_unchanged_bits = reuse_unchanged_bits
+        self.weak = weak
 
     def __call__(self, func):
         this = self
 
         @wraps(func, assigned=WRAPPER_ASSIGNMENTS)
         def inner(self, request, *args, **kwargs):
-            return this.process_conditional_request(
-                view_instance=self,
-                view_method=func,
-                request=request,
-                args=args,
-                kwargs=kwargs,
-            )
+            try:
+                return this.process_conditional_request(
+                    view_instance=self,
+                    view_method=func,
+                    request=request,
+                    args=args,
+                    kwargs=kwargs,
+                )
+            except PRECONDITION_EXCEPTIONS as exc:
+                # the view method could be called directly, without dispatch
+                if not isinstance(request, Request):
+                    raise
+                return get_precondition_failure_response(self, exc)
 
         return inner
 
@@ -55,7 +107,7 @@ class ETAGProcessor:
 
         if self.is_if_none_match_failed(res_etag, etags, if_none_match):
             if request.method in SAFE_METHODS:
-                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+                response = self.get_not_modified_response()
             else:
                 response = self._get_and_log_precondition_failed_response(
                     request=request)
@@ -65,7 +117,7 @@ class ETAGProcessor:
         else:
             response = view_method(view_instance, request, *args, **kwargs)
             if self.rebuild_after_method_evaluation:
-                res_etag = self.calculate_etag(
+                res_etag = self.recalculate_etag(
                     view_instance=view_instance,
                     view_method=view_method,
                     request=request,
@@ -74,43 +126,59 @@ class ETAGProcessor:
                 )
 
         if res_etag and not response.has_header('ETag'):
-            response['ETag'] = quote_etag(res_etag)
+            response['ETag'] = self.prepare_etag_header(res_etag)
 
         return response
 
+    def prepare_etag_header(self, res_etag):
+        if self.weak:
+            return WEAK_ETAG_PREFIX + quote_etag(get_opaque_tag(res_etag))
+        return quote_etag(res_etag)
+
     def get_etags_and_matchers(self, request):
         etags = None
         if_none_match = request.META.get(prepare_header_name("if-none-match"))
         if_match = request.META.get(prepare_header_name("if-match"))
         if if_none_match or if_match:
             # There can be more than one ETag in the request, so we
-            # consider the list of values.
-            try:
-                value_to_parse = if_none_match or if_match
-                if value_to_parse:
-                    etag_list = [e.strip() for e in value_to_parse.split(' ') if e.strip()]
-                    etag_list = [e if e.startswith('"') else f'"{e}"' for e in etag_list]
-                    value_to_parse = ', '.join(etag_list)
-                    etags = parse_etags(value_to_parse)
-            except ValueError:
-                # In case of invalid etag ignore all ETag headers.
-                # Apparently Opera sends invalidly quoted headers at times
-                # (we should be returning a 400 response, but that's a
-                # little extreme) -- this is Django bug #10681.
-                if_none_match = None
-                if_match = None
+            # consider the set of values.
+            etags = parse_etags(if_none_match or if_match)
         return etags, if_none_match, if_match
 
+    def get_etag_func(self, view_instance):
+        if isinstance(self.etag_func, str):
+            return getattr(view_instance, self.etag_func)
+        else:
+            return self.etag_func
+
     def calculate_etag(self,
                        view_instance,
                        view_method,
                        request,
                        args,
                        kwargs):
-        if isinstance(self.etag_func, str):
-            etag_func = getattr(view_instance, self.etag_func)
-        else:
-            etag_func = self.etag_func
+        etag_func = self.get_etag_func(view_instance)
+        return etag_func(
+            view_instance=view_instance,
+            view_method=view_method,
+            request=request,
+            args=args,
+            kwargs=kwargs,
+        )
+
+    def recalculate_etag(self,
+                         view_instance,
+                         view_method,
+                         request,
+                         args,
+                         kwargs):
+        """
+        ETag after view method evaluation. With `reuse_unchanged_bits` key constructors
+        calculate only bits that could be changed by the method.
+        """
+        etag_func = self.get_etag_func(view_instance)
+        if self.reuse_unchanged_bits and hasattr(etag_func, 'get_key_after_write'):
+            etag_func = etag_func.get_key_after_write
         return etag_func(
             view_instance=view_instance,
             view_method=view_method,
@@ -120,29 +188,37 @@ class ETAGProcessor:
         )
 
     def is_if_none_match_failed(self, res_etag, etags, if_none_match):
+        # weak comparison, look at RFC 7232, section 2.3.2
         if res_etag and if_none_match:
-            etags = [etag.strip('"') for etag in etags]
-            return res_etag in etags or '*' in etags
+            tag = get_opaque_tag(res_etag)
+            return ETag(tag, False) in etags or ETag(tag, True) in etags or ANY_ETAG in etags
         else:
             return False
 
     def is_if_match_failed(self, res_etag, etags, if_match):
+        # strong comparison, weak tags never match
         if res_etag and if_match:
-            res_etag =res_etag.strip('"')
-            etags = [etag.strip('"') for etag in etags]
-            matches = res_etag in etags or '*' in etags
-            return not matches
+            if ANY_ETAG in etags:
+                return False
+            if self.weak:
+                return True
+            return ETag(res_etag.strip('"'), False) not in etags
         else:
             return False
 
+    def get_not_modified_response(self):
+        return Response(status=status.HTTP_304_NOT_MODIFIED)
+
+    def get_precondition_failed_response(self):
+        response = Response(status=status.HTTP_412_PRECONDITION_FAILED)
+        # already logged or sampled out, django shouldn't log it once more
+        response._has_been_logged = True
+        return response
+
     def _get_and_log_precondition_failed_response(self, request):
-        logger.warning('Precondition Failed: %s', request.path,
-                       extra={
-                           'status_code': status.HTTP_412_PRECONDITION_FAILED,
-                           'request': request
-                       }
-                       )
-        return Response(status=status.HTTP_412_PRECONDITION_FAILED)
+        log_precondition_failure(logger, 'Precondition Failed: %s', request,
+                                 status.HTTP_412_PRECONDITION_FAILED)
+        return self.get_precondition_failed_response()
 
 
 class APIETAGProcessor(ETAGProcessor):
@@ -164,7 +240,8 @@ class APIETAGProcessor(ETAGProcessor):
                         'PATCH': ['If-Match'],
                         'DELETE': ['If-Match']}
 
-    def __init__(self, etag_func=None, rebuild_after_method_evaluation=False, precondition_map=None):
+    def __init__(self, etag_func=None, rebuild_after_method_evaluation=False, precondition_map=None,
+                 reuse_unchanged_bits=False, weak=False):
         assert etag_func is not None, ('None-type functions are not allowed for processing API ETags.'
                                        'You must specify a proper function to calculate the API ETags '
                                        'using the "etag_func" keyword argument.')
@@ -176,7 +253,9 @@ class APIETAGProcessor(ETAGProcessor):
                                                          'HTTP headers that must all be present for that request.')
 
         super().__init__(etag_func=etag_func,
-                                               rebuild_after_method_evaluation=rebuild_after_method_evaluation)
+                         rebuild_after_method_evaluation=rebuild_after_method_evaluation,
+                         reuse_unchanged_bits=reuse_unchanged_bits,
+                         weak=weak)
 
     def get_etags_and_matchers(self, request):
         """Get the etags from the header and perform a validation against the required preconditions."""
@@ -187,27 +266,90 @@ class APIETAGProcessor(ETAGProcessor):
 
     def evaluate_preconditions(self, request):
         """Evaluate whether the precondition for the request is met."""
-        if request.method.upper() in self.precondition_map.keys():
-            required_headers = self.precondition_map.get(
-                request.method.upper(), [])
-            # check the required headers
-            for header in required_headers:
-                if not request.META.get(prepare_header_name(header)):
-                    # raise an error for each header that does not match
-                    logger.warning('Precondition required: %s', request.path,
-                                   extra={
-                                       'status_code': status.HTTP_428_PRECONDITION_REQUIRED,
-                                       'request': request
-                                   }
-                                   )
-                    # raise an RFC 6585 compliant exception
-                    raise PreconditionRequiredException(detail='Precondition required. This "%s" request '
-                                                               'is required to be conditional. '
-                                                               'Try again using "%s".' % (
-                                                                   request.method, header)
-                                                        )
-        return True
+        return evaluate_preconditions(request, self.precondition_map)
+
+
+def evaluate_preconditions(request, precondition_map):
+    """
+    Raises 428 if a header required for the request method by `precondition_map` is missing.
+    """
+    if request.method.upper() in precondition_map.keys():
+        required_headers = precondition_map.get(
+            request.method.upper(), [])
+        # check the required headers
+        for header in required_headers:
+            if not request.META.get(prepare_header_name(header)):
+                # raise an error for each header that does not match
+                raise_precondition_required(request, header)
+    return True
+
+
+def raise_precondition_required(request, header):
+    """
+    Logs the failure with `log_precondition_failure` and raises RFC 6585 compliant exception.
+    """
+    log_precondition_failure(logger, 'Precondition required: %s', request,
+                             status.HTTP_428_PRECONDITION_REQUIRED)
+    raise PreconditionRequiredException(detail='Precondition required. This "%s" request '
+                                               'is required to be conditional. '
+                                               'Try again using "%s".' % (request.method, header))
+
+
+def raise_precondition_failed(request):
+    log_precondition_failure(logger, 'Precondition Failed: %s', request,
+                             status.HTTP_412_PRECONDITION_FAILED)
+    raise PreconditionFailedException()
+
+
+def get_precondition_failure_response(view_instance, exc):
+    """
+    Response of the view for precondition failure exception. The failure is logged
+    (or sampled out) when it is raised, so django shouldn't log the response once more.
+    """
+    response = view_instance.handle_exception(exc)
+    response._has_been_logged = True
+    return response
+
+
+class ContentETAGProcessor(ETAGProcessor):
+    """
+    Calculates ETag as a hash of the rendered response content for safe methods.
+
+    Use it for views without a suitable key constructor. The view method is always
+    evaluated, so matching `If-None-Match` saves bandwidth, but not server time.
+    If the response already has an ETag, e.g. stored by `cache_response` with
+    `content_etag=True`, it is used without rehashing.
+    """
+
+    def __init__(self, weak=False):
+        super().__init__(etag_func=get_content_hash, weak=weak)
+
+    def process_conditional_request(self,
+                                    view_instance,
+                                    view_method,
+                                    request,
+                                    args,
+                                    kwargs):
+        response = view_method(view_instance, request, *args, **kwargs)
+        if request.method not in SAFE_METHODS or getattr(response, 'streaming', False):
+            return response
+
+        if not response.has_header('ETag'):
+            if hasattr(response, 'render'):
+                response = view_instance.finalize_response(request, response, *args, **kwargs)
+                response.render()
+            if not status.is_success(response.status_code):
+                return response
+            response['ETag'] = self.prepare_etag_header(self.etag_func(response.content))
+
+        etags, if_none_match, if_match = self.get_etags_and_matchers(request)
+        if self.is_if_none_match_failed(response['ETag'], etags, if_none_match):
+            not_modified_response = self.get_not_modified_response()
+            not_modified_response['ETag'] = response['ETag']
+            return not_modified_response
+        return response
 
 
 etag = ETAGProcessor
 api_etag = APIETAGProcessor
+content_etag = ContentETAGProcessor
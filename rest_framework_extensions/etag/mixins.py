@@ -1,4 +1,13 @@
-from rest_framework_extensions.etag.decorators import etag, api_etag
+from django.db import transaction
+from django.db.models import F
+from django.utils.http import quote_etag
+
+from rest_framework_extensions.etag.decorators import (
+    etag, api_etag, parse_etags, evaluate_preconditions, logger, ANY_ETAG, APIETAGProcessor, PRECONDITION_EXCEPTIONS,
+    get_precondition_failure_response
+)
+from rest_framework_extensions.exceptions import PreconditionFailedException
+from rest_framework_extensions.utils import log_precondition_failure, prepare_header_name
 from rest_framework_extensions.settings import extensions_api_settings
 
 
@@ -22,7 +31,7 @@ class RetrieveETAGMixin(BaseETAGMixin):
 
 
 class UpdateETAGMixin(BaseETAGMixin):
-    @etag(etag_func='object_etag_func', rebuild_after_method_evaluation=True)
+    @etag(etag_func='object_etag_func', rebuild_after_method_evaluation=True, reuse_unchanged_bits=True)
     def update(self, request, *args, **kwargs):
         return super().update(request, *args, **kwargs)
 
@@ -65,7 +74,8 @@ class APIRetrieveETAGMixin(APIBaseETAGMixin):
 
 
 class APIUpdateETAGMixin(APIBaseETAGMixin):
-    @api_etag(etag_func='api_object_etag_func', rebuild_after_method_evaluation=True)
+    @api_etag(etag_func='api_object_etag_func', rebuild_after_method_evaluation=True,
+              reuse_unchanged_bits=True)
     def update(self, request, *args, **kwargs):
         return super().update(request, *args, **kwargs)
 
@@ -86,3 +96,109 @@ class APIETAGMixin(APIRetrieveETAGMixin,
                    APIDestroyETAGMixin,
                    APIListETAGMixin):
     pass
+
+
+class APIVersionBaseETAGMixin:
+    """
+    Optimistic concurrency control with an integer version column.
+
+    ETag of the object is the value of `api_etag_version_field`, which is incremented by every update.
+    `If-Match` precondition is enforced by the WHERE clause of that UPDATE, so there is no read of
+    the row values for the check and no race between the check and the write.
+    """
+    api_etag_version_field = extensions_api_settings.DEFAULT_API_ETAG_VERSION_FIELD
+    precondition_map = APIETAGProcessor.precondition_map
+
+    def get_version_etag(self, view_instance, view_method, request, args, kwargs):
+        lookup_value = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        try:
+            version = self.filter_queryset(self.get_queryset()).filter(
+                **{self.lookup_field: lookup_value}
+            ).values_list(self.api_etag_version_field, flat=True).first()
+        except ValueError:
+            return None
+        return None if version is None else str(version)
+
+    def get_if_match_versions(self, request):
+        """
+        Returns versions from `If-Match` header or None for unconditional request.
+        Weak ETags never match, `If-Match` uses the strong comparison.
+        """
+        evaluate_preconditions(request, self.precondition_map)
+        etags = parse_etags(request.META.get(prepare_header_name('if-match'), ''))
+        if not etags or ANY_ETAG in etags:
+            return None
+        versions = set()
+        for etag_value in etags:
+            if etag_value.weak:
+                continue
+            try:
+                versions.add(int(etag_value.tag))
+            except ValueError:
+                pass
+        return versions
+
+    def increment_version(self, instance, if_match_versions):
+        """
+        Increments version of the instance in the database if it is still the loaded one, raises
+        `PreconditionFailedException` otherwise. Should be called inside of a transaction, the
+        updated row stays locked until the end of it.
+        """
+        version = getattr(instance, self.api_etag_version_field)
+        if if_match_versions is not None and version not in if_match_versions:
+            raise PreconditionFailedException()
+        updated = type(instance)._default_manager.filter(
+            pk=instance.pk, **{self.api_etag_version_field: version}
+        ).update(**{self.api_etag_version_field: F(self.api_etag_version_field) + 1})
+        if not updated:
+            raise PreconditionFailedException()
+        return version + 1
+
+    def get_version_precondition_failure_response(self, request, exc):
+        # 428 is logged by the precondition check, 412 is raised unlogged by `increment_version`
+        if isinstance(exc, PreconditionFailedException):
+            log_precondition_failure(logger, 'Precondition Failed: %s', request, exc.status_code)
+        return get_precondition_failure_response(self, exc)
+
+
+class APIVersionRetrieveETAGMixin(APIVersionBaseETAGMixin):
+    @api_etag(etag_func='get_version_etag')
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+
+class APIVersionUpdateETAGMixin(APIVersionBaseETAGMixin):
+    def update(self, request, *args, **kwargs):
+        try:
+            self._if_match_versions = self.get_if_match_versions(request)
+            response = super().update(request, *args, **kwargs)
+        except PRECONDITION_EXCEPTIONS as exc:
+            return self.get_version_precondition_failure_response(request, exc)
+        response['ETag'] = quote_etag(str(self._updated_version))
+        return response
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            version = self.increment_version(serializer.instance, self._if_match_versions)
+            serializer.save(**{self.api_etag_version_field: version})
+        self._updated_version = version
+
+
+class APIVersionDestroyETAGMixin(APIVersionBaseETAGMixin):
+    def destroy(self, request, *args, **kwargs):
+        try:
+            self._if_match_versions = self.get_if_match_versions(request)
+            return super().destroy(request, *args, **kwargs)
+        except PRECONDITION_EXCEPTIONS as exc:
+            return self.get_version_precondition_failure_response(request, exc)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            self.increment_version(instance, self._if_match_versions)
+            instance.delete()
+
+
+class APIVersionETAGMixin(APIVersionRetrieveETAGMixin,
+                          APIVersionUpdateETAGMixin,
+                          APIVersionDestroyETAGMixin):
+    pass
@@ -0,0 +1,126 @@
+import uuid
+
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.utils.encoding import force_str
+
+from rest_framework_extensions.bulk_operations.signals import post_bulk_change
+from rest_framework_extensions.settings import extensions_api_settings
+
+
+class ETagStore:
+    """
+    Keeps tokens of model instances and model lists in the cache.
+
+    Tokens of a registered model are dropped on every `post_save`, `post_delete` and
+    `post_bulk_change` signal, the next read creates a new random one. Tokens are dropped
+    after the write transaction is committed, otherwise a read between the write and the
+    commit would store a new token for the old data. ETags built from tokens don't need
+    database queries, only one cache lookup.
+    """
+    key_prefix = 'rest_framework_extensions.etag_store'
+
+    def __init__(self, cache=None):
+        self._cache = cache
+        self.lookup_fields = {}
+
+    def get_cache(self):
+        return caches[self._cache or extensions_api_settings.DEFAULT_ETAG_STORE_CACHE]
+
+    def register(self, model, lookup_fields=('pk',)):
+        """
+        Start tracking writes of `model`. Object tokens are available for
+        `lookup_fields`, which should not change after the instance is created.
+        """
+        self.lookup_fields[model] = tuple(lookup_fields)
+        dispatch_uid = self._get_dispatch_uid(model)
+        post_save.connect(self.on_write, sender=model, weak=False, dispatch_uid=dispatch_uid)
+        post_delete.connect(self.on_write, sender=model, weak=False, dispatch_uid=dispatch_uid)
+        post_bulk_change.connect(self.on_bulk_write, sender=model, weak=False, dispatch_uid=dispatch_uid)
+
+    def unregister(self, model):
+        self.lookup_fields.pop(model, None)
+        dispatch_uid = self._get_dispatch_uid(model)
+        post_save.disconnect(sender=model, dispatch_uid=dispatch_uid)
+        post_delete.disconnect(sender=model, dispatch_uid=dispatch_uid)
+        post_bulk_change.disconnect(sender=model, dispatch_uid=dispatch_uid)
+
+    def is_registered(self, model):
+        return model in self.lookup_fields
+
+    def is_lookup_field_registered(self, model, lookup_field):
+        pk_fields = ('pk', model._meta.pk.name)
+        return any(
+            field == lookup_field or (field in pk_fields and lookup_field in pk_fields)
+            for field in self.lookup_fields.get(model, ())
+        )
+
+    def on_write(self, sender, instance, using=None, **kwargs):
+        self.invalidate(sender, [instance], using=using)
+
+    def invalidate(self, model, instances, using=None):
+        """
+        Drops tokens of `instances` and of the model list, when the current
+        transaction of `using` database is committed.
+        """
+        # keys are calculated now, deleted instances lose their pk after the signal
+        keys = [self.get_list_key(model)]
+        for instance in instances:
+            for lookup_field in self.lookup_fields.get(model, ('pk',)):
+                value = instance.pk if lookup_field == 'pk' else getattr(instance, lookup_field)
+                keys.append(self.get_object_key(model, lookup_field, value))
+        self.delete_on_commit(keys, using)
+
+    def delete_on_commit(self, keys, using=None):
+        cache = self.get_cache()
+        transaction.on_commit(lambda: cache.delete_many(keys), using=using)
+
+    def on_bulk_write(self, sender, pks, using=None, **kwargs):
+        self.invalidate_pks(sender, pks, using=using)
+
+    def invalidate_pks(self, model, pks, using=None):
+        """
+        Same as `invalidate` for primary keys of changed objects. Values of other
+        lookup fields are loaded with one query, so deleted objects are invalidated
+        only by primary key.
+        """
+        pks = [pk for pk in pks if pk is not None]
+        lookup_fields = self.lookup_fields.get(model, ('pk',))
+        other_fields = [field for field in lookup_fields if field not in ('pk', model._meta.pk.name)]
+        keys = [self.get_list_key(model)]
+        if len(other_fields) < len(lookup_fields):
+            keys.extend(self.get_object_key(model, 'pk', pk) for pk in pks)
+        if other_fields and pks:
+            for values in model._base_manager.using(using).filter(pk__in=pks).values_list(*other_fields):
+                keys.extend(self.get_object_key(model, field, value) for field, value in zip(other_fields, values))
+        self.delete_on_commit(keys, using)
+
+    def _get_dispatch_uid(self, model):
+        return '{0}.{1}.{2}'.format(self.key_prefix, id(self), model._meta.label_lower)
+
+    def get_object_token(self, model, lookup_field, value):
+        return self.get_token(self.get_object_key(model, lookup_field, value))
+
+    def get_list_token(self, model):
+        return self.get_token(self.get_list_key(model))
+
+    def get_token(self, key):
+        cache = self.get_cache()
+        token = cache.get(key)
+        if token is None:
+            # never reuse previous token, even if the cache evicted it
+            cache.add(key, uuid.uuid4().hex, None)
+            token = cache.get(key)
+        return token
+
+    def get_object_key(self, model, lookup_field, value):
+        if lookup_field == model._meta.pk.name:
+            lookup_field = 'pk'
+        return '{0}.{1}.{2}.{3}'.format(self.key_prefix, model._meta.label_lower, lookup_field, force_str(value))
+
+    def get_list_key(self, model):
+        return '{0}.{1}'.format(self.key_prefix, model._meta.label_lower)
+
+
+etag_store = ETagStore()
@@ -1,9 +1,26 @@
 from django.utils.translation import gettext_lazy as _
 from rest_framework import status
-from rest_framework.exceptions import APIException
+from rest_framework.exceptions import APIException, Throttled
 
 
 class PreconditionRequiredException(APIException):
     status_code = status.HTTP_428_PRECONDITION_REQUIRED
     default_detail = _('This "{method}" request is required to be conditional.')
     default_code = 'precondition_required'
+
+
+class PreconditionFailedException(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = _('Precondition failed.')
+    default_code = 'precondition_failed'
+
+
+class BulkOperationTooLargeException(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = _('Bulk operation is too large.')
+    default_code = 'bulk_operation_too_large'
+
+
+class BulkOperationThrottledException(Throttled):
+    default_detail = _('Too many bulk operations are running.')
+    default_code = 'bulk_operation_throttled'
@@ -1,10 +1,17 @@
+import time
+
+from django.core.cache import caches
+from django.db.models import Count, Max
 from django.utils.translation import get_language
 from django.db.models.query import EmptyQuerySet
 from django.core.exceptions import EmptyResultSet
 
 from django.utils.encoding import force_str
 
+from rest_framework.pagination import LimitOffsetPagination, PageNumberPagination
+
 from rest_framework_extensions import compat
+from rest_framework_extensions.settings import extensions_api_settings
 
 
 class AllArgsMixin:
@@ -14,6 +21,10 @@ class AllArgsMixin:
 
 
 class KeyBitBase:
+    # data doesn't depend on model instances state, so it could be reused
+    # for the key calculated after unsafe view method evaluation
+    reusable_after_write = False
+
     def __init__(self, params=None):
         self.params = params
 
@@ -30,6 +41,7 @@ class KeyBitDictBase(KeyBitBase):
     Look at HeadersKeyBit and QueryParamsKeyBit
 
     """
+    reusable_after_write = True
 
     def get_data(self, params, view_instance, view_method, request, args, kwargs):
         data = {}
@@ -67,6 +79,8 @@ class KeyBitDictBase(KeyBitBase):
 
 
 class UniqueViewIdKeyBit(KeyBitBase):
+    reusable_after_write = True
+
     def get_data(self, params, view_instance, view_method, request, args, kwargs):
         return '.'.join([
             view_instance.__module__,
@@ -75,6 +89,8 @@ class UniqueViewIdKeyBit(KeyBitBase):
 
 
 class UniqueMethodIdKeyBit(KeyBitBase):
+    reusable_after_write = True
+
     def get_data(self, params, view_instance, view_method, request, args, kwargs):
         return '.'.join([
             view_instance.__module__,
@@ -89,6 +105,7 @@ class LanguageKeyBit(KeyBitBase):
         'en'
 
     """
+    reusable_after_write = True
 
     def get_data(self, params, view_instance, view_method, request, args, kwargs):
         return force_str(get_language())
@@ -102,6 +119,7 @@ class FormatKeyBit(KeyBitBase):
     Return example for html:
         u'html'
     """
+    reusable_after_write = True
 
     def get_data(self, params, view_instance, view_method, request, args, kwargs):
         return force_str(request.accepted_renderer.format)
@@ -115,6 +133,7 @@ class UserKeyBit(KeyBitBase):
     Return example for authenticated (value is user id):
         u'10'
     """
+    reusable_after_write = True
 
     def get_data(self, params, view_instance, view_method, request, args, kwargs):
         if hasattr(request, 'user') and request.user and request.user.is_authenticated:
@@ -194,6 +213,9 @@ class PaginationKeyBit(QueryParamsKeyBit):
 
 
 class SqlQueryKeyBitBase(KeyBitBase):
+    # query text depends on lookup and filters, not on the rows it returns
+    reusable_after_write = True
+
     def _get_queryset_query_string(self, queryset):
         if isinstance(queryset, EmptyQuerySet):
             return None
@@ -272,7 +294,204 @@ class ListModelKeyBit(ModelInstanceKeyBitBase):
         return self._get_queryset_query_values(queryset)
 
 
+class ListPageModelKeyBit(KeyBitBase):
+    """
+    A fingerprint of the current page of the list: the filtered count, primary keys
+    and values of the fields from params, e.g. version or modification time, of the page
+    objects only. Use params='*' for values of all concrete fields.
+    Page number and limit/offset pagination are translated to a count and one narrow
+    LIMIT/OFFSET query, other paginators (e.g. cursor) paginate the queryset in their own way.
+    Invalid and out-of-range pages raise NotFound like the paginator, so the error
+    response gets no key.
+    Return example for params=['version']:
+        u"(5, [(1, 3), (2, 1)])"
+    """
+
+    def get_data(self, params, view_instance, view_method, request, args, kwargs):
+        assert params, 'ListPageModelKeyBit requires a list of field names or "*" as params'
+        queryset = view_instance.filter_queryset(view_instance.get_queryset())
+        if params == '*':
+            fields = [field.attname for field in queryset.model._meta.concrete_fields]
+        else:
+            fields = ['pk'] + list(params)
+        paginator = getattr(view_instance, 'paginator', None)
+        if paginator is None:
+            return force_str(list(queryset.values_list(*fields)))
+
+        page_slice = self.get_page_slice(paginator, request)
+        if page_slice == slice(None):
+            return force_str(list(queryset.values_list(*fields)))
+        if page_slice is not None:
+            count = queryset.count()
+            # pages after the first one must have objects, otherwise the paginator raises NotFound
+            if not (isinstance(paginator, PageNumberPagination) and 0 < page_slice.start >= count):
+                return force_str((count, list(queryset.values_list(*fields)[page_slice])))
+
+        page = paginator.paginate_queryset(queryset, request, view=view_instance)
+        if page is None:
+            return force_str(list(queryset.values_list(*fields)))
+        return force_str((self.get_count(paginator),
+                          [tuple(getattr(obj, field) for field in fields) for obj in page]))
+
+    def get_count(self, paginator):
+        """
+        Returns the filtered count from the paginator which has paginated the queryset.
+        """
+        if isinstance(paginator, PageNumberPagination):
+            return paginator.page.paginator.count
+        return getattr(paginator, 'count', None)
+
+    def get_page_slice(self, paginator, request):
+        """
+        Returns slice of the filtered queryset for the page or None if the paginator isn't supported.
+        """
+        if isinstance(paginator, PageNumberPagination):
+            page_size = paginator.get_page_size(request)
+            if not page_size:
+                return slice(None)
+            page_number = request.query_params.get(paginator.page_query_param) or 1
+            if page_number in paginator.last_page_strings:
+                return None
+            try:
+                page_number = int(page_number)
+            except (TypeError, ValueError):
+                return None
+            if page_number < 1:
+                return None
+            offset = (page_number - 1) * page_size
+            return slice(offset, offset + page_size)
+        elif isinstance(paginator, LimitOffsetPagination):
+            limit = paginator.get_limit(request)
+            if limit is None:
+                return slice(None)
+            offset = paginator.get_offset(request)
+            return slice(offset, offset + limit)
+        return None
+
+
+class RetrieveModelFieldsKeyBit(KeyBitBase):
+    """
+    A cheap validator of the model instance: values of few fields,
+    e.g. version or modification time, selected with a tiny query.
+    Return example for params=['version']:
+        [u'3']
+    """
+
+    def get_data(self, params, view_instance, view_method, request, args, kwargs):
+        assert params, 'RetrieveModelFieldsKeyBit requires a list of field names as params'
+        lookup_value = view_instance.kwargs[
+            view_instance.lookup_url_kwarg or view_instance.lookup_field]
+        try:
+            values = view_instance.filter_queryset(view_instance.get_queryset()).filter(
+                **{view_instance.lookup_field: lookup_value}
+            ).values_list(*params).first()
+        except ValueError:
+            return None
+        if values is None:
+            return None
+        return [force_str(value) for value in values]
+
+
+class ListModelAggregateKeyBit(KeyBitBase):
+    """
+    A cheap validator of a list of model instances: count of instances and maximum values
+    of few fields, e.g. version or modification time, aggregated by the database.
+    Return example for params=['updated_at']:
+        {'count': u'10', 'updated_at': u'2024-05-01 12:30:15+00:00'}
+    """
+
+    def get_data(self, params, view_instance, view_method, request, args, kwargs):
+        assert params, 'ListModelAggregateKeyBit requires a list of field names as params'
+        queryset = view_instance.filter_queryset(view_instance.get_queryset())
+        aggregates = {'__count': Count('pk')}
+        for field_name in params:
+            aggregates[field_name] = Max(field_name)
+        data = queryset.aggregate(**aggregates)
+        data['count'] = data.pop('__count')
+        return {key: force_str(value) for key, value in data.items()}
+
+
+class CacheTagVersionKeyBit(KeyBitBase):
+    """
+    Versions of cache tags, which you bump on data change with `bump_version`.
+    Return example for params=['books']:
+        {'books': u'1714566615000000001'}
+    """
+    cache_key_prefix = 'rest_framework_extensions.tag_version.'
+
+    def get_data(self, params, view_instance, view_method, request, args, kwargs):
+        assert params, 'CacheTagVersionKeyBit requires a list of tags as params'
+        cache = self.get_cache()
+        cache_keys = {tag: self.get_cache_key(tag) for tag in params}
+        versions = cache.get_many(cache_keys.values())
+        data = {}
+        for tag, cache_key in cache_keys.items():
+            if cache_key not in versions:
+                versions[cache_key] = self._add_version(cache, cache_key)
+            data[tag] = force_str(versions[cache_key])
+        return data
+
+    def bump_version(self, tag):
+        cache = self.get_cache()
+        cache_key = self.get_cache_key(tag)
+        try:
+            cache.incr(cache_key)
+        except ValueError:
+            self._add_version(cache, cache_key)
+
+    def get_cache(self):
+        return caches[extensions_api_settings.DEFAULT_USE_CACHE]
+
+    def get_cache_key(self, tag):
+        return self.cache_key_prefix + tag
+
+    def _add_version(self, cache, cache_key):
+        # version of unknown or evicted tag must not repeat any of previous ones
+        cache.add(cache_key, time.time_ns(), None)
+        return cache.get(cache_key)
+
+
+class RetrieveETagStoreKeyBit(KeyBitBase):
+    """
+    Token of the instance from the ETag store, changed on every write of the instance.
+    The model should be registered in the store with the view `lookup_field`.
+    Return example:
+        u'b1d6c8a1a3a94c7d9d4e6f0b0f6f3d2e'
+    """
+
+    def get_data(self, params, view_instance, view_method, request, args, kwargs):
+        from rest_framework_extensions.etag.store import etag_store
+
+        model = view_instance.get_queryset().model
+        lookup_field = view_instance.lookup_field
+        assert etag_store.is_lookup_field_registered(model, lookup_field), (
+            'RetrieveETagStoreKeyBit requires {0} to be registered in the ETag store '
+            'with "{1}" lookup field'.format(model._meta.label, lookup_field)
+        )
+        lookup_value = view_instance.kwargs[view_instance.lookup_url_kwarg or lookup_field]
+        return etag_store.get_object_token(model, lookup_field, lookup_value)
+
+
+class ListETagStoreKeyBit(KeyBitBase):
+    """
+    Token of the model list from the ETag store, changed on every write of any instance.
+    The model should be registered in the store.
+    Return example:
+        u'5f0c3ad1f1e24c4b8a9f7f1c2a0e4b6d'
+    """
+
+    def get_data(self, params, view_instance, view_method, request, args, kwargs):
+        from rest_framework_extensions.etag.store import etag_store
+
+        model = view_instance.get_queryset().model
+        assert etag_store.is_registered(model), (
+            'ListETagStoreKeyBit requires {0} to be registered in the ETag store'.format(model._meta.label)
+        )
+        return etag_store.get_list_token(model)
+
+
 class ArgsKeyBit(AllArgsMixin, KeyBitBase):
+    reusable_after_write = True
 
     def get_data(self, params, view_instance, view_method, request, args, kwargs):
         if params == '*':
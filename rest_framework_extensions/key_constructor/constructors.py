@@ -1,12 +1,17 @@
 import hashlib
 import json
 
+from rest_framework.permissions import SAFE_METHODS
+
 from rest_framework_extensions.key_constructor import bits
 from rest_framework_extensions.settings import extensions_api_settings
 
 
 class KeyConstructor:
-    def __init__(self, memoize_for_request=None, params=None):
+    # fingerprints of serializer classes, they can't change without a restart
+    _serializer_fingerprints = {}
+
+    def __init__(self, memoize_for_request=None, params=None, version=None, serializer_fingerprint=None):
         if memoize_for_request is None:
             self.memoize_for_request = extensions_api_settings.DEFAULT_KEY_CONSTRUCTOR_MEMOIZE_FOR_REQUEST
         else:
@@ -15,6 +20,8 @@ class KeyConstructor:
             self.params = {}
         else:
             self.params = params
+        self.version = version
+        self.serializer_fingerprint = serializer_fingerprint
         self.bits = self.get_bits()
 
     def get_bits(self):
@@ -69,16 +76,115 @@ class KeyConstructor:
             'args': args,
             'kwargs': kwargs,
         }
-        return self.prepare_key(
-            self.get_data_from_bits(**_kwargs)
-        )
+        key_dict = self.get_data_from_bits(**_kwargs)
+        if request is not None and request.method not in SAFE_METHODS:
+            # remember bits data for the key calculation after write
+            if not hasattr(request, '_key_constructor_bits_data'):
+                request._key_constructor_bits_data = {}
+            bits_data_key = self._get_bits_data_key(view_instance=view_instance, view_method=view_method)
+            request._key_constructor_bits_data[bits_data_key] = dict(key_dict)
+        return self._prepare_key_with_version(key_dict, **_kwargs)
+
+    def _prepare_key_with_version(self, key_dict, **kwargs):
+        version = self.get_version(**kwargs)
+        if version is not None:
+            key_dict['__version__'] = version
+        return self.prepare_key(key_dict)
+
+    def _get_bits_data_key(self, view_instance, view_method):
+        from rest_framework_extensions.utils import get_unique_method_id
+        return id(self), get_unique_method_id(view_instance=view_instance, view_method=view_method)
+
+    def get_key_after_write(self, view_instance, view_method, request, args, kwargs):
+        """
+        Key for the state after unsafe view method evaluation. Data of bits marked as
+        `reusable_after_write` is taken from the key calculated for the same request
+        before the evaluation, other bits are calculated again.
+        """
+        _kwargs = {
+            'view_instance': view_instance,
+            'view_method': view_method,
+            'request': request,
+            'args': args,
+            'kwargs': kwargs,
+        }
+        bits_data_key = self._get_bits_data_key(view_instance=view_instance, view_method=view_method)
+        bits_data = getattr(request, '_key_constructor_bits_data', {}).get(bits_data_key)
+        if bits_data is None:
+            value = self._get_key(**_kwargs)
+        else:
+            key_dict = self.get_data_from_bits(reusable_data=bits_data, **_kwargs)
+            value = self._prepare_key_with_version(key_dict, **_kwargs)
+        if self.memoize_for_request:
+            memoization_key = self._get_memoization_key(
+                view_instance=view_instance,
+                view_method=view_method,
+                args=args,
+                kwargs=kwargs
+            )
+            if not hasattr(request, '_key_constructor_cache'):
+                request._key_constructor_cache = {}
+            request._key_constructor_cache[memoization_key] = value
+        return value
+
+    def get_version(self, view_instance, view_method, request, args, kwargs):
+        """
+        Namespace of the key, changing it makes every previously calculated key obsolete.
+        Combines global (or constructor's) version, `cache_key_version` of the view
+        and, if asked, fingerprint of the view serializer fields.
+        """
+        if self.version is None:
+            version = extensions_api_settings.DEFAULT_KEY_CONSTRUCTOR_VERSION
+        else:
+            version = self.version
+        if self.serializer_fingerprint is None:
+            serializer_fingerprint = extensions_api_settings.DEFAULT_KEY_CONSTRUCTOR_SERIALIZER_FINGERPRINT
+        else:
+            serializer_fingerprint = self.serializer_fingerprint
+
+        versions = [version, getattr(view_instance, 'cache_key_version', None)]
+        if serializer_fingerprint and hasattr(view_instance, 'get_serializer_class'):
+            versions.append(self.get_serializer_fingerprint(view_instance.get_serializer_class(), view_instance))
+        if any(v is not None for v in versions):
+            return versions
+        return None
+
+    def get_serializer_fingerprint(self, serializer_class, view_instance=None):
+        try:
+            return self._serializer_fingerprints[serializer_class]
+        except KeyError:
+            # serializer could read the context, e.g. the request, while building its fields
+            serializer = serializer_class(context=self._get_serializer_context(view_instance))
+            description = json.dumps(self._describe_serializer_fields(serializer))
+            fingerprint = hashlib.md5(description.encode('utf-8')).hexdigest()
+            self._serializer_fingerprints[serializer_class] = fingerprint
+            return fingerprint
+
+    def _get_serializer_context(self, view_instance):
+        if hasattr(view_instance, 'get_serializer_context') and hasattr(view_instance, 'request'):
+            return view_instance.get_serializer_context()
+        return {}
+
+    def _describe_serializer_fields(self, serializer):
+        description = []
+        for field_name, field in serializer.fields.items():
+            item = [field_name, field.__class__.__name__, field.source, field.write_only]
+            nested = getattr(field, 'child', field)
+            if hasattr(nested, 'fields'):
+                item.append(self._describe_serializer_fields(nested))
+            description.append(item)
+        return description
 
     def prepare_key(self, key_dict):
         return hashlib.md5(json.dumps(key_dict, sort_keys=True).encode('utf-8')).hexdigest()
 
-    def get_data_from_bits(self, **kwargs):
+    def get_data_from_bits(self, reusable_data=None, **kwargs):
         result_dict = {}
         for bit_name, bit_instance in self.bits.items():
+            if (reusable_data is not None and bit_name in reusable_data and
+                    getattr(bit_instance, 'reusable_after_write', False)):
+                result_dict[bit_name] = reusable_data[bit_name]
+                continue
             if bit_name in self.params:
                 params = self.params[bit_name]
             else:
@@ -120,3 +226,30 @@ class DefaultAPIModelListKeyConstructor(KeyConstructor):
     to identify many resources.
     """
     list_model_values = bits.ListModelKeyBit()
+
+
+class DefaultAPIModelListPageKeyConstructor(KeyConstructor):
+    """
+    Use this constructor for paginated lists, when the values of the current
+    page model instances are required to identify the resource.
+    """
+    list_page_values = bits.ListPageModelKeyBit(params='*')
+    query_params = bits.QueryParamsKeyBit()
+
+
+class DefaultAPIModelInstanceETagStoreKeyConstructor(KeyConstructor):
+    """
+    Use this constructor for models registered in the ETag store,
+    it identifies the resource without database queries.
+    """
+    retrieve_etag_store = bits.RetrieveETagStoreKeyBit()
+
+
+class DefaultAPIModelListETagStoreKeyConstructor(KeyConstructor):
+    """
+    Use this constructor for models registered in the ETag store. Lists with different
+    filters and pages have different keys, it doesn't query the database.
+    """
+    list_etag_store = bits.ListETagStoreKeyBit()
+    list_sql_query = bits.ListSqlQueryKeyBit()
+    pagination = bits.PaginationKeyBit()
@@ -0,0 +1,146 @@
+import datetime
+import logging
+from functools import wraps, WRAPPER_ASSIGNMENTS
+
+from django.utils import timezone
+from django.utils.http import http_date, parse_http_date_safe
+
+from rest_framework import status
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from rest_framework_extensions.utils import prepare_header_name, log_precondition_failure
+
+logger = logging.getLogger('django.request')
+
+
+class LastModifiedProcessor:
+    """
+    Processes `If-Modified-Since` and `If-Unmodified-Since` headers like `ETAGProcessor`
+    processes `If-None-Match` and `If-Match`. Based on `django.views.decorators.http.condition`.
+
+    `last_modified_func` must return a datetime or None, it is called with the same
+    arguments as key constructors.
+    """
+
+    def __init__(self, last_modified_func=None, rebuild_after_method_evaluation=False):
+        assert last_modified_func is not None, (
+            'You must specify a function to calculate the last modification time '
+            'using the "last_modified_func" keyword argument.'
+        )
+        self.last_modified_func = last_modified_func
+        self.rebuild_after_method_evaluation = rebuild_after_method_evaluation
+
+    def __call__(self, func):
+        this = self
+
+        @wraps(func, assigned=WRAPPER_ASSIGNMENTS)
+        def inner(self, request, *args, **kwargs):
+            return this.process_conditional_request(
+                view_instance=self,
+                view_method=func,
+                request=request,
+                args=args,
+                kwargs=kwargs,
+            )
+
+        return inner
+
+    def process_conditional_request(self,
+                                    view_instance,
+                                    view_method,
+                                    request,
+                                    args,
+                                    kwargs):
+        res_last_modified = self.calculate_last_modified(
+            view_instance=view_instance,
+            view_method=view_method,
+            request=request,
+            args=args,
+            kwargs=kwargs,
+        )
+
+        if self.is_if_unmodified_since_failed(res_last_modified, request):
+            response = self._get_and_log_precondition_failed_response(request=request)
+        elif self.is_if_modified_since_failed(res_last_modified, request):
+            response = self.get_not_modified_response()
+        else:
+            response = view_method(view_instance, request, *args, **kwargs)
+            if self.rebuild_after_method_evaluation:
+                res_last_modified = self.calculate_last_modified(
+                    view_instance=view_instance,
+                    view_method=view_method,
+                    request=request,
+                    args=args,
+                    kwargs=kwargs,
+                )
+
+        if res_last_modified is not None and not response.has_header('Last-Modified'):
+            response['Last-Modified'] = http_date(res_last_modified)
+
+        return response
+
+    def calculate_last_modified(self,
+                                view_instance,
+                                view_method,
+                                request,
+                                args,
+                                kwargs):
+        """Returns last modification time as a timestamp with seconds precision of HTTP dates."""
+        if isinstance(self.last_modified_func, str):
+            last_modified_func = getattr(view_instance, self.last_modified_func)
+        else:
+            last_modified_func = self.last_modified_func
+        value = last_modified_func(
+            view_instance=view_instance,
+            view_method=view_method,
+            request=request,
+            args=args,
+            kwargs=kwargs,
+        )
+        if value is None:
+            return None
+        if not isinstance(value, datetime.datetime):
+            value = datetime.datetime.combine(value, datetime.time())
+        if not timezone.is_aware(value):
+            value = timezone.make_aware(value, datetime.timezone.utc)
+        return int(value.timestamp())
+
+    def get_header_date(self, request, header):
+        value = request.META.get(prepare_header_name(header))
+        if value:
+            return parse_http_date_safe(value)
+        return None
+
+    def is_if_modified_since_failed(self, res_last_modified, request):
+        # If-None-Match takes precedence, look at RFC 9110, section 13.1.3
+        if (res_last_modified is None or
+                request.method not in SAFE_METHODS or
+                request.META.get(prepare_header_name('if-none-match'))):
+            return False
+        if_modified_since = self.get_header_date(request, 'if-modified-since')
+        return if_modified_since is not None and res_last_modified <= if_modified_since
+
+    def is_if_unmodified_since_failed(self, res_last_modified, request):
+        # If-Match takes precedence, look at RFC 9110, section 13.1.4
+        if res_last_modified is None or request.META.get(prepare_header_name('if-match')):
+            return False
+        if_unmodified_since = self.get_header_date(request, 'if-unmodified-since')
+        return if_unmodified_since is not None and res_last_modified > if_unmodified_since
+
+    def get_not_modified_response(self):
+        return Response(status=status.HTTP_304_NOT_MODIFIED)
+
+    def get_precondition_failed_response(self):
+        response = Response(status=status.HTTP_412_PRECONDITION_FAILED)
+        # already logged or sampled out, django shouldn't log it once more
+        response._has_been_logged = True
+        return response
+
+    def _get_and_log_precondition_failed_response(self, request):
+        log_precondition_failure(logger, 'Precondition Failed: %s', request,
+                                 status.HTTP_412_PRECONDITION_FAILED)
+        return self.get_precondition_failed_response()
+
+
+last_modified = LastModifiedProcessor
@@ -0,0 +1,63 @@
+from django.db.models import Max
+
+from rest_framework_extensions.settings import extensions_api_settings
+
+
+class LastModifiedFuncBase:
+    """
+    Calculates last modification time of the resource from a model field.
+
+    Field name is taken from `field_name` argument, `last_modified_field` view
+    attribute or `DEFAULT_LAST_MODIFIED_FIELD` setting.
+    """
+
+    def __init__(self, field_name=None):
+        self.field_name = field_name
+
+    def __call__(self, **kwargs):
+        return self.get_last_modified(**kwargs)
+
+    def get_field_name(self, view_instance):
+        field_name = (
+            self.field_name or
+            getattr(view_instance, 'last_modified_field', None) or
+            extensions_api_settings.DEFAULT_LAST_MODIFIED_FIELD
+        )
+        assert field_name is not None, (
+            "'{0}' should include a 'last_modified_field' attribute or "
+            "'DEFAULT_LAST_MODIFIED_FIELD' setting should be defined".format(view_instance.__class__.__name__)
+        )
+        return field_name
+
+    def get_last_modified(self, view_instance, view_method, request, args, kwargs):
+        raise NotImplementedError()
+
+
+class ObjectLastModifiedFunc(LastModifiedFuncBase):
+    """
+    Returns field value of the object with the view lookup, without loading the object itself.
+    """
+
+    def get_last_modified(self, view_instance, view_method, request, args, kwargs):
+        lookup_value = view_instance.kwargs[
+            view_instance.lookup_url_kwarg or view_instance.lookup_field]
+        try:
+            queryset = view_instance.filter_queryset(view_instance.get_queryset()).filter(
+                **{view_instance.lookup_field: lookup_value}
+            )
+            return queryset.values_list(self.get_field_name(view_instance), flat=True).first()
+        except ValueError:
+            return None
+
+
+class ListLastModifiedFunc(LastModifiedFuncBase):
+    """
+    Returns maximum field value over `view.filter_queryset(view.get_queryset())`,
+    calculated by the database.
+    """
+
+    def get_last_modified(self, view_instance, view_method, request, args, kwargs):
+        queryset = view_instance.filter_queryset(view_instance.get_queryset())
+        return queryset.aggregate(
+            last_modified=Max(self.get_field_name(view_instance))
+        )['last_modified']
@@ -1,6 +1,8 @@
 from rest_framework_extensions.cache.mixins import CacheResponseMixin
 # from rest_framework_extensions.etag.mixins import ReadOnlyETAGMixin, ETAGMixin
-from rest_framework_extensions.bulk_operations.mixins import ListUpdateModelMixin, ListDestroyModelMixin
+from rest_framework_extensions.bulk_operations.mixins import (
+    BulkJobStatusMixin, ListCreateModelMixin, ListUpdateModelMixin, ListUpsertModelMixin, ListDestroyModelMixin
+)
 from rest_framework_extensions.settings import extensions_api_settings
 from django.core.exceptions import ValidationError
 from django.http import Http404
@@ -13,6 +13,12 @@ DEFAULTS = {
     'DEFAULT_CACHE_KEY_FUNC': 'rest_framework_extensions.utils.default_cache_key_func',
     'DEFAULT_OBJECT_CACHE_KEY_FUNC': 'rest_framework_extensions.utils.default_object_cache_key_func',
     'DEFAULT_LIST_CACHE_KEY_FUNC': 'rest_framework_extensions.utils.default_list_cache_key_func',
+    'DEFAULT_CACHE_RESPECT_CACHE_CONTROL': False,
+    'DEFAULT_CACHE_ALLOW_BYPASS': False,
+    'DEFAULT_CACHE_RESPECT_VARY': False,
+    'DEFAULT_CACHE_SHADOW': False,
+    'DEFAULT_CACHE_SHADOW_SAMPLE_RATE': 1.0,
+    'DEFAULT_CACHE_CONTENT_ETAG': False,
 
     # ETAG
     'DEFAULT_ETAG_FUNC': 'rest_framework_extensions.utils.default_etag_func',
@@ -22,10 +28,36 @@ DEFAULTS = {
     # API - ETAG
     'DEFAULT_API_OBJECT_ETAG_FUNC': 'rest_framework_extensions.utils.default_api_object_etag_func',
     'DEFAULT_API_LIST_ETAG_FUNC': 'rest_framework_extensions.utils.default_api_list_etag_func',
+    'DEFAULT_API_ETAG_VERSION_FIELD': 'version',
+    'DEFAULT_ETAG_STORE_CACHE': 'default',
+    'DEFAULT_PRECONDITION_LOG_INTERVAL': None,
+
+    # Last-Modified
+    'DEFAULT_OBJECT_LAST_MODIFIED_FUNC': 'rest_framework_extensions.utils.default_object_last_modified_func',
+    'DEFAULT_LIST_LAST_MODIFIED_FUNC': 'rest_framework_extensions.utils.default_list_last_modified_func',
+    'DEFAULT_LAST_MODIFIED_FIELD': None,
 
     # other
+    'DEFAULT_METRICS_HOOK': None,
     'DEFAULT_KEY_CONSTRUCTOR_MEMOIZE_FOR_REQUEST': False,
+    'DEFAULT_KEY_CONSTRUCTOR_VERSION': None,
+    'DEFAULT_KEY_CONSTRUCTOR_SERIALIZER_FINGERPRINT': False,
     'DEFAULT_BULK_OPERATION_HEADER_NAME': 'X-BULK-OPERATION',
+    'DEFAULT_BULK_OPERATION_REPORT': False,
+    'DEFAULT_BULK_CREATE_BATCH_SIZE': 1000,
+    'DEFAULT_BULK_UPDATE_BATCH_SIZE': 1000,
+    'DEFAULT_BULK_DELETE_BATCH_SIZE': None,
+    'DEFAULT_BULK_JOB_EXECUTOR': 'rest_framework_extensions.bulk_operations.jobs.thread_pool_executor',
+    'DEFAULT_BULK_JOB_MAX_WORKERS': 2,
+    'DEFAULT_BULK_JOB_BATCH_SIZE': 1000,
+    'DEFAULT_BULK_JOB_CACHE': 'default',
+    'DEFAULT_BULK_JOB_TIMEOUT': 24 * 60 * 60,
+    'DEFAULT_BULK_STREAM_CHUNK_SIZE': 64 * 1024,
+    'DEFAULT_BULK_MAX_ROWS': None,
+    'DEFAULT_BULK_MAX_ITEMS': None,
+    'DEFAULT_BULK_MAX_CONCURRENT_OPERATIONS': None,
+    'DEFAULT_BULK_CONCURRENCY_CACHE': 'default',
+    'DEFAULT_BULK_CONCURRENCY_TIMEOUT': 60 * 60,
     'DEFAULT_PARENT_LOOKUP_KWARG_NAME_PREFIX': 'parent_lookup_'
 }
 
@@ -39,6 +71,12 @@ IMPORT_STRINGS = [
     # API - ETAG
     'DEFAULT_API_OBJECT_ETAG_FUNC',
     'DEFAULT_API_LIST_ETAG_FUNC',
+    # Last-Modified
+    'DEFAULT_OBJECT_LAST_MODIFIED_FUNC',
+    'DEFAULT_LIST_LAST_MODIFIED_FUNC',
+    # other
+    'DEFAULT_METRICS_HOOK',
+    'DEFAULT_BULK_JOB_EXECUTOR',
 ]
 
 
@@ -1,4 +1,10 @@
+import hashlib
+import io
 import itertools
+import threading
+import time
+from urllib.parse import urlencode
+
 from packaging.version import Version
 
 import rest_framework
@@ -10,6 +16,10 @@ from rest_framework_extensions.key_constructor.constructors import (
     DefaultAPIModelInstanceKeyConstructor,
     DefaultAPIModelListKeyConstructor
 )
+from rest_framework_extensions.last_modified.functions import (
+    ObjectLastModifiedFunc,
+    ListLastModifiedFunc
+)
 from rest_framework_extensions.settings import extensions_api_settings
 
 
@@ -34,6 +44,119 @@ def prepare_header_name(name):
     return 'http_{0}'.format(name.strip().replace('-', '_')).upper()
 
 
+def get_content_hash(content):
+    """
+    Hash of rendered response content, used as its ETag
+    """
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def send_metric(name, value=1, **tags):
+    """
+    Passes the metric to DEFAULT_METRICS_HOOK if it is configured
+    """
+    metrics_hook = extensions_api_settings.DEFAULT_METRICS_HOOK
+    if metrics_hook is not None:
+        metrics_hook(name, value, **tags)
+
+
+_precondition_log_lock = threading.Lock()
+_precondition_log_state = {}
+
+
+def log_precondition_failure(logger, message, request, status_code):
+    """
+    Counts 412/428 responses with the metrics hook and logs them. With
+    DEFAULT_PRECONDITION_LOG_INTERVAL at most one record per status code is
+    logged in the interval, the number of skipped ones is added to the next record.
+    """
+    send_metric('precondition_failure', status_code=status_code)
+    interval = extensions_api_settings.DEFAULT_PRECONDITION_LOG_INTERVAL
+    suppressed = 0
+    if interval:
+        now = time.monotonic()
+        with _precondition_log_lock:
+            logged_at, suppressed = _precondition_log_state.get(status_code, (None, 0))
+            if logged_at is not None and now - logged_at < interval:
+                _precondition_log_state[status_code] = (logged_at, suppressed + 1)
+                return
+            _precondition_log_state[status_code] = (now, 0)
+    if suppressed:
+        logger.warning(message + ' (%s similar suppressed)', request.path, suppressed,
+                       extra={'status_code': status_code, 'request': request})
+    else:
+        logger.warning(message, request.path,
+                       extra={'status_code': status_code, 'request': request})
+
+
+def get_view_context(view_class,
+                     view_method,
+                     kwargs=None,
+                     query_params=None,
+                     method='GET',
+                     headers=None,
+                     user=None,
+                     request=None):
+    """
+    Build arguments for key functions (`view_instance`, `view_method`,
+    `request`, `args` and `kwargs`) as if `view_method` of `view_class` was
+    requested with given url kwargs, query params and headers. Host and scheme
+    are copied from `request`, if it is given, otherwise the first host of
+    `ALLOWED_HOSTS` is used.
+    """
+    from django.core.handlers.wsgi import WSGIRequest
+
+    kwargs = kwargs or {}
+    environ = get_request_host_environ(request)
+    environ.update({
+        'REQUEST_METHOD': method.upper(),
+        'SCRIPT_NAME': '',
+        'PATH_INFO': '/',
+        'QUERY_STRING': urlencode(query_params or {}, doseq=True),
+        'wsgi.input': io.BytesIO(),
+    })
+    environ.update({prepare_header_name(name): value for name, value in (headers or {}).items()})
+    http_request = WSGIRequest(environ)
+
+    view_instance = view_class()
+    # used by viewsets to resolve `action`
+    view_instance.action_map = {method.lower(): view_method.__name__}
+    view_instance.args = ()
+    view_instance.kwargs = kwargs
+    view_instance.headers = {}
+    request = view_instance.initialize_request(http_request, **kwargs)
+    if user is not None:
+        request.user = user
+    view_instance.request = request
+    view_instance.format_kwarg = view_instance.get_format_suffix(**kwargs)
+    request.accepted_renderer, request.accepted_media_type = view_instance.perform_content_negotiation(request)
+    return {
+        'view_instance': view_instance,
+        'view_method': view_method,
+        'request': request,
+        'args': (),
+        'kwargs': kwargs,
+    }
+
+
+def get_request_host_environ(request=None):
+    if request is not None:
+        return {
+            name: request.META[name]
+            for name in ('HTTP_HOST', 'SERVER_NAME', 'SERVER_PORT', 'HTTPS', 'wsgi.url_scheme')
+            if name in request.META
+        }
+    from django.conf import settings
+
+    # wildcards and subdomain patterns of ALLOWED_HOSTS are not hosts
+    hosts = [host for host in settings.ALLOWED_HOSTS if host != '*' and not host.startswith('.')]
+    return {
+        'SERVER_NAME': hosts[0] if hosts else 'localhost',
+        'SERVER_PORT': '80',
+        'wsgi.url_scheme': 'http',
+    }
+
+
 def get_unique_method_id(view_instance, view_method):
     # todo: test me as UniqueMethodIdKeyBit
     return '.'.join([
@@ -68,3 +191,6 @@ default_list_etag_func = default_list_cache_key_func
 # API (object-centered) functions
 default_api_object_etag_func = DefaultAPIModelInstanceKeyConstructor()
 default_api_list_etag_func = DefaultAPIModelListKeyConstructor()
+
+default_object_last_modified_func = ObjectLastModifiedFunc()
+default_list_last_modified_func = ListLastModifiedFunc()
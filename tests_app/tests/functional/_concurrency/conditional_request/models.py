@@ -7,3 +7,10 @@ class Book(models.Model):
     name = models.CharField(max_length=100, default=None, blank=True, null=True)
     author = models.CharField(max_length=100, default=None, blank=True, null=True)
     issn = models.CharField(max_length=100, default=None, blank=True, null=True)
+
+
+class VersionedBook(models.Model):
+    """A sample model for version-column optimistic locking."""
+
+    name = models.CharField(max_length=100, default=None, blank=True, null=True)
+    version = models.PositiveIntegerField(default=0)
@@ -1,8 +1,15 @@
 from rest_framework import serializers
-from .models import Book
+from .models import Book, VersionedBook
 
 
 class BookSerializer(serializers.ModelSerializer):
     class Meta:
         model = Book
         fields = '__all__'
+
+
+class VersionedBookSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = VersionedBook
+        fields = '__all__'
+        read_only_fields = ('version',)
@@ -1,10 +1,16 @@
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
-from .models import Book
+from rest_framework_extensions import utils
+from rest_framework_extensions.exceptions import PreconditionFailedException
+from .models import Book, VersionedBook
+from .views import VersionedBookViewSet
+from rest_framework_extensions.etag.store import etag_store
 from django.test import override_settings
+from tests_app.testutils import override_extensions_api_settings
 
 import json
+from unittest.mock import patch
 
 
 @override_settings(ROOT_URLCONF='tests_app.tests.functional._concurrency.conditional_request.urls')
@@ -154,6 +160,16 @@ class BookAPITestCases(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_428_PRECONDITION_REQUIRED, 'The response status code must '
                                                                                       'be 428!')
 
+    def test_book_conditional_update_fail_no_if_match_is_logged_once(self):
+        utils._precondition_log_state.clear()
+        url = reverse('book-detail', kwargs={'pk': self.book.id})
+        with override_extensions_api_settings(DEFAULT_PRECONDITION_LOG_INTERVAL=60):
+            with self.assertLogs('django.request', level='WARNING') as cm:
+                for i in range(5):
+                    response = self.client.put(url, data={'name': 'The Firm'})
+                    self.assertEqual(response.status_code, status.HTTP_428_PRECONDITION_REQUIRED)
+        self.assertEqual(len(cm.records), 1)
+
     def test_book_conditional_update_fail_first_then_succeed(self):
         """Test a conditional update of a book using 'If-Match' HTTP header, should yield HTTP 412, then 200."""
         book_response = self.client.get(reverse('book-detail', kwargs={'pk': self.book.id}),
@@ -333,3 +349,136 @@ class BookAPITestCases(APITestCase):
 
         self.assertEqual(book_response.status_code, status.HTTP_412_PRECONDITION_FAILED,
                          'The response status code must be 412!')
+
+
+@override_settings(ROOT_URLCONF='tests_app.tests.functional._concurrency.conditional_request.urls')
+class VersionedBookAPITestCases(APITestCase):
+    def setUp(self):
+        self.book = VersionedBook.objects.create(name='The Summons', version=3)
+        self.url = reverse('versionedbook-detail', kwargs={'pk': self.book.id})
+
+    def test_retrieve_etag_is_version(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['ETag'], '"3"')
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH='"3"')
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_conditional_update(self):
+        response = self.client.put(self.url, data={'name': 'The Firm'}, HTTP_IF_MATCH='"3"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['ETag'], '"4"')
+        self.assertEqual(response.data['version'], 4)
+        self.book.refresh_from_db()
+        self.assertEqual((self.book.name, self.book.version), ('The Firm', 4))
+
+    def test_conditional_partial_update_without_reading_row_values(self):
+        # select of the object and conditional update of its version + update of the object
+        with self.assertNumQueries(3 + 2):  # + savepoint and its release
+            response = self.client.patch(self.url, data={'name': 'The Firm'}, HTTP_IF_MATCH='"3"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_conditional_update_fail(self):
+        with self.assertLogs('django.request', level='WARNING'):
+            response = self.client.put(self.url, data={'name': 'The Firm'}, HTTP_IF_MATCH='"2"')
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.book.refresh_from_db()
+        self.assertEqual((self.book.name, self.book.version), ('The Summons', 3))
+
+    def test_conditional_update_fail_is_logged_once_with_metrics(self):
+        utils._precondition_log_state.clear()
+        metrics = []
+        with override_extensions_api_settings(DEFAULT_PRECONDITION_LOG_INTERVAL=60,
+                                              DEFAULT_METRICS_HOOK=lambda name, value, **tags: metrics.append(tags)):
+            with self.assertLogs('django.request', level='WARNING') as cm:
+                for i in range(3):
+                    response = self.client.put(self.url, data={'name': 'The Firm'}, HTTP_IF_MATCH='"2"')
+                    self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+                response = self.client.delete(self.url, HTTP_IF_MATCH='"2"')
+                self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(len(cm.records), 1)
+        self.assertEqual(metrics, [{'status_code': status.HTTP_412_PRECONDITION_FAILED}] * 4)
+
+    def test_conditional_update_fail_for_weak_etag(self):
+        with self.assertLogs('django.request', level='WARNING'):
+            response = self.client.put(self.url, data={'name': 'The Firm'}, HTTP_IF_MATCH='W/"3"')
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+
+    def test_conditional_update_fail_if_row_changed_after_it_was_loaded(self):
+        view = VersionedBookViewSet()
+        book = VersionedBook.objects.get(pk=self.book.pk)
+        VersionedBook.objects.filter(pk=self.book.pk).update(version=4)
+        with self.assertRaises(PreconditionFailedException):
+            view.increment_version(book, {3})
+        self.assertEqual(VersionedBook.objects.get(pk=self.book.pk).version, 4)
+
+    def test_conditional_update_fail_no_if_match(self):
+        with self.assertLogs('django.request', level='WARNING'):
+            response = self.client.put(self.url, data={'name': 'The Firm'})
+        self.assertEqual(response.status_code, status.HTTP_428_PRECONDITION_REQUIRED)
+
+    def test_unconditional_update_without_precondition(self):
+        with patch.object(VersionedBookViewSet, 'precondition_map', {}):
+            response = self.client.put(self.url, data={'name': 'The Firm'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['ETag'], '"4"')
+
+    def test_update_with_any_version(self):
+        response = self.client.put(self.url, data={'name': 'The Firm'}, HTTP_IF_MATCH='*')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['ETag'], '"4"')
+
+    def test_conditional_delete(self):
+        with self.assertLogs('django.request', level='WARNING'):
+            response = self.client.delete(self.url, HTTP_IF_MATCH='"2"')
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertTrue(VersionedBook.objects.filter(pk=self.book.pk).exists())
+
+        response = self.client.delete(self.url, HTTP_IF_MATCH='"3"')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(VersionedBook.objects.filter(pk=self.book.pk).exists())
+
+
+@override_settings(ROOT_URLCONF='tests_app.tests.functional._concurrency.conditional_request.urls')
+class StoredETagBookAPITestCases(APITestCase):
+    def setUp(self):
+        etag_store.get_cache().clear()
+        etag_store.register(Book)
+        self.addCleanup(etag_store.unregister, Book)
+        self.book = Book.objects.create(name='The Summons', author='Stephen King', issn='9780345531988')
+        self.url = reverse('stored-etag-book-detail', kwargs={'pk': self.book.id})
+        self.list_url = reverse('stored-etag-book-list')
+
+    def test_retrieve_not_modified_without_queries(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_list_not_modified_without_queries(self):
+        etag = self.client.get(self.list_url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_etags_change_on_write(self):
+        etag = self.client.get(self.url)['ETag']
+        list_etag = self.client.get(self.list_url)['ETag']
+        self.book.issn = '0123456789012'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_conditional_update(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(self.url, data={'name': 'The Firm'}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(self.client.get(self.url)['ETag'], etag)
+        with self.assertLogs('django.request', level='WARNING'):
+            response = self.client.put(self.url, data={'name': 'The Client'}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
@@ -1,10 +1,13 @@
 from django.urls import re_path, include
 from rest_framework import routers
 from .views import (BookViewSet, BookListCreateView, BookChangeView, BookCustomDestroyView,
-                    BookUnconditionalDestroyView, BookUnconditionalUpdateView)
+                    BookUnconditionalDestroyView, BookUnconditionalUpdateView, VersionedBookViewSet,
+                    StoredETagBookViewSet)
 
 router = routers.DefaultRouter()
 router.register(r'books', BookViewSet)
+router.register(r'versioned-books', VersionedBookViewSet)
+router.register(r'stored-etag-books', StoredETagBookViewSet, basename='stored-etag-book')
 
 urlpatterns = [
     # manually add endpoints for APIView instances
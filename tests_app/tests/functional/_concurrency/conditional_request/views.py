@@ -2,11 +2,15 @@ from rest_framework import viewsets
 from rest_framework import generics
 from rest_framework import status
 from rest_framework.response import Response
-from rest_framework_extensions.etag.mixins import APIETAGMixin
+from rest_framework_extensions.etag.mixins import APIETAGMixin, APIVersionETAGMixin
 from rest_framework_extensions.etag.decorators import api_etag
+from rest_framework_extensions.key_constructor.constructors import (
+    DefaultAPIModelInstanceETagStoreKeyConstructor,
+    DefaultAPIModelListETagStoreKeyConstructor
+)
 from rest_framework_extensions.utils import default_api_object_etag_func
-from .models import Book
-from .serializers import BookSerializer
+from .models import Book, VersionedBook
+from .serializers import BookSerializer, VersionedBookSerializer
 
 
 class BookViewSet(APIETAGMixin,
@@ -68,4 +72,22 @@ class BookUnconditionalUpdateView(generics.UpdateAPIView):
 
     @api_etag(etag_func=default_api_object_etag_func, precondition_map={})
     def update(self, request, *args, **kwargs):
-        return super().update(request, *args, **kwargs)
\ No newline at end of file
+        return super().update(request, *args, **kwargs)
+
+
+class VersionedBookViewSet(APIVersionETAGMixin,
+                           viewsets.ModelViewSet):
+    """Test the version column mixin with DRF viewset."""
+
+    queryset = VersionedBook.objects.all()
+    serializer_class = VersionedBookSerializer
+
+
+class StoredETagBookViewSet(APIETAGMixin,
+                            viewsets.ModelViewSet):
+    """Test the ETag store with DRF viewset."""
+
+    queryset = Book.objects.all()
+    serializer_class = BookSerializer
+    api_object_etag_func = DefaultAPIModelInstanceETagStoreKeyConstructor()
+    api_list_etag_func = DefaultAPIModelListETagStoreKeyConstructor()
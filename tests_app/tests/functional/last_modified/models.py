@@ -0,0 +1,6 @@
+from django.db import models
+
+
+class LastModifiedArticle(models.Model):
+    title = models.CharField(max_length=100)
+    updated_at = models.DateTimeField()
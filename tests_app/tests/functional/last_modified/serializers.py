@@ -0,0 +1,9 @@
+from rest_framework import serializers
+
+from .models import LastModifiedArticle
+
+
+class LastModifiedArticleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = LastModifiedArticle
+        fields = '__all__'
@@ -0,0 +1,75 @@
+import datetime
+
+from django.test import override_settings
+from django.urls import reverse
+from django.utils.http import http_date
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .models import LastModifiedArticle
+
+UPDATED_AT = datetime.datetime(2024, 5, 1, 12, 30, 15, tzinfo=datetime.timezone.utc)
+
+
+@override_settings(ROOT_URLCONF='tests_app.tests.functional.last_modified.urls')
+class LastModifiedMixinTest(APITestCase):
+    def setUp(self):
+        self.article = LastModifiedArticle.objects.create(title='First', updated_at=UPDATED_AT)
+        LastModifiedArticle.objects.create(title='Second', updated_at=UPDATED_AT - datetime.timedelta(days=1))
+        self.detail_url = reverse('lastmodifiedarticle-detail', kwargs={'pk': self.article.pk})
+        self.list_url = reverse('lastmodifiedarticle-list')
+
+    def test_should_add_last_modified_of_object(self):
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Last-Modified'], http_date(UPDATED_AT.timestamp()))
+
+    def test_should_add_max_last_modified_of_list(self):
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Last-Modified'], http_date(UPDATED_AT.timestamp()))
+
+    def test_should_return_304_for_not_modified_object_with_single_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=http_date(UPDATED_AT.timestamp()))
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_should_return_304_for_not_modified_list_with_single_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.list_url, HTTP_IF_MODIFIED_SINCE=http_date(UPDATED_AT.timestamp()))
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_should_return_200_for_modified_list(self):
+        LastModifiedArticle.objects.create(title='Third', updated_at=UPDATED_AT + datetime.timedelta(minutes=1))
+        response = self.client.get(self.list_url, HTTP_IF_MODIFIED_SINCE=http_date(UPDATED_AT.timestamp()))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 3)
+
+    def test_should_return_404_for_missing_object(self):
+        response = self.client.get(
+            reverse('lastmodifiedarticle-detail', kwargs={'pk': 100}),
+            HTTP_IF_MODIFIED_SINCE=http_date(UPDATED_AT.timestamp())
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_should_return_412_for_update_of_modified_object(self):
+        with self.assertLogs('django.request', level='WARNING'):
+            response = self.client.put(
+                self.detail_url,
+                {'title': 'Changed', 'updated_at': (UPDATED_AT + datetime.timedelta(hours=1)).isoformat()},
+                HTTP_IF_UNMODIFIED_SINCE=http_date(UPDATED_AT.timestamp() - 1)
+            )
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(LastModifiedArticle.objects.get(pk=self.article.pk).title, 'First')
+
+    def test_should_return_new_last_modified_after_update(self):
+        updated_at = UPDATED_AT + datetime.timedelta(hours=1)
+        response = self.client.put(
+            self.detail_url,
+            {'title': 'Changed', 'updated_at': updated_at.isoformat()},
+            HTTP_IF_UNMODIFIED_SINCE=http_date(UPDATED_AT.timestamp())
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Last-Modified'], http_date(updated_at.timestamp()))
@@ -0,0 +1,9 @@
+from rest_framework import routers
+
+from .views import LastModifiedArticleViewSet
+
+
+router = routers.DefaultRouter()
+router.register(r'articles', LastModifiedArticleViewSet)
+
+urlpatterns = router.urls
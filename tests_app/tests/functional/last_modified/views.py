@@ -0,0 +1,12 @@
+from rest_framework import viewsets
+
+from rest_framework_extensions.last_modified.mixins import LastModifiedMixin
+
+from .models import LastModifiedArticle
+from .serializers import LastModifiedArticleSerializer
+
+
+class LastModifiedArticleViewSet(LastModifiedMixin, viewsets.ModelViewSet):
+    queryset = LastModifiedArticle.objects.all()
+    serializer_class = LastModifiedArticleSerializer
+    last_modified_field = 'updated_at'
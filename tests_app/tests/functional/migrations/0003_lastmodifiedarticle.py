@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('functional', '0002_nestedroutermixinusermodel_code'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LastModifiedArticle',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=100)),
+                ('updated_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('functional', '0003_lastmodifiedarticle'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionedBook',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(blank=True, default=None, max_length=100, null=True)),
+                ('version', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('functional', '0004_versionedbook'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommentForListCreateModelMixin',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254)),
+                ('text', models.CharField(blank=True, max_length=100)),
+            ],
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('functional', '0005_commentforlistcreatemodelmixin'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReplyForListDestroyModelMixin',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('comment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='functional.commentforlistdestroymodelmixin')),
+            ],
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('functional', '0006_replyforlistdestroymodelmixin'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemForListUpsertModelMixin',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=10, unique=True)),
+                ('name', models.CharField(max_length=100)),
+                ('count', models.IntegerField(default=0)),
+                ('is_archived', models.BooleanField(default=False)),
+            ],
+        ),
+    ]
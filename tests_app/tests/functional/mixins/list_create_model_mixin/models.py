@@ -0,0 +1,6 @@
+from django.db import models
+
+
+class CommentForListCreateModelMixin(models.Model):
+    email = models.EmailField()
+    text = models.CharField(max_length=100, blank=True)
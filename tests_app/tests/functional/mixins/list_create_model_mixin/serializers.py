@@ -0,0 +1,8 @@
+from rest_framework import serializers
+from .models import CommentForListCreateModelMixin as Comment
+
+
+class CommentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Comment
+        fields = '__all__'
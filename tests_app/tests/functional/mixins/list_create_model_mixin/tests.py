@@ -0,0 +1,174 @@
+import json
+try:
+    from unittest.mock import patch
+except ImportError:
+    from mock import patch
+
+from django.db import connection
+from django.db.models.query import QuerySet
+from django.test import override_settings
+
+from rest_framework.test import APITestCase
+from rest_framework_extensions.bulk_operations.signals import post_bulk_change
+from rest_framework_extensions.settings import extensions_api_settings
+from rest_framework_extensions import utils
+
+from .models import CommentForListCreateModelMixin as Comment
+from tests_app.testutils import connect_bulk_change_receiver, override_extensions_api_settings
+
+
+@override_settings(ROOT_URLCONF='tests_app.tests.functional.mixins.list_create_model_mixin.urls')
+class ListCreateModelMixinTest(APITestCase):
+
+    def setUp(self):
+        self.protection_headers = {
+            utils.prepare_header_name(extensions_api_settings.DEFAULT_BULK_OPERATION_HEADER_NAME): 'true'
+        }
+        self.create_data = [
+            {'email': 'example@ya.ru'},
+            {'email': 'example@gmail.com', 'text': 'hello'},
+            {'email': 'example@yandex.ru'},
+        ]
+
+    def post(self, url, data, **extra):
+        return self.client.post(url, data=json.dumps(data), content_type='application/json', **extra)
+
+    def test_create_instance(self):
+        resp = self.post('/comments/', {'email': 'example@ya.ru'})
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.data['email'], 'example@ya.ru')
+        self.assertEqual(Comment.objects.count(), 1)
+
+    def test_bulk_create__without_protection_header(self):
+        resp = self.post('/comments/', self.create_data)
+        self.assertEqual(resp.status_code, 400)
+        expected_message = {
+            'detail': 'Header \'{0}\' should be provided for bulk operation.'.format(
+                extensions_api_settings.DEFAULT_BULK_OPERATION_HEADER_NAME
+            )
+        }
+        self.assertEqual(resp.data, expected_message)
+        self.assertEqual(Comment.objects.count(), 0)
+
+    def test_bulk_create__with_protection_header(self):
+        resp = self.post('/comments/', self.create_data, **self.protection_headers)
+        self.assertEqual(resp.status_code, 201)
+        comments = list(Comment.objects.order_by('pk'))
+        self.assertEqual(resp.data, {'ids': [comment.pk for comment in comments]})
+        self.assertEqual(
+            [(comment.email, comment.text) for comment in comments],
+            [('example@ya.ru', ''), ('example@gmail.com', 'hello'), ('example@yandex.ru', '')]
+        )
+
+    def test_bulk_create__should_send_bulk_change_signal_with_created_pks(self):
+        receiver = connect_bulk_change_receiver(self, Comment)
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.post('/comments/', self.create_data, **self.protection_headers)
+        self.assertEqual(resp.status_code, 201)
+        receiver.assert_called_once_with(
+            signal=post_bulk_change, sender=Comment, pks=resp.data['ids'], operation='create', using='default'
+        )
+
+    @override_extensions_api_settings(DEFAULT_BULK_OPERATION_HEADER_NAME=None)
+    def test_bulk_create__with_turned_off_protection_header(self):
+        resp = self.post('/comments/', self.create_data)
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(Comment.objects.count(), 3)
+
+    def test_bulk_create__should_return_errors_of_every_item_and_create_nothing(self):
+        self.create_data[1]['email'] = 'wrong'
+        resp = self.post('/comments/', self.create_data, **self.protection_headers)
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.data[0], {})
+        self.assertEqual(list(resp.data[1].keys()), ['email'])
+        self.assertEqual(resp.data[2], {})
+        self.assertEqual(Comment.objects.count(), 0)
+
+    def test_bulk_create__should_use_batch_size(self):
+        with patch.object(QuerySet, 'bulk_create', autospec=True, side_effect=QuerySet.bulk_create) as bulk_create:
+            self.post('/comments/', self.create_data, **self.protection_headers)
+            self.assertEqual(bulk_create.call_args[1]['batch_size'], 1000)
+
+            with override_extensions_api_settings(DEFAULT_BULK_CREATE_BATCH_SIZE=500):
+                self.post('/comments/', self.create_data, **self.protection_headers)
+            self.assertEqual(bulk_create.call_args[1]['batch_size'], 500)
+
+            self.post('/comments-with-batch-size/', self.create_data, **self.protection_headers)
+            self.assertEqual(bulk_create.call_args[1]['batch_size'], 2)
+        self.assertEqual(Comment.objects.count(), 9)
+
+    def test_bulk_create__should_return_ids_of_created_objects(self):
+        resp = self.post('/comments/', self.create_data, **self.protection_headers)
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.data, {'ids': list(Comment.objects.order_by('pk').values_list('pk', flat=True))})
+
+    def test_bulk_create__should_refuse_database_without_returned_rows(self):
+        with patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            with self.assertRaises(AssertionError):
+                self.post('/comments/', self.create_data, **self.protection_headers)
+        self.assertEqual(Comment.objects.count(), 0)
+
+
+@override_settings(ROOT_URLCONF='tests_app.tests.functional.mixins.list_create_model_mixin.urls')
+class ListCreateModelMixinTestBehaviour__streaming(APITestCase):
+
+    def setUp(self):
+        self.protection_headers = {
+            utils.prepare_header_name(extensions_api_settings.DEFAULT_BULK_OPERATION_HEADER_NAME): 'true'
+        }
+        self.create_data = [{'email': 'example{0}@ya.ru'.format(i)} for i in range(5)]
+
+    def test_should_create_streamed_json_array_in_batches(self):
+        with patch.object(QuerySet, 'bulk_create', autospec=True, side_effect=QuerySet.bulk_create) as bulk_create:
+            resp = self.client.post('/comments-with-streaming/', data=json.dumps(self.create_data),
+                                    content_type='application/json', **self.protection_headers)
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(bulk_create.call_count, 3)
+        comments = list(Comment.objects.order_by('pk'))
+        self.assertEqual(resp.data, {'ids': [comment.pk for comment in comments]})
+        self.assertEqual([comment.email for comment in comments], [item['email'] for item in self.create_data])
+
+    def test_should_create_ndjson(self):
+        data = '\n'.join(json.dumps(item) for item in self.create_data)
+        resp = self.client.post('/comments-with-streaming/', data=data,
+                                content_type='application/x-ndjson', **self.protection_headers)
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(Comment.objects.count(), 5)
+
+    @override_extensions_api_settings(DEFAULT_BULK_MAX_ITEMS=3)
+    def test_should_rollback_created_batches_of_payload_with_more_than_max_items(self):
+        resp = self.client.post('/comments-with-streaming/', data=json.dumps(self.create_data),
+                                content_type='application/json', **self.protection_headers)
+        self.assertEqual(resp.status_code, 413)
+        self.assertIn('more than 3 items', resp.data['detail'])
+        self.assertEqual(Comment.objects.count(), 0)
+
+    def test_should_create_single_object(self):
+        resp = self.client.post('/comments-with-streaming/', data=json.dumps(self.create_data[0]),
+                                content_type='application/json')
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(Comment.objects.count(), 1)
+
+    def test_should_return_errors_of_invalid_items_and_rollback_created_batches(self):
+        self.create_data[3]['email'] = 'wrong'
+        resp = self.client.post('/comments-with-streaming/', data=json.dumps(self.create_data),
+                                content_type='application/json', **self.protection_headers)
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(len(resp.data), 1)
+        self.assertEqual(resp.data[0]['index'], 3)
+        self.assertEqual(list(resp.data[0]['errors'].keys()), ['email'])
+        self.assertEqual(Comment.objects.count(), 0)
+
+    def test_should_return_parse_error_and_rollback_created_batches(self):
+        data = json.dumps(self.create_data)[:-10]
+        resp = self.client.post('/comments-with-streaming/', data=data,
+                                content_type='application/json', **self.protection_headers)
+        self.assertEqual(resp.status_code, 400)
+        self.assertTrue(resp.data['detail'].startswith('JSON parse error'))
+        self.assertEqual(Comment.objects.count(), 0)
+
+    def test_should_not_read_items_without_protection_header(self):
+        resp = self.client.post('/comments-with-streaming/', data=json.dumps(self.create_data),
+                                content_type='application/json')
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(Comment.objects.count(), 0)
@@ -0,0 +1,10 @@
+from rest_framework import routers
+
+from .views import CommentViewSet, CommentViewSetWithBatchSize, CommentViewSetWithStreaming
+
+
+viewset_router = routers.DefaultRouter()
+viewset_router.register('comments', CommentViewSet, basename='alt1')
+viewset_router.register('comments-with-batch-size', CommentViewSetWithBatchSize, basename='alt2')
+viewset_router.register('comments-with-streaming', CommentViewSetWithStreaming, basename='alt3')
+urlpatterns = viewset_router.urls
@@ -0,0 +1,19 @@
+from rest_framework import viewsets
+from rest_framework_extensions.bulk_operations.parsers import NDJSONParser, StreamingJSONParser
+from rest_framework_extensions.mixins import ListCreateModelMixin
+
+from .models import CommentForListCreateModelMixin as Comment
+from .serializers import CommentSerializer
+
+
+class CommentViewSet(ListCreateModelMixin, viewsets.ModelViewSet):
+    queryset = Comment.objects.all()
+    serializer_class = CommentSerializer
+
+
+class CommentViewSetWithBatchSize(CommentViewSet):
+    bulk_create_batch_size = 2
+
+
+class CommentViewSetWithStreaming(CommentViewSetWithBatchSize):
+    parser_classes = (StreamingJSONParser, NDJSONParser)
@@ -3,3 +3,7 @@ from django.db import models
 
 class CommentForListDestroyModelMixin(models.Model):
     email = models.EmailField()
+
+
+class ReplyForListDestroyModelMixin(models.Model):
+    comment = models.ForeignKey(CommentForListDestroyModelMixin, on_delete=models.CASCADE)
@@ -1,11 +1,24 @@
+try:
+    from unittest.mock import Mock, patch
+except ImportError:
+    from mock import Mock, patch
+
+from django.db import DatabaseError
+from django.db.models.query import QuerySet
 from django.test import override_settings
 
 from rest_framework.test import APITestCase
 from rest_framework_extensions.settings import extensions_api_settings
 from rest_framework_extensions import utils
+from rest_framework_extensions.bulk_operations.jobs import immediate_executor
+from rest_framework_extensions.bulk_operations.signals import post_bulk_change
 
-from .models import CommentForListDestroyModelMixin as Comment
-from tests_app.testutils import override_extensions_api_settings
+from .models import (
+    CommentForListDestroyModelMixin as Comment,
+    ReplyForListDestroyModelMixin as Reply
+)
+from .views import CommentViewSetWithCommittedBatches
+from tests_app.testutils import connect_bulk_change_receiver, override_extensions_api_settings
 
 
 @override_settings(ROOT_URLCONF='tests_app.tests.functional.mixins.list_destroy_model_mixin.urls')
@@ -86,3 +99,184 @@ class ListDestroyModelMixinTest(APITestCase):
         resp = self.client.delete('/comments-with-permission/', **self.protection_headers)
         self.assertEqual(resp.status_code, 404)
         self.assertEqual(Comment.objects.count(), 2)
+
+    @override_extensions_api_settings(DEFAULT_BULK_MAX_ROWS=1)
+    def test_bulk_destroy__should_not_destroy_more_than_max_rows(self):
+        resp = self.client.delete('/comments/', **self.protection_headers)
+        self.assertEqual(resp.status_code, 413)
+        self.assertEqual(Comment.objects.count(), 2)
+
+        resp = self.client.delete('/comments/?id=1', **self.protection_headers)
+        self.assertEqual(resp.status_code, 204)
+        self.assertEqual(Comment.objects.count(), 1)
+
+    def test_bulk_destroy__should_send_bulk_change_signal_with_deleted_pks(self):
+        receiver = connect_bulk_change_receiver(self, Comment)
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.delete('/comments/?id=1', **self.protection_headers)
+        self.assertEqual(resp.status_code, 204)
+        receiver.assert_called_once_with(
+            signal=post_bulk_change, sender=Comment, pks=[1], operation='delete', using='default'
+        )
+
+    @override_extensions_api_settings(DEFAULT_BULK_OPERATION_REPORT=True)
+    def test_bulk_destroy__should_report_deleted_counts_and_duration(self):
+        metrics_hook = Mock()
+        with override_extensions_api_settings(DEFAULT_METRICS_HOOK=metrics_hook):
+            resp = self.client.delete('/comments/?id=1', **self.protection_headers)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data['deleted'], 1)
+        self.assertEqual(resp.data['deleted_by_model'], {'functional.CommentForListDestroyModelMixin': 1})
+        self.assertGreaterEqual(resp.data['duration'], 0)
+        metrics_hook.assert_any_call(
+            'bulk_operation_rows', 1, operation='delete', view='CommentViewSet'
+        )
+
+
+@override_settings(ROOT_URLCONF='tests_app.tests.functional.mixins.list_destroy_model_mixin.urls')
+class ListDestroyModelMixinTestBehaviour__batches(APITestCase):
+
+    def setUp(self):
+        self.comments = [Comment.objects.create(id=i, email='example@ya.ru') for i in range(1, 6)]
+        Reply.objects.create(comment=self.comments[0])
+        Reply.objects.create(comment=self.comments[4])
+        self.protection_headers = {
+            utils.prepare_header_name(extensions_api_settings.DEFAULT_BULK_OPERATION_HEADER_NAME): 'true'
+        }
+
+    def delete_failing_on_second_batch(self):
+        calls = []
+
+        def delete(queryset):
+            calls.append(queryset)
+            if len(calls) == 2:
+                raise DatabaseError('Lock wait timeout exceeded')
+            return original_delete(queryset)
+
+        original_delete = QuerySet.delete
+        return patch.object(QuerySet, 'delete', autospec=True, side_effect=delete)
+
+    def test_should_delete_in_batches_and_report_counts_per_model(self):
+        with patch.object(QuerySet, 'delete', autospec=True, side_effect=QuerySet.delete) as delete:
+            resp = self.client.delete('/comments-with-batches/', **self.protection_headers)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(delete.call_count, 3)
+        self.assertEqual(resp.data, {
+            'deleted': 7,
+            'deleted_by_model': {
+                'functional.CommentForListDestroyModelMixin': 5,
+                'functional.ReplyForListDestroyModelMixin': 2,
+            }
+        })
+        self.assertEqual(Comment.objects.count(), 0)
+        self.assertEqual(Reply.objects.count(), 0)
+
+    def test_should_send_bulk_change_signal_for_every_batch(self):
+        receiver = connect_bulk_change_receiver(self, Comment)
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.delete('/comments-with-batches/', **self.protection_headers)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([call.kwargs['pks'] for call in receiver.call_args_list], [[1, 2], [3, 4], [5]])
+        self.assertEqual({call.kwargs['operation'] for call in receiver.call_args_list}, {'delete'})
+
+    def test_should_delete_filtered_queryset_in_batches(self):
+        resp = self.client.delete('/comments-with-batches/?id=2', **self.protection_headers)
+        self.assertEqual(resp.data, {
+            'deleted': 1,
+            'deleted_by_model': {'functional.CommentForListDestroyModelMixin': 1}
+        })
+        self.assertEqual(list(Comment.objects.values_list('id', flat=True)), [1, 3, 4, 5])
+
+    @override_extensions_api_settings(DEFAULT_BULK_DELETE_BATCH_SIZE=4)
+    def test_should_use_batch_size_from_settings(self):
+        with patch.object(QuerySet, 'delete', autospec=True, side_effect=QuerySet.delete) as delete:
+            resp = self.client.delete('/comments/', **self.protection_headers)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(delete.call_count, 2)
+        self.assertEqual(resp.data['deleted'], 7)
+
+    def test_should_rollback_all_batches_by_default(self):
+        with self.delete_failing_on_second_batch():
+            self.assertRaises(DatabaseError, self.client.delete, '/comments-with-batches/', **self.protection_headers)
+        self.assertEqual(Comment.objects.count(), 5)
+
+    def test_should_commit_every_batch_if_not_atomic(self):
+        with self.delete_failing_on_second_batch():
+            self.assertRaises(DatabaseError, self.client.delete, '/comments-with-committed-batches/',
+                              **self.protection_headers)
+        self.assertEqual(list(Comment.objects.values_list('id', flat=True)), [3, 4, 5])
+
+    def test_should_not_check_preconditions_if_not_atomic(self):
+        with patch.object(CommentViewSetWithCommittedBatches, 'bulk_etag_func', 'get_queryset'):
+            with self.assertRaisesMessage(AssertionError, 'bulk_delete_atomic = False'):
+                self.client.delete('/comments-with-committed-batches/', HTTP_IF_MATCH='*', **self.protection_headers)
+        self.assertEqual(Comment.objects.count(), 5)
+
+    def test_should_require_protection_header(self):
+        resp = self.client.delete('/comments-with-batches/')
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(Comment.objects.count(), 5)
+
+
+@override_settings(ROOT_URLCONF='tests_app.tests.functional.mixins.list_destroy_model_mixin.urls')
+@override_extensions_api_settings(DEFAULT_BULK_JOB_EXECUTOR=immediate_executor)
+class ListDestroyModelMixinTestBehaviour__bulk_jobs(APITestCase):
+
+    def setUp(self):
+        self.comments = [Comment.objects.create(id=i, email='example@ya.ru') for i in range(1, 6)]
+        Reply.objects.create(comment=self.comments[0])
+        self.headers = {
+            utils.prepare_header_name(extensions_api_settings.DEFAULT_BULK_OPERATION_HEADER_NAME): 'true',
+            'HTTP_PREFER': 'respond-async'
+        }
+
+    def test_should_delete_synchronously_without_prefer_header(self):
+        del self.headers['HTTP_PREFER']
+        resp = self.client.delete('/comments-with-bulk-jobs/', **self.headers)
+        self.assertEqual(resp.status_code, 204)
+        self.assertEqual(Comment.objects.count(), 0)
+
+    def test_should_start_job_after_commit_and_report_progress(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            resp = self.client.delete('/comments-with-bulk-jobs/?id=2', **self.headers)
+        self.assertEqual(resp.status_code, 202)
+        self.assertEqual(resp.data['status'], 'pending')
+        self.assertEqual(resp['Location'], resp.data['url'])
+        self.assertEqual(resp.data['url'], 'http://testserver/comments-with-bulk-jobs/bulk-jobs/{0}/'.format(
+            resp.data['id']))
+        self.assertEqual(Comment.objects.count(), 5)
+
+        for callback in callbacks:
+            callback()
+        resp = self.client.get(resp.data['url'])
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data['status'], 'succeeded')
+        self.assertEqual(resp.data['processed'], 1)
+        self.assertEqual(resp.data['result'], {
+            'deleted': 1,
+            'deleted_by_model': {'functional.CommentForListDestroyModelMixin': 1}
+        })
+        self.assertEqual(list(Comment.objects.values_list('id', flat=True)), [1, 3, 4, 5])
+
+    def test_should_delete_in_batches(self):
+        with patch.object(QuerySet, 'delete', autospec=True, side_effect=QuerySet.delete) as delete:
+            with self.captureOnCommitCallbacks(execute=True):
+                resp = self.client.delete('/comments-with-bulk-jobs/', **self.headers)
+        self.assertEqual(delete.call_count, 3)
+        resp = self.client.get(resp.data['url'])
+        self.assertEqual(resp.data['processed'], 5)
+        self.assertEqual(resp.data['result']['deleted'], 6)
+        self.assertEqual(Comment.objects.count(), 0)
+
+    def test_should_not_start_job_without_protection_header(self):
+        del self.headers[utils.prepare_header_name(extensions_api_settings.DEFAULT_BULK_OPERATION_HEADER_NAME)]
+        resp = self.client.delete('/comments-with-bulk-jobs/', **self.headers)
+        self.assertEqual(resp.status_code, 400)
+
+    def test_should_ignore_prefer_header_if_jobs_are_off(self):
+        resp = self.client.delete('/comments/', **self.headers)
+        self.assertEqual(resp.status_code, 204)
+
+    def test_should_return_404_for_unknown_job(self):
+        resp = self.client.get('/comments-with-bulk-jobs/bulk-jobs/{0}/'.format('a' * 32))
+        self.assertEqual(resp.status_code, 404)
@@ -1,9 +1,20 @@
 from rest_framework import routers
 
-from .views import CommentViewSet, CommentViewSetWithPermissions
+from .views import (
+    CommentViewSet,
+    CommentViewSetWithPermissions,
+    CommentViewSetWithBulkETag,
+    CommentViewSetWithBatches,
+    CommentViewSetWithCommittedBatches,
+    CommentViewSetWithBulkJobs,
+)
 
 
 viewset_router = routers.DefaultRouter()
 viewset_router.register('comments', CommentViewSet, basename='alt1')
 viewset_router.register('comments-with-permissions', CommentViewSetWithPermissions, basename='alt2')
+viewset_router.register('comments-with-etag', CommentViewSetWithBulkETag, basename='alt4')
+viewset_router.register('comments-with-batches', CommentViewSetWithBatches, basename='alt5')
+viewset_router.register('comments-with-committed-batches', CommentViewSetWithCommittedBatches, basename='alt6')
+viewset_router.register('comments-with-bulk-jobs', CommentViewSetWithBulkJobs, basename='alt10')
 urlpatterns = viewset_router.urls
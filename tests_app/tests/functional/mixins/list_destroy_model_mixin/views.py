@@ -2,7 +2,8 @@ import django_filters
 from rest_framework import viewsets, serializers
 from rest_framework import filters
 from rest_framework.permissions import DjangoModelPermissions
-from rest_framework_extensions.bulk_operations.mixins import ListDestroyModelMixin
+from rest_framework_extensions.etag.mixins import APIListETAGMixin
+from rest_framework_extensions.bulk_operations.mixins import BulkJobStatusMixin, ListDestroyModelMixin
 
 from .models import CommentForListDestroyModelMixin as Comment
 
@@ -30,3 +31,19 @@ class CommentViewSet(ListDestroyModelMixin, viewsets.ModelViewSet):
 
 class CommentViewSetWithPermissions(CommentViewSet):
     permission_classes = (DjangoModelPermissions,)
+
+
+class CommentViewSetWithBulkETag(APIListETAGMixin, CommentViewSet):
+    bulk_etag_func = 'api_list_etag_func'
+
+
+class CommentViewSetWithBatches(CommentViewSet):
+    bulk_delete_batch_size = 2
+
+
+class CommentViewSetWithCommittedBatches(CommentViewSetWithBatches):
+    bulk_delete_atomic = False
+
+
+class CommentViewSetWithBulkJobs(BulkJobStatusMixin, CommentViewSet):
+    bulk_job_batch_size = 2
@@ -1,19 +1,25 @@
 import json
 
 import unittest
+from unittest.mock import Mock, patch
 
 import django
 from django.test import override_settings
+from django.urls import NoReverseMatch, reverse
 
 from rest_framework.test import APITestCase
 from rest_framework_extensions.settings import extensions_api_settings
 from rest_framework_extensions import utils
+from rest_framework_extensions.bulk_operations.jobs import immediate_executor
+from rest_framework_extensions.bulk_operations.limits import bulk_semaphore
+from rest_framework_extensions.bulk_operations.signals import post_bulk_change
 
 from .models import (
     CommentForListUpdateModelMixin as Comment,
     UserForListUpdateModelMixin as User
 )
-from tests_app.testutils import override_extensions_api_settings
+from .views import CommentViewSetWithBulkETag, UserViewSet
+from tests_app.testutils import connect_bulk_change_receiver, override_extensions_api_settings
 
 
 @override_settings(ROOT_URLCONF='tests_app.tests.functional.mixins.list_update_model_mixin.urls')
@@ -37,6 +43,85 @@ class ListUpdateModelMixinTest(APITestCase):
             'email': 'example@yandex.ru'
         }
 
+    def test_bulk_update__with_matching_list_etag(self):
+        etag = self.client.get('/comments-with-etag/?id=1')['ETag']
+        resp = self.client.patch('/comments-with-etag/?id=1', data=self.patch_data,
+                                 HTTP_IF_MATCH=etag, **self.protection_headers)
+        self.assertEqual(resp.status_code, 204)
+        self.assertEqual(Comment.objects.get(id=1).email, self.patch_data['email'])
+
+    def test_bulk_update__with_changed_list_etag(self):
+        etag = self.client.get('/comments-with-etag/')['ETag']
+        Comment.objects.filter(id=2).update(email='changed@gmail.com')
+        resp = self.client.patch('/comments-with-etag/', data=self.patch_data,
+                                 HTTP_IF_MATCH=etag, **self.protection_headers)
+        self.assertEqual(resp.status_code, 412)
+        self.assertEqual(Comment.objects.get(id=1).email, 'example@ya.ru')
+
+    def test_bulk_update__without_list_etag(self):
+        with patch.object(CommentViewSetWithBulkETag, 'bulk_etag_func', staticmethod(lambda **kwargs: None)):
+            resp = self.client.patch('/comments-with-etag/', data=self.patch_data,
+                                     HTTP_IF_MATCH='"etag"', **self.protection_headers)
+        self.assertEqual(resp.status_code, 412)
+        self.assertEqual(Comment.objects.get(id=1).email, 'example@ya.ru')
+
+    @override_extensions_api_settings(DEFAULT_BULK_OPERATION_REPORT=True)
+    def test_bulk_update__should_report_updated_count_and_duration(self):
+        resp = self.client.patch('/comments/?id=1', data=self.patch_data, **self.protection_headers)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data['updated'], 1)
+        self.assertGreaterEqual(resp.data['duration'], 0)
+
+    def test_bulk_update__should_send_bulk_change_signal_with_updated_pks(self):
+        receiver = connect_bulk_change_receiver(self, Comment)
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.patch('/comments/?id=2', data=self.patch_data, **self.protection_headers)
+            # the signal is sent after the transaction is committed
+            receiver.assert_not_called()
+        self.assertEqual(resp.status_code, 204)
+        receiver.assert_called_once_with(
+            signal=post_bulk_change, sender=Comment, pks=[2], operation='update', using='default'
+        )
+
+    def test_bulk_update__should_send_rows_and_duration_metrics(self):
+        metrics_hook = Mock()
+        with override_extensions_api_settings(DEFAULT_METRICS_HOOK=metrics_hook):
+            resp = self.client.patch('/comments/', data=self.patch_data, **self.protection_headers)
+        self.assertEqual(resp.status_code, 204)
+        self.assertEqual(
+            [call.args[:2] for call in metrics_hook.call_args_list if call.args[0] == 'bulk_operation_rows'],
+            [('bulk_operation_rows', 2)]
+        )
+        duration_call = next(
+            call for call in metrics_hook.call_args_list if call.args[0] == 'bulk_operation_duration'
+        )
+        self.assertEqual(duration_call.kwargs, {'operation': 'update', 'view': 'CommentViewSet'})
+
+    def test_bulk_update__precondition_failures_should_be_sampled_and_counted(self):
+        utils._precondition_log_state.clear()
+        metrics_hook = Mock()
+        with override_extensions_api_settings(DEFAULT_PRECONDITION_LOG_INTERVAL=60,
+                                              DEFAULT_METRICS_HOOK=metrics_hook):
+            with self.assertLogs('django.request', level='WARNING') as cm:
+                for i in range(3):
+                    resp = self.client.patch('/comments-with-etag/', data=self.patch_data,
+                                             **self.protection_headers)
+                    self.assertEqual(resp.status_code, 428)
+                    resp = self.client.patch('/comments-with-etag/', data=self.patch_data,
+                                             HTTP_IF_MATCH='"wrong"', **self.protection_headers)
+                    self.assertEqual(resp.status_code, 412)
+        self.assertEqual(len(cm.records), 2)
+        self.assertEqual(
+            [call.kwargs['status_code'] for call in metrics_hook.call_args_list
+             if call.args[0] == 'precondition_failure'],
+            [428, 412] * 3
+        )
+
+    def test_bulk_update__without_if_match(self):
+        resp = self.client.patch('/comments-with-etag/', data=self.patch_data, **self.protection_headers)
+        self.assertEqual(resp.status_code, 428)
+        self.assertEqual(Comment.objects.get(id=1).email, 'example@ya.ru')
+
     def test_simple_response(self):
         resp = self.client.get('/comments/')
         expected = [
@@ -197,3 +282,230 @@ class ListUpdateModelMixinTestBehaviour__serializer_fields(APITestCase):
         resp = self.client.patch('/users/', data=json.dumps(data), content_type='application/json', **self.headers)
         self.assertEqual(resp.status_code, 204)
         self.assertEqual(self.get_fresh_user().email, self.user.email)
+
+
+@override_settings(ROOT_URLCONF='tests_app.tests.functional.mixins.list_update_model_mixin.urls')
+class ListUpdateModelMixinTestBehaviour__list_payload(APITestCase):
+
+    def setUp(self):
+        self.users = [
+            User.objects.create(
+                id=i,
+                name='Gennady',
+                age=20 + i,
+                last_name='Chibisov',
+                email='example@ya.ru',
+                password='somepassword'
+            ) for i in range(1, 4)
+        ]
+        self.headers = {
+            utils.prepare_header_name(extensions_api_settings.DEFAULT_BULK_OPERATION_HEADER_NAME): 'true'
+        }
+
+    def patch(self, url, data, **extra):
+        return self.client.patch(url, data=json.dumps(data), content_type='application/json', **extra)
+
+    def test_should_update_every_object_with_its_values(self):
+        data = [
+            {'id': 1, 'age': 31},
+            {'id': '3', 'surname': 'Ivanov', 'name': 'Ivan'},
+        ]
+        resp = self.patch('/users/', data, **self.headers)
+        self.assertEqual(resp.status_code, 204)
+        self.assertEqual(
+            list(User.objects.order_by('pk').values_list('age', 'last_name', 'name')),
+            [(31, 'Chibisov', 'Gennady'), (22, 'Chibisov', 'Gennady'), (23, 'Ivanov', 'Gennady')]
+        )
+
+    def test_should_load_and_update_objects_with_few_queries(self):
+        data = [{'id': user.id, 'age': 40} for user in self.users]
+        # savepoint, in_bulk, bulk_update, savepoint release
+        with self.assertNumQueries(4):
+            resp = self.patch('/users/', data, **self.headers)
+        self.assertEqual(resp.status_code, 204)
+        self.assertEqual(set(User.objects.values_list('age', flat=True)), {40})
+
+    def test_should_return_errors_of_every_item_and_update_nothing(self):
+        data = [
+            {'id': 1, 'age': 31},
+            {'id': 2, 'age': 'Not integer value'},
+            {'id': 10, 'age': 31},
+            {'age': 31},
+            {'id': 'wrong', 'age': 31},
+        ]
+        resp = self.patch('/users/', data, **self.headers)
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.data[0], {})
+        self.assertEqual(list(resp.data[1].keys()), ['age'])
+        self.assertEqual(resp.data[2], {'id': ['Not found.']})
+        self.assertEqual(resp.data[3], {'id': ['This field is required.']})
+        self.assertEqual(list(resp.data[4].keys()), ['id'])
+        self.assertEqual(User.objects.get(pk=1).age, 21)
+
+    def test_should_update_only_objects_from_filtered_queryset(self):
+        Comment.objects.create(id=1, email='example@ya.ru')
+        Comment.objects.create(id=2, email='example@gmail.com')
+        resp = self.patch('/comments/?id=1', [{'id': 2, 'email': 'example@yandex.ru'}], **self.headers)
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.data, [{'id': ['Not found.']}])
+        self.assertEqual(Comment.objects.get(pk=2).email, 'example@gmail.com')
+
+    def test_should_send_bulk_change_signal_for_every_batch(self):
+        receiver = connect_bulk_change_receiver(self, User)
+        data = [{'id': 1, 'age': 31}, {'id': 3, 'age': 33}]
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.patch('/users/', data, **self.headers)
+        self.assertEqual(resp.status_code, 204)
+        receiver.assert_called_once_with(
+            signal=post_bulk_change, sender=User, pks=[1, 3], operation='update', using='default'
+        )
+
+    @override_extensions_api_settings(DEFAULT_BULK_OPERATION_REPORT=True)
+    def test_should_report_updated_count(self):
+        data = [{'id': 1, 'age': 31}, {'id': 2, 'age': 32}]
+        resp = self.patch('/users/', data, **self.headers)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data['updated'], 2)
+        self.assertIn('duration', resp.data)
+
+    def test_should_require_protection_header(self):
+        resp = self.patch('/users/', [{'id': 1, 'age': 31}])
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(User.objects.get(pk=1).age, 21)
+
+    def test_should_update_streamed_payloads_in_batches(self):
+        data = '\n'.join(json.dumps({'id': user.id, 'age': 40 + user.id}) for user in self.users)
+        resp = self.client.patch('/users-with-streaming/', data=data, content_type='application/x-ndjson',
+                                 **self.headers)
+        self.assertEqual(resp.status_code, 204)
+        self.assertEqual(list(User.objects.order_by('pk').values_list('age', flat=True)), [41, 42, 43])
+
+    def test_should_return_errors_of_invalid_streamed_payloads_and_rollback_updated_batches(self):
+        data = [{'id': 1, 'age': 31}, {'id': 2, 'age': 32}, {'id': 10, 'age': 33}]
+        resp = self.patch('/users-with-streaming/', data, **self.headers)
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.data, [{'index': 2, 'errors': {'id': ['Not found.']}}])
+        self.assertEqual(User.objects.get(pk=1).age, 21)
+
+
+@override_settings(ROOT_URLCONF='tests_app.tests.functional.mixins.list_update_model_mixin.urls')
+class ListUpdateModelMixinTestBehaviour__limits(APITestCase):
+
+    def setUp(self):
+        bulk_semaphore.get_cache().clear()
+        for i in range(1, 4):
+            Comment.objects.create(id=i, email='example@ya.ru')
+        self.headers = {
+            utils.prepare_header_name(extensions_api_settings.DEFAULT_BULK_OPERATION_HEADER_NAME): 'true'
+        }
+        self.patch_data = {'email': 'example@yandex.ru'}
+
+    def patch(self, url, data, **extra):
+        return self.client.patch(url, data=json.dumps(data), content_type='application/json', **extra)
+
+    def get_emails(self):
+        return list(Comment.objects.order_by('pk').values_list('email', flat=True))
+
+    @override_extensions_api_settings(DEFAULT_BULK_MAX_ROWS=2)
+    def test_should_not_update_more_than_max_rows(self):
+        resp = self.patch('/comments/', self.patch_data, **self.headers)
+        self.assertEqual(resp.status_code, 413)
+        self.assertEqual(resp.data['detail'].code, 'bulk_operation_too_large')
+        self.assertIn('more than 2 objects', resp.data['detail'])
+        self.assertEqual(self.get_emails(), ['example@ya.ru'] * 3)
+
+        resp = self.patch('/comments/?id=1', self.patch_data, **self.headers)
+        self.assertEqual(resp.status_code, 204)
+        self.assertEqual(self.get_emails(), ['example@yandex.ru', 'example@ya.ru', 'example@ya.ru'])
+
+    @override_extensions_api_settings(DEFAULT_BULK_MAX_ITEMS=2)
+    def test_should_not_update_list_payload_with_more_than_max_items(self):
+        data = [{'id': i, 'email': 'example@yandex.ru'} for i in range(1, 4)]
+        resp = self.patch('/comments/', data, **self.headers)
+        self.assertEqual(resp.status_code, 413)
+        self.assertIn('more than 2 items', resp.data['detail'])
+        self.assertEqual(self.get_emails(), ['example@ya.ru'] * 3)
+
+    @override_extensions_api_settings(DEFAULT_BULK_MAX_CONCURRENT_OPERATIONS=1)
+    def test_should_not_run_more_than_max_concurrent_operations_of_client(self):
+        slot = bulk_semaphore.acquire('ident.127.0.0.1', 1)
+        resp = self.patch('/comments/', self.patch_data, **self.headers)
+        self.assertEqual(resp.status_code, 429)
+        self.assertEqual(resp.data['detail'].code, 'bulk_operation_throttled')
+        self.assertEqual(self.get_emails(), ['example@ya.ru'] * 3)
+
+        bulk_semaphore.release(slot)
+        resp = self.patch('/comments/', self.patch_data, **self.headers)
+        self.assertEqual(resp.status_code, 204)
+        # the slot is released after the operation
+        self.assertIsNotNone(bulk_semaphore.acquire('ident.127.0.0.1', 1))
+
+    @override_extensions_api_settings(DEFAULT_BULK_MAX_CONCURRENT_OPERATIONS=1, DEFAULT_BULK_MAX_ROWS=2)
+    def test_should_release_slot_of_rejected_operation(self):
+        resp = self.patch('/comments/', self.patch_data, **self.headers)
+        self.assertEqual(resp.status_code, 413)
+        self.assertIsNotNone(bulk_semaphore.acquire('ident.127.0.0.1', 1))
+
+
+@override_settings(ROOT_URLCONF='tests_app.tests.functional.mixins.list_update_model_mixin.urls')
+@override_extensions_api_settings(DEFAULT_BULK_JOB_EXECUTOR=immediate_executor)
+class ListUpdateModelMixinTestBehaviour__bulk_jobs(APITestCase):
+
+    def setUp(self):
+        for i in range(1, 4):
+            User.objects.create(
+                id=i,
+                name='Gennady',
+                age=20 + i,
+                last_name='Chibisov',
+                email='example@ya.ru',
+                password='somepassword'
+            )
+        self.headers = {
+            utils.prepare_header_name(extensions_api_settings.DEFAULT_BULK_OPERATION_HEADER_NAME): 'true',
+            'HTTP_PREFER': 'respond-async, wait=10'
+        }
+
+    def patch(self, url, data, **extra):
+        return self.client.patch(url, data=json.dumps(data), content_type='application/json', **extra)
+
+    def test_should_update_in_job(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.patch('/users-with-bulk-jobs/', {'surname': 'Ivanov'}, **self.headers)
+        self.assertEqual(resp.status_code, 202)
+        resp = self.client.get(resp.data['url'])
+        self.assertEqual(resp.data['status'], 'succeeded')
+        self.assertEqual(resp.data['result'], {'updated': 3})
+        self.assertEqual(set(User.objects.values_list('last_name', flat=True)), {'Ivanov'})
+
+    def test_should_add_job_status_route_only_with_status_mixin(self):
+        self.assertTrue(reverse('alt5-bulk-job', kwargs={'job_id': 'a' * 32}))
+        self.assertRaises(NoReverseMatch, reverse, 'alt3-bulk-job', kwargs={'job_id': 'a' * 32})
+
+    def test_should_update_in_job_without_status_route(self):
+        with patch.object(UserViewSet, 'bulk_jobs', True):
+            with self.captureOnCommitCallbacks(execute=True):
+                resp = self.patch('/users/', {'age': 50}, **self.headers)
+        self.assertEqual(resp.status_code, 202)
+        self.assertIsNone(resp.data['url'])
+        self.assertEqual(set(User.objects.values_list('age', flat=True)), {50})
+
+    @override_extensions_api_settings(DEFAULT_BULK_MAX_CONCURRENT_OPERATIONS=1)
+    def test_should_hold_semaphore_slot_until_job_is_finished(self):
+        bulk_semaphore.get_cache().clear()
+        with self.captureOnCommitCallbacks() as callbacks:
+            resp = self.patch('/users-with-bulk-jobs/', {'age': 50}, **self.headers)
+        self.assertEqual(resp.status_code, 202)
+        self.assertIsNone(bulk_semaphore.acquire('ident.127.0.0.1', 1))
+        for callback in callbacks:
+            callback()
+        self.assertIsNotNone(bulk_semaphore.acquire('ident.127.0.0.1', 1))
+
+    def test_should_save_job_error(self):
+        with self.assertLogs('rest_framework_extensions.bulk_operations', level='ERROR'):
+            with self.captureOnCommitCallbacks(execute=True):
+                resp = self.patch('/users-with-bulk-jobs/', {'age': 'Not integer value'}, **self.headers)
+        resp = self.client.get(resp.data['url'])
+        self.assertEqual(resp.data['status'], 'failed')
+        self.assertIn('Not integer value', resp.data['error'])
+        self.assertEqual(User.objects.get(pk=1).age, 21)
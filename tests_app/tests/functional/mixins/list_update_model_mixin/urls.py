@@ -1,10 +1,20 @@
 from rest_framework import routers
 
-from .views import CommentViewSet, CommentViewSetWithPermissions, UserViewSet
+from .views import (
+    CommentViewSet,
+    CommentViewSetWithPermissions,
+    CommentViewSetWithBulkETag,
+    UserViewSet,
+    UserViewSetWithBulkJobs,
+    UserViewSetWithStreaming,
+)
 
 
 viewset_router = routers.DefaultRouter()
 viewset_router.register('comments', CommentViewSet, basename='alt1')
 viewset_router.register('comments-with-permissions', CommentViewSetWithPermissions, basename='alt2')
+viewset_router.register('comments-with-etag', CommentViewSetWithBulkETag, basename='alt4')
 viewset_router.register('users', UserViewSet, basename='alt3')
+viewset_router.register('users-with-bulk-jobs', UserViewSetWithBulkJobs, basename='alt5')
+viewset_router.register('users-with-streaming', UserViewSetWithStreaming, basename='alt6')
 urlpatterns = viewset_router.urls
@@ -2,7 +2,9 @@ import django_filters
 from rest_framework import viewsets
 from rest_framework import filters
 from rest_framework.permissions import DjangoModelPermissions
-from rest_framework_extensions.mixins import ListUpdateModelMixin
+from rest_framework_extensions.etag.mixins import APIListETAGMixin
+from rest_framework_extensions.bulk_operations.parsers import NDJSONParser, StreamingJSONParser
+from rest_framework_extensions.mixins import BulkJobStatusMixin, ListUpdateModelMixin
 
 from .models import (
     CommentForListUpdateModelMixin as Comment,
@@ -30,6 +32,19 @@ class CommentViewSetWithPermissions(CommentViewSet):
     permission_classes = (DjangoModelPermissions,)
 
 
+class CommentViewSetWithBulkETag(APIListETAGMixin, CommentViewSet):
+    bulk_etag_func = 'api_list_etag_func'
+
+
 class UserViewSet(ListUpdateModelMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
-    serializer_class = UserSerializer
\ No newline at end of file
+    serializer_class = UserSerializer
+
+
+class UserViewSetWithBulkJobs(BulkJobStatusMixin, UserViewSet):
+    pass
+
+
+class UserViewSetWithStreaming(UserViewSet):
+    parser_classes = (StreamingJSONParser, NDJSONParser)
+    bulk_update_batch_size = 2
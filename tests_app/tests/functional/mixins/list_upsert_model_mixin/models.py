@@ -0,0 +1,8 @@
+from django.db import models
+
+
+class ItemForListUpsertModelMixin(models.Model):
+    code = models.CharField(max_length=10, unique=True)
+    name = models.CharField(max_length=100)
+    count = models.IntegerField(default=0)
+    is_archived = models.BooleanField(default=False)
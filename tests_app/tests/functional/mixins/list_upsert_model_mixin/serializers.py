@@ -0,0 +1,13 @@
+from rest_framework import serializers
+from .models import ItemForListUpsertModelMixin as Item
+
+
+class ItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Item
+        fields = [
+            'id',
+            'code',
+            'name',
+            'count'
+        ]
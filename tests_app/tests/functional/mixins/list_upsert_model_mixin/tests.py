@@ -0,0 +1,162 @@
+import json
+try:
+    from unittest.mock import patch
+except ImportError:
+    from mock import patch
+
+from django.db import connection
+from django.test import override_settings
+
+from rest_framework.test import APITestCase
+from rest_framework_extensions.bulk_operations.signals import post_bulk_change
+from rest_framework_extensions.settings import extensions_api_settings
+from rest_framework_extensions import utils
+
+from .models import ItemForListUpsertModelMixin as Item
+from .views import ItemViewSet
+from tests_app.testutils import connect_bulk_change_receiver, override_extensions_api_settings
+
+
+class ListUpsertModelMixinTestMixin:
+
+    def setUp(self):
+        self.items = [
+            Item.objects.create(code='a', name='Apple', count=1),
+            Item.objects.create(code='b', name='Banana', count=2),
+        ]
+        self.headers = {
+            utils.prepare_header_name(extensions_api_settings.DEFAULT_BULK_OPERATION_HEADER_NAME): 'true'
+        }
+        self.data = [
+            {'code': 'b', 'name': 'Blueberry', 'count': 20},
+            {'code': 'c', 'name': 'Cherry', 'count': 3},
+        ]
+
+    def put(self, url, data, **extra):
+        return self.client.put(url, data=json.dumps(data), content_type='application/json', **extra)
+
+    def get_items(self):
+        return list(Item.objects.order_by('code').values_list('code', 'name', 'count'))
+
+    def test_should_update_existing_and_create_new_objects(self):
+        resp = self.put('/items/', self.data, **self.headers)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data, [
+            {'id': self.items[1].pk, 'status': 'updated'},
+            {'id': Item.objects.get(code='c').pk, 'status': 'created'},
+        ])
+        self.assertEqual(self.get_items(), [('a', 'Apple', 1), ('b', 'Blueberry', 20), ('c', 'Cherry', 3)])
+
+    def test_should_send_bulk_change_signal_with_upserted_pks(self):
+        receiver = connect_bulk_change_receiver(self, Item)
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.put('/items/', self.data, **self.headers)
+        self.assertEqual(resp.status_code, 200)
+        receiver.assert_called_once_with(
+            signal=post_bulk_change, sender=Item, pks=[item['id'] for item in resp.data], operation='upsert',
+            using='default'
+        )
+
+    def test_should_upsert_streamed_items(self):
+        resp = self.put('/items-with-streaming/', self.data, **self.headers)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self.get_items(), [('a', 'Apple', 1), ('b', 'Blueberry', 20), ('c', 'Cherry', 3)])
+
+        data = '\n'.join(json.dumps(dict(item, count=0)) for item in self.data)
+        resp = self.client.put('/items-with-streaming/', data=data, content_type='application/x-ndjson',
+                               **self.headers)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self.get_items(), [('a', 'Apple', 1), ('b', 'Blueberry', 0), ('c', 'Cherry', 0)])
+
+    @override_extensions_api_settings(DEFAULT_BULK_MAX_ITEMS=1)
+    def test_should_not_upsert_streamed_items_more_than_max_items(self):
+        resp = self.put('/items-with-streaming/', self.data, **self.headers)
+        self.assertEqual(resp.status_code, 413)
+        self.assertEqual(self.get_items(), [('a', 'Apple', 1), ('b', 'Banana', 2)])
+
+    def test_should_update_only_update_fields(self):
+        resp = self.put('/items-with-update-fields/', self.data, **self.headers)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self.get_items(), [('a', 'Apple', 1), ('b', 'Banana', 20), ('c', 'Cherry', 3)])
+
+    def test_should_return_errors_of_every_item_and_change_nothing(self):
+        self.data.append({'code': 'd', 'name': 'Date', 'count': 'wrong'})
+        resp = self.put('/items/', self.data, **self.headers)
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.data[:2], [{}, {}])
+        self.assertEqual(list(resp.data[2].keys()), ['count'])
+        self.assertEqual(self.get_items(), [('a', 'Apple', 1), ('b', 'Banana', 2)])
+
+    def test_should_not_accept_duplicate_items(self):
+        self.data.append({'code': 'c', 'name': 'Coconut', 'count': 4})
+        resp = self.put('/items/', self.data, **self.headers)
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.data[2], {'non_field_errors': ['Duplicate item.']})
+        self.assertEqual(Item.objects.count(), 2)
+
+    def test_should_not_update_objects_out_of_queryset(self):
+        Item.objects.filter(code='b').update(is_archived=True)
+        resp = self.put('/not-archived-items/', self.data, **self.headers)
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.data, [{'non_field_errors': ['Not found.']}, {}])
+        self.assertEqual(self.get_items(), [('a', 'Apple', 1), ('b', 'Banana', 2)])
+
+    def test_should_require_unique_fields(self):
+        with patch.object(ItemViewSet, 'bulk_upsert_unique_fields', None):
+            with self.assertRaisesMessage(AssertionError, 'ItemViewSet requires bulk_upsert_unique_fields'):
+                self.put('/items/', self.data, **self.headers)
+
+    def test_should_require_protection_header(self):
+        resp = self.put('/items/', self.data)
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(Item.objects.count(), 2)
+
+    def test_should_update_instance(self):
+        resp = self.put('/items/{0}/'.format(self.items[0].pk), {'code': 'a', 'name': 'Apricot', 'count': 5})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(Item.objects.get(code='a').name, 'Apricot')
+
+
+@override_settings(ROOT_URLCONF='tests_app.tests.functional.mixins.list_upsert_model_mixin.urls')
+class ListUpsertModelMixinTest(ListUpsertModelMixinTestMixin, APITestCase):
+
+    def test_should_use_insert_on_conflict(self):
+        if not connection.features.supports_update_conflicts_with_target:
+            self.skipTest('INSERT ... ON CONFLICT is not supported')
+        # savepoint, existing objects lookup, in_bulk, insert, savepoint release
+        with self.assertNumQueries(5):
+            self.put('/items/', self.data, **self.headers)
+
+
+@override_settings(ROOT_URLCONF='tests_app.tests.functional.mixins.list_upsert_model_mixin.urls')
+class ListUpsertModelMixinTestBehaviour__without_update_conflicts(ListUpsertModelMixinTestMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        patcher = patch.object(connection.features, 'supports_update_conflicts_with_target', False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+@override_settings(ROOT_URLCONF='tests_app.tests.functional.mixins.list_upsert_model_mixin.urls')
+class ListUpsertModelMixinTestBehaviour__without_returned_rows(ListUpsertModelMixinTestMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        patcher = patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_should_return_ids_of_created_objects(self):
+        resp = self.put('/items/', self.data, **self.headers)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data[1], {'id': Item.objects.get(code='c').pk, 'status': 'created'})
+        self.assertIsNotNone(resp.data[1]['id'])
+
+
+    def test_should_return_ids_of_created_objects_without_update_conflicts(self):
+        with patch.object(connection.features, 'supports_update_conflicts_with_target', False):
+            resp = self.put('/items/', self.data, **self.headers)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data[1], {'id': Item.objects.get(code='c').pk, 'status': 'created'})
+        self.assertIsNotNone(resp.data[1]['id'])
@@ -0,0 +1,11 @@
+from rest_framework import routers
+
+from .views import ItemViewSet, ItemViewSetWithStreaming, ItemViewSetWithUpdateFields, NotArchivedItemViewSet
+
+
+viewset_router = routers.DefaultRouter()
+viewset_router.register('items', ItemViewSet, basename='alt1')
+viewset_router.register('items-with-update-fields', ItemViewSetWithUpdateFields, basename='alt2')
+viewset_router.register('not-archived-items', NotArchivedItemViewSet, basename='alt3')
+viewset_router.register('items-with-streaming', ItemViewSetWithStreaming, basename='alt4')
+urlpatterns = viewset_router.urls
@@ -0,0 +1,24 @@
+from rest_framework import viewsets
+from rest_framework_extensions.bulk_operations.parsers import NDJSONParser, StreamingJSONParser
+from rest_framework_extensions.mixins import ListUpsertModelMixin
+
+from .models import ItemForListUpsertModelMixin as Item
+from .serializers import ItemSerializer
+
+
+class ItemViewSet(ListUpsertModelMixin, viewsets.ModelViewSet):
+    queryset = Item.objects.all()
+    serializer_class = ItemSerializer
+    bulk_upsert_unique_fields = ['code']
+
+
+class ItemViewSetWithUpdateFields(ItemViewSet):
+    bulk_upsert_update_fields = ['count']
+
+
+class NotArchivedItemViewSet(ItemViewSet):
+    queryset = Item.objects.filter(is_archived=False)
+
+
+class ItemViewSetWithStreaming(ItemViewSet):
+    parser_classes = (StreamingJSONParser, NDJSONParser)
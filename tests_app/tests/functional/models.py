@@ -1,11 +1,14 @@
 # from .concurrency.conditional_request.models import *
 from .key_constructor.bits.models import *
 from .mixins.detail_serializer_mixin.models import *
+from .mixins.list_create_model_mixin.models import *
 from .mixins.list_destroy_model_mixin.models import *
 from .mixins.list_update_model_mixin.models import *
+from .mixins.list_upsert_model_mixin.models import *
 from .mixins.paginate_by_max_mixin.models import *
 from .permissions.extended_django_object_permissions.models import *
 from .routers.models import *
 from .routers.extended_default_router.models import *
 from .routers.nested_router_mixin.models import *
 from ._concurrency.conditional_request.models import *
+from .last_modified.models import *
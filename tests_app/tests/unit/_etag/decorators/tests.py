@@ -1,3 +1,8 @@
+try:
+    from unittest.mock import Mock, patch
+except ImportError:
+    from mock import Mock, patch
+
 from django.test import TestCase
 from django.utils.http import quote_etag
 
@@ -7,7 +12,10 @@ from rest_framework import status
 from rest_framework.permissions import SAFE_METHODS
 from rest_framework_extensions.exceptions import PreconditionRequiredException
 
-from rest_framework_extensions.etag.decorators import (etag, api_etag)
+from rest_framework_extensions.cache.decorators import cache_response
+from rest_framework_extensions.etag.decorators import (etag, api_etag, content_etag, parse_etags, ETag)
+from rest_framework_extensions import utils
+from rest_framework_extensions.utils import get_content_hash
 from rest_framework.test import APIRequestFactory
 from rest_framework_extensions.utils import prepare_header_name
 
@@ -27,6 +35,27 @@ def default_etag_func(**kwargs):
     return 'hello'
 
 
+class ParseETagsTest(TestCase):
+    def test_should_parse_strong_weak_and_unquoted_tags(self):
+        self.assertEqual(
+            parse_etags('W/"123", "456" 789,"abc"'),
+            frozenset([ETag('123', True), ETag('456', False), ETag('789', False), ETag('abc', False)])
+        )
+
+    def test_should_parse_any(self):
+        self.assertEqual(parse_etags('*'), frozenset([ETag('*', False)]))
+        self.assertEqual(parse_etags('"*"'), frozenset([ETag('*', False)]))
+
+    def test_should_ignore_garbage(self):
+        self.assertEqual(parse_etags(' , ,'), frozenset())
+
+    def test_should_memoize_parsed_values(self):
+        parse_etags.cache_clear()
+        parse_etags('"123", "456"')
+        parse_etags('"123", "456"')
+        self.assertEqual(parse_etags.cache_info().hits, 1)
+
+
 @override_extensions_api_settings(DEFAULT_ETAG_FUNC=default_etag_func)
 class ETAGProcessorTest(TestCase):
     def setUp(self):
@@ -168,6 +197,36 @@ class ETAGProcessorTestBehavior_rebuild_after_method_evaluation(TestCase):
         self.assertEqual(response.data, 'Response from method')
 
 
+    def test_should_use__get_key_after_write__if_asked_to_reuse_unchanged_bits(self):
+        calculate_etag = Mock(return_value='before')
+        calculate_etag.get_key_after_write = Mock(return_value='after')
+
+        class TestView(views.APIView):
+            @etag(calculate_etag, rebuild_after_method_evaluation=True, reuse_unchanged_bits=True)
+            def put(self, request, *args, **kwargs):
+                return Response('Response from method')
+
+        response = TestView().put(factory.put(''))
+        self.assertEqual(response.get('Etag'), quote_etag('after'))
+        self.assertEqual(calculate_etag.call_count, 1)
+        self.assertEqual(calculate_etag.get_key_after_write.call_count, 1)
+
+    def test_should_rebuild_with_etag_func_without__get_key_after_write(self):
+        call_stack = []
+
+        def calculate_etag(**kwargs):
+            call_stack.append(1)
+            return ''.join([str(i) for i in call_stack])
+
+        class TestView(views.APIView):
+            @etag(calculate_etag, rebuild_after_method_evaluation=True, reuse_unchanged_bits=True)
+            def put(self, request, *args, **kwargs):
+                return Response('Response from method')
+
+        response = TestView().put(factory.put(''))
+        self.assertEqual(response.get('Etag'), quote_etag('11'))
+
+
 class ETAGProcessorTestBehaviorMixin:
     def setUp(self):
         def calculate_etag(**kwargs):
@@ -327,6 +386,188 @@ class ETAGProcessorTestBehavior_if_match(ETAGProcessorTestBehaviorMixin, TestCas
         )
 
 
+class ETAGProcessorTestBehavior_weak(TestCase):
+    def setUp(self):
+        class TestView(views.APIView):
+            @etag(lambda **kwargs: '123', weak=True)
+            def get(self, request, *args, **kwargs):
+                return Response('Response from method')
+
+            @etag(lambda **kwargs: '123', weak=True)
+            def put(self, request, *args, **kwargs):
+                return Response('Response from method')
+
+        class StrongTestView(views.APIView):
+            @etag(lambda **kwargs: '123')
+            def get(self, request, *args, **kwargs):
+                return Response('Response from method')
+
+            @etag(lambda **kwargs: '123')
+            def put(self, request, *args, **kwargs):
+                return Response('Response from method')
+
+        self.view_instance = TestView()
+        self.strong_view_instance = StrongTestView()
+
+    def test_should_add_weak_etag(self):
+        response = self.view_instance.get(factory.get(''))
+        self.assertEqual(response.get('Etag'), 'W/"123"')
+
+    def test_should_use_weak_comparison_for_if_none_match(self):
+        for header_value in ('W/"123"', '"123"', 'W/"321", W/"123"'):
+            for view_instance in (self.view_instance, self.strong_view_instance):
+                response = view_instance.get(factory.get('', HTTP_IF_NONE_MATCH=header_value))
+                self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED, msg=header_value)
+
+        response = self.view_instance.get(factory.get('', HTTP_IF_NONE_MATCH='W/"321"'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_weak_etag_should_never_match_if_match(self):
+        with self.assertLogs('django.request', level='WARNING'):
+            response = self.view_instance.put(factory.put('', HTTP_IF_MATCH='"123"'))
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+
+        with self.assertLogs('django.request', level='WARNING'):
+            response = self.strong_view_instance.put(factory.put('', HTTP_IF_MATCH='W/"123"'))
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+
+    def test_weak_etag_should_match_if_match_any(self):
+        response = self.view_instance.put(factory.put('', HTTP_IF_MATCH='*'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class ETAGProcessorTestBehavior_precondition_failure(TestCase):
+    def setUp(self):
+        utils._precondition_log_state.clear()
+        self.metrics = []
+
+        class TestView(views.APIView):
+            @etag(lambda **kwargs: '123')
+            def put(self, request, *args, **kwargs):
+                return Response('Response from method')
+
+            @api_etag(dummy_api_etag_func)
+            def delete(self, request, *args, **kwargs):
+                return Response('Response from method')
+
+        self.view_instance = TestView()
+
+    def metrics_hook(self, name, value, **tags):
+        self.metrics.append((name, value, tags))
+
+    def test_should_send_metrics(self):
+        with override_extensions_api_settings(DEFAULT_METRICS_HOOK=self.metrics_hook):
+            with self.assertLogs('django.request', level='WARNING'):
+                response = self.view_instance.put(factory.put('', HTTP_IF_MATCH='"321"'))
+            self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+            with self.assertLogs('django.request', level='WARNING'):
+                self.assertRaises(PreconditionRequiredException, self.view_instance.delete, factory.delete(''))
+        self.assertEqual(self.metrics, [
+            ('precondition_failure', 1, {'status_code': status.HTTP_412_PRECONDITION_FAILED}),
+            ('precondition_failure', 1, {'status_code': status.HTTP_428_PRECONDITION_REQUIRED}),
+        ])
+
+    def test_should_mark_precondition_failed_response_as_logged(self):
+        with self.assertLogs('django.request', level='WARNING'):
+            response = self.view_instance.put(factory.put('', HTTP_IF_MATCH='"321"'))
+        self.assertTrue(response._has_been_logged)
+
+    def test_should_log_every_failure_by_default(self):
+        with self.assertLogs('django.request', level='WARNING') as cm:
+            for i in range(3):
+                self.view_instance.put(factory.put('', HTTP_IF_MATCH='"321"'))
+        self.assertEqual(len(cm.records), 3)
+
+    def test_should_sample_logs_with_interval(self):
+        with override_extensions_api_settings(DEFAULT_PRECONDITION_LOG_INTERVAL=60):
+            with patch('rest_framework_extensions.utils.time.monotonic', return_value=1000):
+                with self.assertLogs('django.request', level='WARNING') as cm:
+                    for i in range(3):
+                        self.view_instance.put(factory.put('', HTTP_IF_MATCH='"321"'))
+                    # other status codes are sampled separately
+                    self.assertRaises(PreconditionRequiredException, self.view_instance.delete, factory.delete(''))
+            self.assertEqual(len(cm.records), 2)
+
+            with patch('rest_framework_extensions.utils.time.monotonic', return_value=1061):
+                with self.assertLogs('django.request', level='WARNING') as cm:
+                    self.view_instance.put(factory.put('', HTTP_IF_MATCH='"321"'))
+            self.assertEqual(cm.records[0].getMessage(), 'Precondition Failed: / (2 similar suppressed)')
+
+
+class ContentETAGProcessorTest(TestCase):
+    def setUp(self):
+        self.calls = []
+        calls = self.calls
+
+        class TestView(views.APIView):
+            @content_etag()
+            def get(self, request, *args, **kwargs):
+                calls.append(request.method)
+                return Response('Response from method')
+
+            @content_etag()
+            def put(self, request, *args, **kwargs):
+                return Response('Response from method')
+
+        self.view_instance = TestView()
+        self.expected_etag_value = quote_etag(get_content_hash(b'"Response from method"'))
+
+    def test_should_add_hash_of_rendered_content(self):
+        response = self.view_instance.dispatch(factory.get(''))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['ETag'], self.expected_etag_value)
+        self.assertEqual(response.content, b'"Response from method"')
+
+    def test_should_return_304_with_empty_body_if_content_matches(self):
+        response = self.view_instance.dispatch(factory.get('', HTTP_IF_NONE_MATCH=self.expected_etag_value))
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], self.expected_etag_value)
+        self.assertEqual(response.render().content, b'')
+        self.assertEqual(self.calls, ['GET'])
+
+    def test_should_return_200_if_content_changed(self):
+        response = self.view_instance.dispatch(factory.get('', HTTP_IF_NONE_MATCH='"outdated"'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_should_not_process_unsafe_methods(self):
+        response = self.view_instance.dispatch(factory.put('', HTTP_IF_NONE_MATCH=self.expected_etag_value))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_should_not_add_etag_to_errors(self):
+        class TestView(views.APIView):
+            @content_etag()
+            def get(self, request, *args, **kwargs):
+                return Response('Not found', status=status.HTTP_404_NOT_FOUND)
+
+        response = TestView().dispatch(factory.get(''))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_should_add_weak_etag(self):
+        class TestView(views.APIView):
+            @content_etag(weak=True)
+            def get(self, request, *args, **kwargs):
+                return Response('Response from method')
+
+        response = TestView().dispatch(factory.get(''))
+        self.assertEqual(response['ETag'], 'W/' + self.expected_etag_value)
+
+    def test_should_use_etag_stored_by_cache_response(self):
+        class TestView(views.APIView):
+            @content_etag()
+            @cache_response(key_func=lambda **kwargs: 'content_etag_key', content_etag=True)
+            def get(self, request, *args, **kwargs):
+                return Response('Response from method')
+
+        view_instance = TestView()
+        view_instance.dispatch(factory.get(''))
+        with patch('rest_framework_extensions.utils.hashlib') as hashlib_mock:
+            response = view_instance.dispatch(factory.get('', HTTP_IF_NONE_MATCH=self.expected_etag_value))
+        self.assertFalse(hashlib_mock.blake2b.called)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
 class APIETAGProcessorTest(TestCase):
     """Unit test cases for the APIETAGProcessor and decorator functionality."""
 
@@ -0,0 +1,92 @@
+from django.core.cache import caches
+from django.test import TestCase
+
+from rest_framework_extensions.bulk_operations.signals import post_bulk_change
+from rest_framework_extensions.etag.store import ETagStore
+from rest_framework_extensions.settings import extensions_api_settings
+
+from tests_app.tests.unit.key_constructor.bits.models import BitTestModel
+
+
+class ETagStoreTest(TestCase):
+    def setUp(self):
+        caches[extensions_api_settings.DEFAULT_ETAG_STORE_CACHE].clear()
+        self.store = ETagStore()
+        self.store.register(BitTestModel)
+        self.addCleanup(self.store.unregister, BitTestModel)
+        self.instance = BitTestModel.objects.create()
+        self.other_instance = BitTestModel.objects.create()
+
+    def get_tokens(self):
+        return (
+            self.store.get_object_token(BitTestModel, 'pk', self.instance.pk),
+            self.store.get_object_token(BitTestModel, 'pk', self.other_instance.pk),
+            self.store.get_list_token(BitTestModel),
+        )
+
+    def test_should_return_stable_tokens_without_queries(self):
+        tokens = self.get_tokens()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_tokens(), tokens)
+        self.assertEqual(len(set(tokens)), 3)
+
+    def test_should_treat_pk_field_name_as_pk(self):
+        self.assertEqual(
+            self.store.get_object_token(BitTestModel, 'id', self.instance.pk),
+            self.store.get_object_token(BitTestModel, 'pk', self.instance.pk)
+        )
+
+    def test_should_change_tokens_on_save(self):
+        tokens = self.get_tokens()
+        self.instance.is_active = True
+        with self.captureOnCommitCallbacks(execute=True):
+            self.instance.save()
+        new_tokens = self.get_tokens()
+        self.assertNotEqual(new_tokens[0], tokens[0])
+        self.assertEqual(new_tokens[1], tokens[1])
+        self.assertNotEqual(new_tokens[2], tokens[2])
+
+    def test_should_change_tokens_on_delete(self):
+        tokens = self.get_tokens()
+        pk = self.instance.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            self.instance.delete()
+        self.assertNotEqual(self.store.get_object_token(BitTestModel, 'pk', pk), tokens[0])
+        self.assertNotEqual(self.store.get_list_token(BitTestModel), tokens[2])
+
+    def test_should_change_tokens_on_bulk_change(self):
+        tokens = self.get_tokens()
+        with self.captureOnCommitCallbacks(execute=True):
+            post_bulk_change.send(sender=BitTestModel, pks=[self.instance.pk], operation='update', using='default')
+        new_tokens = self.get_tokens()
+        self.assertNotEqual(new_tokens[0], tokens[0])
+        self.assertEqual(new_tokens[1], tokens[1])
+        self.assertNotEqual(new_tokens[2], tokens[2])
+
+    def test_should_load_other_lookup_fields_on_bulk_change(self):
+        self.store.register(BitTestModel, lookup_fields=['pk', 'is_active'])
+        token = self.store.get_object_token(BitTestModel, 'is_active', False)
+        with self.assertNumQueries(1), self.captureOnCommitCallbacks(execute=True):
+            post_bulk_change.send(sender=BitTestModel, pks=[self.instance.pk], operation='update', using='default')
+        self.assertNotEqual(self.store.get_object_token(BitTestModel, 'is_active', False), token)
+
+    def test_should_keep_tokens_until_write_is_committed(self):
+        tokens = self.get_tokens()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.instance.save()
+            # a read before the commit must not store a token for the old data
+            self.assertEqual(self.get_tokens(), tokens)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(self.get_tokens()[0], tokens[0])
+
+    def test_should_check_registered_lookup_fields(self):
+        self.assertTrue(self.store.is_lookup_field_registered(BitTestModel, 'pk'))
+        self.assertTrue(self.store.is_lookup_field_registered(BitTestModel, 'id'))
+        self.assertFalse(self.store.is_lookup_field_registered(BitTestModel, 'is_active'))
+
+    def test_should_not_track_unregistered_model(self):
+        self.store.unregister(BitTestModel)
+        tokens = self.get_tokens()
+        self.instance.save()
+        self.assertEqual(self.get_tokens(), tokens)
@@ -0,0 +1,66 @@
+import threading
+
+from django.core.cache import caches
+from django.test import TestCase
+
+from rest_framework_extensions.bulk_operations.jobs import (
+    BulkJobStore, get_job_spec, get_pk_batches, run_bulk_job, thread_pool_executor
+)
+from rest_framework_extensions.settings import extensions_api_settings
+
+from tests_app.testutils import override_extensions_api_settings
+from tests_app.tests.unit.key_constructor.bits.models import BitTestModel
+
+
+class BulkJobStoreTest(TestCase):
+    def setUp(self):
+        caches[extensions_api_settings.DEFAULT_BULK_JOB_CACHE].clear()
+        self.store = BulkJobStore()
+
+    def test_should_create_and_update_job(self):
+        job = self.store.create('delete', user_id=1)
+        self.assertEqual(self.store.get(job['id']), job)
+        self.assertEqual(job['status'], 'pending')
+        self.store.update(job['id'], status='running', processed=10)
+        self.assertEqual(self.store.get(job['id'])['processed'], 10)
+        self.assertEqual(self.store.get(job['id'])['user_id'], 1)
+
+    def test_should_use_cache_from_settings(self):
+        with override_extensions_api_settings(DEFAULT_BULK_JOB_CACHE='special_cache'):
+            job = self.store.create('delete')
+            self.assertIsNotNone(caches['special_cache'].get(self.store.get_key(job['id'])))
+
+
+class RunBulkJobTest(TestCase):
+    def setUp(self):
+        self.instances = [BitTestModel.objects.create(is_active=i < 3) for i in range(5)]
+
+    def test_get_pk_batches(self):
+        pks = [instance.pk for instance in self.instances]
+        self.assertEqual(list(get_pk_batches(BitTestModel.objects.all(), 2)), [pks[:2], pks[2:4], pks[4:]])
+        self.assertEqual(list(get_pk_batches(BitTestModel.objects.all(), 5)), [pks])
+        self.assertEqual(list(get_pk_batches(BitTestModel.objects.none(), 5)), [])
+
+    def test_should_run_job_with_pickled_query(self):
+        store = BulkJobStore()
+        job = store.create('update')
+        spec = get_job_spec(BitTestModel.objects.filter(is_active=True), 'update', 2, values={'is_active': False})
+        run_bulk_job(job['id'], spec)
+        job = store.get(job['id'])
+        self.assertEqual((job['status'], job['processed'], job['result']), ('succeeded', 3, {'updated': 3}))
+        self.assertFalse(BitTestModel.objects.filter(is_active=True).exists())
+
+
+class ThreadPoolExecutorTest(TestCase):
+    def test_should_run_function_in_other_thread(self):
+        done = threading.Event()
+        threads = []
+
+        def func(value):
+            threads.append((threading.current_thread().name, value))
+            done.set()
+
+        thread_pool_executor(func, 1)
+        self.assertTrue(done.wait(5))
+        self.assertTrue(threads[0][0].startswith('bulk_job'))
+        self.assertEqual(threads[0][1], 1)
@@ -0,0 +1,38 @@
+from django.core.cache import caches
+from django.test import TestCase
+
+from rest_framework_extensions.bulk_operations.limits import BulkOperationSemaphore
+from rest_framework_extensions.settings import extensions_api_settings
+
+from tests_app.testutils import override_extensions_api_settings
+
+
+class BulkOperationSemaphoreTest(TestCase):
+    def setUp(self):
+        caches[extensions_api_settings.DEFAULT_BULK_CONCURRENCY_CACHE].clear()
+        self.semaphore = BulkOperationSemaphore()
+
+    def test_should_acquire_up_to_limit_slots_for_every_client(self):
+        first = self.semaphore.acquire('user.1', 2)
+        second = self.semaphore.acquire('user.1', 2)
+        self.assertIsNotNone(first)
+        self.assertIsNotNone(second)
+        self.assertNotEqual(first, second)
+        self.assertIsNone(self.semaphore.acquire('user.1', 2))
+        self.assertIsNotNone(self.semaphore.acquire('user.2', 2))
+
+    def test_should_free_released_slot(self):
+        slot = self.semaphore.acquire('user.1', 1)
+        self.semaphore.release(slot)
+        self.assertIsNotNone(self.semaphore.acquire('user.1', 1))
+
+    def test_should_not_release_slot_taken_by_another_operation(self):
+        key, token = self.semaphore.acquire('user.1', 1)
+        self.semaphore.get_cache().set(key, 'another')
+        self.semaphore.release((key, token))
+        self.assertIsNone(self.semaphore.acquire('user.1', 1))
+
+    def test_should_expire_slots(self):
+        with override_extensions_api_settings(DEFAULT_BULK_CONCURRENCY_TIMEOUT=-1):
+            self.semaphore.acquire('user.1', 1)
+        self.assertIsNotNone(self.semaphore.acquire('user.1', 1))
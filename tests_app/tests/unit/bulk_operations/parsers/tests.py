@@ -0,0 +1,67 @@
+import io
+import json
+
+from django.test import TestCase
+
+from rest_framework.exceptions import ParseError
+from rest_framework_extensions.bulk_operations.parsers import NDJSONParser, StreamedItems, StreamingJSONParser
+
+from tests_app.testutils import override_extensions_api_settings
+
+
+class StreamingParsersTest(TestCase):
+    def setUp(self):
+        self.items = [{'id': i, 'name': 'ü' * i, 'values': [1.5, None, True]} for i in range(10)]
+        self.items += [123456, 'text', [], {}]
+
+    def get_array_body(self):
+        return ('  [ ' + ' , '.join(json.dumps(item, ensure_ascii=False) for item in self.items) + ' ]\n').encode()
+
+    def get_ndjson_body(self):
+        return ('\n'.join(json.dumps(item, ensure_ascii=False) for item in self.items) + '\n\n').encode()
+
+    def test_should_parse_array_lazily_with_any_chunk_size(self):
+        for chunk_size in (1, 2, 3, 7, 1024):
+            with override_extensions_api_settings(DEFAULT_BULK_STREAM_CHUNK_SIZE=chunk_size):
+                stream = io.BytesIO(self.get_array_body())
+                data = StreamingJSONParser().parse(stream)
+                self.assertIsInstance(data, StreamedItems)
+                if chunk_size < 10:
+                    self.assertLess(stream.tell(), len(stream.getvalue()))
+                self.assertEqual(list(data), self.items, msg=chunk_size)
+
+    def test_should_parse_numbers_cut_by_chunks(self):
+        items = [1.25, 12e5, -3.5E-2, 7, 1e+3]
+        body = ('[' + ','.join(json.dumps(item) for item in items) + ']').encode()
+        for chunk_size in range(1, 12):
+            with override_extensions_api_settings(DEFAULT_BULK_STREAM_CHUNK_SIZE=chunk_size):
+                data = StreamingJSONParser().parse(io.BytesIO(body))
+                self.assertEqual(list(data), items, msg=chunk_size)
+
+    def test_should_parse_ndjson_lazily_with_any_chunk_size(self):
+        for chunk_size in (1, 2, 3, 7, 1024):
+            with override_extensions_api_settings(DEFAULT_BULK_STREAM_CHUNK_SIZE=chunk_size):
+                data = NDJSONParser().parse(io.BytesIO(self.get_ndjson_body()))
+                self.assertEqual(list(data), self.items, msg=chunk_size)
+
+    def test_should_split_items_into_batches(self):
+        data = StreamingJSONParser().parse(io.BytesIO(self.get_array_body()))
+        self.assertEqual(list(data.batches(4)), [self.items[:4], self.items[4:8], self.items[8:12], self.items[12:]])
+
+    def test_should_iterate_only_once(self):
+        data = StreamingJSONParser().parse(io.BytesIO(b'[1, 2]'))
+        self.assertEqual(list(data), [1, 2])
+        self.assertRaises(RuntimeError, list, data)
+
+    def test_should_parse_other_documents_as_json_parser(self):
+        self.assertEqual(list(StreamingJSONParser().parse(io.BytesIO(b'[]'))), [])
+        self.assertEqual(StreamingJSONParser().parse(io.BytesIO(b' {"id": 1}')), {'id': 1})
+        self.assertRaises(ParseError, StreamingJSONParser().parse, io.BytesIO(b'{"id": }'))
+
+    def test_should_raise_parse_error_for_invalid_items(self):
+        for body in (b'[1,]', b'[1 2]', b'[1', b'[{"id": }]', b'[NaN]'):
+            for chunk_size in (1, 1024):
+                with override_extensions_api_settings(DEFAULT_BULK_STREAM_CHUNK_SIZE=chunk_size):
+                    data = StreamingJSONParser().parse(io.BytesIO(body))
+                    self.assertRaises(ParseError, list, data)
+        self.assertRaises(ParseError, list, NDJSONParser().parse(io.BytesIO(b'{"id": 1}\n{"id": }\n')))
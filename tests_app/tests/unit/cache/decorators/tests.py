@@ -1,26 +1,41 @@
 from django.core.cache import caches
-from django.test import TestCase
+from django.http import HttpResponse
+from django.test import TestCase, override_settings
+from django.utils.translation import override
 try:
     from unittest.mock import Mock, patch
 except ImportError:
     from mock import Mock, patch
-from rest_framework import views
+from rest_framework import serializers, views, viewsets
 from rest_framework.response import Response
 
-from rest_framework_extensions.cache.decorators import cache_response
+from rest_framework_extensions.cache.decorators import cache_response, invalidate_cache_response
+from rest_framework_extensions.cache.mixins import RetrieveCacheResponseMixin
+from rest_framework_extensions.key_constructor import bits
+from rest_framework_extensions.key_constructor.constructors import DefaultKeyConstructor
 from rest_framework_extensions.settings import extensions_api_settings
+from rest_framework_extensions.utils import get_content_hash
 from rest_framework.test import APIRequestFactory
-from tests_app.testutils import override_extensions_api_settings
+from tests_app.testutils import override_extensions_api_settings, TestKeyConstructor
+from tests_app.tests.unit.key_constructor.bits.models import BitTestModel
 
 factory = APIRequestFactory()
 
 
+class BitTestModelSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BitTestModel
+        fields = '__all__'
+
+
 class CacheResponseTest(TestCase):
     def setUp(self):
         super().setUp()
         self.request = factory.get('')
         self.cache = caches[extensions_api_settings.DEFAULT_USE_CACHE]
         self.cache.clear()
+        # some tests replace `set` of the shared cache instance with a mock
+        self.addCleanup(vars(self.cache).pop, 'set', None)
 
     def test_should_return_response_if_it_is_not_in_cache(self):
         class TestView(views.APIView):
@@ -342,3 +357,388 @@ class CacheResponseTest(TestCase):
             self.assertEqual(response._headers['test'], ('Test', 'foo'))
         else:
             self.assertEqual(response['test'], 'foo')
+
+
+class CacheResponseCacheControlTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = caches[extensions_api_settings.DEFAULT_USE_CACHE]
+        self.cache.clear()
+        self.call_count = 0
+
+    def get_view_instance(self, cache_control=None, **decorator_kwargs):
+        test = self
+
+        class TestView(views.APIView):
+            @cache_response(key_func=lambda **kwargs: 'cache_response_key', **decorator_kwargs)
+            def get(self, request, *args, **kwargs):
+                test.call_count += 1
+                headers = {'Cache-Control': cache_control} if cache_control else None
+                return Response('Response {0}'.format(test.call_count), headers=headers)
+
+            def allow_cache_bypass_for(self, request):
+                return request.META.get('HTTP_X_TRUSTED') == 'yes'
+
+        return TestView()
+
+    def test_should_ignore_cache_control_by_default(self):
+        view_instance = self.get_view_instance(cache_control='no-store')
+        view_instance.dispatch(request=factory.get(''))
+        self.assertIsNotNone(self.cache.get('cache_response_key'))
+
+    def test_should_not_store_response_with_no_store_or_private(self):
+        for cache_control in ('no-store', 'private, max-age=60', 'max-age=0', 'no-cache', 'no-cache, max-age=60'):
+            view_instance = self.get_view_instance(cache_control=cache_control, respect_cache_control=True)
+            view_instance.dispatch(request=factory.get(''))
+            self.assertIsNone(self.cache.get('cache_response_key'), msg=cache_control)
+
+    def test_should_not_serve_stored_response_with_no_cache(self):
+        view_instance = self.get_view_instance(cache_control='no-cache', respect_cache_control=True)
+        view_instance.dispatch(request=factory.get(''))
+        response = view_instance.dispatch(request=factory.get(''))
+        self.assertEqual(response.content, b'"Response 2"')
+
+    def test_should_not_store_response_to_request_with_no_store(self):
+        view_instance = self.get_view_instance(respect_cache_control=True)
+        response = view_instance.dispatch(request=factory.get('', HTTP_CACHE_CONTROL='no-store'))
+        self.assertEqual(response.content, b'"Response 1"')
+        self.assertIsNone(self.cache.get('cache_response_key'))
+
+    def test_should_not_serve_or_replace_stored_response_for_trusted_request_with_no_store(self):
+        view_instance = self.get_view_instance(respect_cache_control=True, allow_cache_bypass=True)
+        view_instance.dispatch(request=factory.get(''))
+        response = view_instance.dispatch(request=factory.get('', HTTP_CACHE_CONTROL='no-store'))
+        self.assertEqual(response.content, b'"Response 2"')
+        response = view_instance.dispatch(request=factory.get(''))
+        self.assertEqual(response.content, b'"Response 1"')
+
+    def test_should_derive_timeout_from_max_age(self):
+        cache_response_decorator = cache_response(
+            timeout=3, key_func=lambda **kwargs: 'cache_response_key', respect_cache_control=True)
+
+        for cache_control, expected_timeout in (('public, max-age=60', 60),
+                                                ('max-age=60, s-maxage=120', 120),
+                                                ('public', 3)):
+            class TestView(views.APIView):
+                @cache_response_decorator
+                def get(self, request, *args, **kwargs):
+                    return Response('Response', headers={'Cache-Control': cache_control})
+
+            with patch.object(cache_response_decorator.cache, 'set'):
+                TestView().dispatch(request=factory.get(''))
+                self.assertEqual(cache_response_decorator.cache.set.call_args[0][2], expected_timeout)
+
+    def test_should_not_bypass_cache_for_untrusted_request(self):
+        view_instance = self.get_view_instance(respect_cache_control=True)
+        view_instance.dispatch(request=factory.get(''))
+        response = view_instance.dispatch(request=factory.get('', HTTP_CACHE_CONTROL='no-cache'))
+        self.assertEqual(response.content, b'"Response 1"')
+
+    def test_should_bypass_and_refresh_cache_for_trusted_request(self):
+        view_instance = self.get_view_instance(respect_cache_control=True, allow_cache_bypass=True)
+        view_instance.dispatch(request=factory.get(''))
+        response = view_instance.dispatch(request=factory.get('', HTTP_CACHE_CONTROL='no-cache'))
+        self.assertEqual(response.content, b'"Response 2"')
+        response = view_instance.dispatch(request=factory.get(''))
+        self.assertEqual(response.content, b'"Response 2"')
+
+    def test_should_bypass_cache_with_pragma_if_cache_control_is_absent(self):
+        view_instance = self.get_view_instance(respect_cache_control=True, allow_cache_bypass=True)
+        view_instance.dispatch(request=factory.get(''))
+        response = view_instance.dispatch(request=factory.get('', HTTP_PRAGMA='no-cache'))
+        self.assertEqual(response.content, b'"Response 2"')
+        response = view_instance.dispatch(
+            request=factory.get('', HTTP_PRAGMA='no-cache', HTTP_CACHE_CONTROL='max-age=10'))
+        self.assertEqual(response.content, b'"Response 2"')
+
+    def test_should_use_view_method_to_decide_if_bypass_is_trusted(self):
+        view_instance = self.get_view_instance(
+            respect_cache_control=True, allow_cache_bypass='allow_cache_bypass_for')
+        view_instance.dispatch(request=factory.get(''))
+        response = view_instance.dispatch(request=factory.get('', HTTP_CACHE_CONTROL='no-cache'))
+        self.assertEqual(response.content, b'"Response 1"')
+        response = view_instance.dispatch(
+            request=factory.get('', HTTP_CACHE_CONTROL='no-cache', HTTP_X_TRUSTED='yes'))
+        self.assertEqual(response.content, b'"Response 2"')
+
+    @override_extensions_api_settings(
+        DEFAULT_CACHE_RESPECT_CACHE_CONTROL=True,
+        DEFAULT_CACHE_ALLOW_BYPASS=True
+    )
+    def test_should_use_cache_control_settings_by_default(self):
+        cache_response_decorator = cache_response()
+        self.assertTrue(cache_response_decorator.respect_cache_control)
+        self.assertTrue(cache_response_decorator.allow_cache_bypass)
+
+
+class CacheResponseVaryTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = caches[extensions_api_settings.DEFAULT_USE_CACHE]
+        self.cache.clear()
+
+    def get_view_instance(self, vary, **decorator_kwargs):
+        class TestView(views.APIView):
+            @cache_response(key_func=lambda **kwargs: 'cache_response_key', **decorator_kwargs)
+            def get(self, request, *args, **kwargs):
+                language = request.META.get('HTTP_ACCEPT_LANGUAGE', 'en')
+                return Response('Response in {0}'.format(language), headers={'Vary': vary})
+
+        return TestView()
+
+    def test_should_ignore_vary_by_default(self):
+        view_instance = self.get_view_instance(vary='Accept-Language')
+        view_instance.dispatch(request=factory.get('', HTTP_ACCEPT_LANGUAGE='ru'))
+        response = view_instance.dispatch(request=factory.get('', HTTP_ACCEPT_LANGUAGE='de'))
+        self.assertEqual(response.content, b'"Response in ru"')
+
+    def test_should_fold_vary_headers_into_key(self):
+        view_instance = self.get_view_instance(vary='Accept-Language', respect_vary=True)
+        response = view_instance.dispatch(request=factory.get('', HTTP_ACCEPT_LANGUAGE='ru'))
+        self.assertEqual(response.content, b'"Response in ru"')
+        response = view_instance.dispatch(request=factory.get('', HTTP_ACCEPT_LANGUAGE='de'))
+        self.assertEqual(response.content, b'"Response in de"')
+        self.assertEqual(self.cache.get('cache_response_key.vary')['headers'], ['accept', 'accept-language'])
+
+        response = view_instance.dispatch(request=factory.get('', HTTP_ACCEPT_LANGUAGE='ru'))
+        self.assertEqual(type(response), HttpResponse)
+        self.assertEqual(response.content, b'"Response in ru"')
+
+    def test_should_not_store_response_which_varies_on_everything(self):
+        view_instance = self.get_view_instance(vary='*', respect_vary=True)
+        view_instance.dispatch(request=factory.get(''))
+        self.assertIsNone(self.cache.get('cache_response_key.vary'))
+
+    @override_extensions_api_settings(
+        DEFAULT_CACHE_RESPECT_VARY=True
+    )
+    def test_should_use_vary_setting_by_default(self):
+        self.assertTrue(cache_response().respect_vary)
+
+
+class CacheResponseShadowTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = caches[extensions_api_settings.DEFAULT_USE_CACHE]
+        self.cache.clear()
+        self.call_count = 0
+
+    def get_view_instance(self, **decorator_kwargs):
+        test = self
+
+        class TestView(views.APIView):
+            @cache_response(**decorator_kwargs)
+            def get(self, request, *args, **kwargs):
+                test.call_count += 1
+                return Response('Response {0}'.format(test.call_count))
+
+        return TestView()
+
+    def test_should_always_return_fresh_response(self):
+        view_instance = self.get_view_instance(key_func=lambda **kwargs: 'cache_response_key', shadow=True)
+        response = view_instance.dispatch(request=factory.get(''))
+        self.assertEqual(type(response), Response)
+        self.assertEqual(response.data, 'Response 1')
+        with self.assertLogs('rest_framework_extensions.cache', level='WARNING'):
+            response = view_instance.dispatch(request=factory.get(''))
+        self.assertEqual(type(response), Response)
+        self.assertEqual(response.data, 'Response 2')
+        self.assertEqual(self.cache.get('cache_response_key')[0], b'"Response 1"')
+
+    def test_should_record_mismatch_with_key_bits(self):
+        view_instance = self.get_view_instance(key_func=TestKeyConstructor(), shadow=True)
+        view_instance.dispatch(request=factory.get(''))
+        with self.assertLogs('rest_framework_extensions.cache', level='WARNING') as cm:
+            view_instance.dispatch(request=factory.get(''))
+        self.assertEqual(len(cm.records), 1)
+        self.assertEqual(cm.records[0].key_bits, {'format': 'json', 'language': 'ru'})
+        self.assertEqual(cm.records[0].cache_key, TestKeyConstructor()(
+            view_instance=None, view_method=None, request=None, args=None, kwargs=None))
+
+    def test_should_not_record_mismatch_if_responses_are_equal(self):
+        class TestView(views.APIView):
+            @cache_response(key_func=lambda **kwargs: 'cache_response_key', shadow=True)
+            def get(self, request, *args, **kwargs):
+                return Response('Response')
+
+        view_instance = TestView()
+        view_instance.dispatch(request=factory.get(''))
+        with patch('rest_framework_extensions.cache.decorators.logger') as logger:
+            view_instance.dispatch(request=factory.get(''))
+        self.assertFalse(logger.warning.called)
+
+    def test_should_not_touch_cache_for_requests_out_of_sample(self):
+        cache_response_decorator = cache_response(shadow=True, shadow_sample_rate=0)
+        key_func = Mock(return_value='cache_response_key')
+        cache_response_decorator.key_func = key_func
+
+        class TestView(views.APIView):
+            @cache_response_decorator
+            def get(self, request, *args, **kwargs):
+                return Response('Response')
+
+        with patch.object(cache_response_decorator.cache, 'get') as cache_get:
+            TestView().dispatch(request=factory.get(''))
+        self.assertFalse(cache_get.called)
+        self.assertFalse(key_func.called)
+        self.assertIsNone(self.cache.get('cache_response_key'))
+
+    @override_extensions_api_settings(
+        DEFAULT_CACHE_SHADOW=True,
+        DEFAULT_CACHE_SHADOW_SAMPLE_RATE=0.5
+    )
+    def test_should_use_shadow_settings_by_default(self):
+        cache_response_decorator = cache_response()
+        self.assertTrue(cache_response_decorator.shadow)
+        self.assertEqual(cache_response_decorator.shadow_sample_rate, 0.5)
+
+
+class CacheResponseContentETAGTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = caches[extensions_api_settings.DEFAULT_USE_CACHE]
+        self.cache.clear()
+
+    def test_should_store_content_hash_as_etag(self):
+        class TestView(views.APIView):
+            @cache_response(key_func=lambda **kwargs: 'cache_response_key', content_etag=True)
+            def get(self, request, *args, **kwargs):
+                return Response('Response from method')
+
+        view_instance = TestView()
+        response = view_instance.dispatch(request=factory.get(''))
+        expected_etag = '"{0}"'.format(get_content_hash(b'"Response from method"'))
+        self.assertEqual(response['ETag'], expected_etag)
+        with patch('rest_framework_extensions.cache.decorators.get_content_hash') as get_content_hash_mock:
+            response = view_instance.dispatch(request=factory.get(''))
+        self.assertFalse(get_content_hash_mock.called)
+        self.assertEqual(response['ETag'], expected_etag)
+
+    def test_should_not_add_etag_by_default(self):
+        class TestView(views.APIView):
+            @cache_response(key_func=lambda **kwargs: 'cache_response_key')
+            def get(self, request, *args, **kwargs):
+                return Response('Response from method')
+
+        response = TestView().dispatch(request=factory.get(''))
+        self.assertFalse(response.has_header('ETag'))
+
+
+class CacheResponseInvalidateTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = caches[extensions_api_settings.DEFAULT_USE_CACHE]
+        self.cache.clear()
+        BitTestModel.objects.create(id=1)
+        BitTestModel.objects.create(id=2)
+
+    def test_should_delete_responses_for_kwargs_and_query_params(self):
+        class KeyConstructor(DefaultKeyConstructor):
+            kwargs = bits.KwargsKeyBit()
+            query_params = bits.QueryParamsKeyBit()
+
+        class TestView(views.APIView):
+            @cache_response(key_func=KeyConstructor())
+            def get(self, request, *args, **kwargs):
+                return Response('Response')
+
+        view = TestView.as_view()
+        view(factory.get('/?page=2'), pk='1')
+        view(factory.get('/?page=2'), pk='2')
+        view(factory.get('/?page=3'), pk='1')
+        self.assertEqual(len(self.cache._cache), 3)
+
+        with patch.object(self.cache, 'delete_many', wraps=self.cache.delete_many) as delete_many:
+            keys = invalidate_cache_response(
+                TestView, 'get', kwargs_list=[{'pk': '1'}, {'pk': '2'}], query_params={'page': 2})
+        self.assertEqual(delete_many.call_count, 1)
+        self.assertEqual(len(keys), 2)
+        self.assertEqual(len(self.cache._cache), 1)
+
+    def test_should_delete_viewset_detail_responses(self):
+        class BitTestViewSet(RetrieveCacheResponseMixin, viewsets.ReadOnlyModelViewSet):
+            queryset = BitTestModel.objects.all()
+            serializer_class = BitTestModelSerializer
+
+        view = BitTestViewSet.as_view({'get': 'retrieve'})
+        view(factory.get('/'), pk='1')
+        view(factory.get('/'), pk='2')
+        self.assertEqual(len(self.cache._cache), 2)
+
+        invalidate_cache_response(BitTestViewSet, 'retrieve', kwargs_list=[{'pk': '1'}])
+        self.assertEqual(len(self.cache._cache), 1)
+        invalidate_cache_response(BitTestViewSet, 'retrieve', kwargs_list=[{'pk': '2'}])
+        self.assertEqual(len(self.cache._cache), 0)
+
+    def test_should_delete_vary_index(self):
+        class TestView(views.APIView):
+            @cache_response(key_func=lambda **kwargs: 'cache_response_key', respect_vary=True)
+            def get(self, request, *args, **kwargs):
+                return Response('Response', headers={'Vary': 'Accept-Language'})
+
+        TestView.as_view()(factory.get('/'))
+        keys = invalidate_cache_response(TestView, 'get')
+        self.assertEqual(keys, ['cache_response_key.vary'])
+        self.assertIsNone(self.cache.get('cache_response_key.vary'))
+
+    def test_should_not_serve_stale_variants_after_invalidation(self):
+        data = {'version': 1}
+
+        class TestView(views.APIView):
+            @cache_response(key_func=lambda **kwargs: 'cache_response_key', respect_vary=True)
+            def get(self, request, *args, **kwargs):
+                language = request.META.get('HTTP_ACCEPT_LANGUAGE')
+                return Response('{0} {1}'.format(language, data['version']), headers={'Vary': 'Accept-Language'})
+
+        view = TestView.as_view()
+        view(factory.get('/', HTTP_ACCEPT_LANGUAGE='en'))
+        view(factory.get('/', HTTP_ACCEPT_LANGUAGE='de'))
+        data['version'] = 2
+        invalidate_cache_response(TestView, 'get')
+        self.assertEqual(view(factory.get('/', HTTP_ACCEPT_LANGUAGE='en')).content, b'"en 2"')
+        self.assertEqual(view(factory.get('/', HTTP_ACCEPT_LANGUAGE='de')).content, b'"de 2"')
+
+    @override_settings(ALLOWED_HOSTS=['.example.com', 'api.example.com'])
+    def test_should_build_absolute_urls_with_host_from_allowed_hosts_or_request(self):
+        class AbsoluteUrlKeyBit(bits.KeyBitBase):
+            def get_data(self, request, **kwargs):
+                return request.build_absolute_uri()
+
+        class KeyConstructor(DefaultKeyConstructor):
+            url = AbsoluteUrlKeyBit()
+
+        class TestView(views.APIView):
+            @cache_response(key_func=KeyConstructor())
+            def get(self, request, *args, **kwargs):
+                return Response('Response')
+
+        view = TestView.as_view()
+        view(factory.get('/', HTTP_HOST='api.example.com'))
+        view(factory.get('/', HTTP_HOST='www.example.com', secure=True))
+        self.assertEqual(len(self.cache._cache), 2)
+
+        invalidate_cache_response(TestView, 'get')
+        self.assertEqual(len(self.cache._cache), 1)
+        invalidate_cache_response(TestView, 'get', request=factory.get('/', HTTP_HOST='www.example.com', secure=True))
+        self.assertEqual(len(self.cache._cache), 0)
+
+    def test_should_delete_responses_for_every_language(self):
+        class KeyConstructor(DefaultKeyConstructor):
+            language = bits.LanguageKeyBit()
+
+        class TestView(views.APIView):
+            @cache_response(key_func=KeyConstructor())
+            def get(self, request, *args, **kwargs):
+                return Response('Response')
+
+        view = TestView.as_view()
+        for language in ('en', 'de'):
+            with override(language):
+                view(factory.get('/'))
+        self.assertEqual(len(self.cache._cache), 2)
+
+        with override('en'):
+            invalidate_cache_response(TestView, 'get')
+        self.assertEqual(len(self.cache._cache), 1)
+        invalidate_cache_response(TestView, 'get', languages=['de'])
+        self.assertEqual(len(self.cache._cache), 0)
@@ -8,6 +8,9 @@ from django.test import TestCase
 from django.utils.translation import override
 
 from rest_framework import views
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination, PageNumberPagination
+from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.test import APIRequestFactory
 
@@ -26,10 +29,18 @@ from rest_framework_extensions.key_constructor.bits import (
     RetrieveSqlQueryKeyBit,
     ListModelKeyBit,
     RetrieveModelKeyBit,
+    RetrieveModelFieldsKeyBit,
+    ListPageModelKeyBit,
+    ListModelAggregateKeyBit,
+    CacheTagVersionKeyBit,
+    RetrieveETagStoreKeyBit,
+    ListETagStoreKeyBit,
     ArgsKeyBit,
     KwargsKeyBit,
 )
 
+from rest_framework_extensions.etag.store import etag_store
+
 from .models import BitTestModel
 
 
@@ -562,6 +573,214 @@ class RetrieveModelKeyBitTest(TestCase):
         self.assertEqual(response, None)
 
 
+class ListPageModelKeyBitTest(TestCase):
+    def setUp(self):
+        self.models = [BitTestModel.objects.create(is_active=i % 2 == 0) for i in range(5)]
+        self.kwargs = {
+            'params': ['is_active'],
+            'view_instance': Mock(),
+            'view_method': None,
+            'request': Request(factory.get('')),
+            'args': None,
+            'kwargs': None
+        }
+        self.kwargs['view_instance'].paginator = None
+        self.kwargs['view_instance'].get_queryset = Mock(return_value=BitTestModel.objects.order_by('pk'))
+        self.kwargs['view_instance'].filter_queryset = lambda x: x
+        self.kwargs['view_instance'].filter_backends = []
+
+    def get_expected(self, models, count=None):
+        values = [(model.pk, model.is_active) for model in models]
+        return str(values if count is None else (count, values))
+
+    def get_data(self, paginator, query_params=''):
+        self.kwargs['view_instance'].paginator = paginator
+        self.kwargs['request'] = Request(factory.get('/' + query_params))
+        return ListPageModelKeyBit().get_data(**self.kwargs)
+
+    def test_should_require_params(self):
+        self.kwargs['params'] = None
+        with self.assertRaises(AssertionError):
+            ListPageModelKeyBit().get_data(**self.kwargs)
+
+    def test_without_paginator(self):
+        self.assertEqual(ListPageModelKeyBit().get_data(**self.kwargs), self.get_expected(self.models))
+
+    def test_with_all_fields(self):
+        self.kwargs['params'] = '*'
+        self.assertEqual(ListPageModelKeyBit().get_data(**self.kwargs), self.get_expected(self.models))
+
+    def test_page_number_pagination_with_count_and_page_queries(self):
+        paginator = PageNumberPagination()
+        paginator.page_size = 2
+        with self.assertNumQueries(2):
+            response = self.get_data(paginator, '?page=2')
+        self.assertEqual(response, self.get_expected(self.models[2:4], count=5))
+        self.assertEqual(self.get_data(paginator), self.get_expected(self.models[:2], count=5))
+        self.assertEqual(self.get_data(paginator, '?page=last'), self.get_expected(self.models[4:], count=5))
+
+    def test_page_number_pagination_should_change_with_count(self):
+        paginator = PageNumberPagination()
+        paginator.page_size = 2
+        response = self.get_data(paginator)
+        self.models[-1].delete()
+        self.assertNotEqual(self.get_data(paginator), response)
+
+    def test_page_number_pagination_should_raise_not_found_for_invalid_pages(self):
+        paginator = PageNumberPagination()
+        paginator.page_size = 2
+        for page in ['wrong', '0', '4']:
+            with self.assertRaises(NotFound):
+                self.get_data(paginator, '?page=' + page)
+
+    def test_page_number_pagination_with_empty_first_page(self):
+        BitTestModel.objects.all().delete()
+        paginator = PageNumberPagination()
+        paginator.page_size = 2
+        self.assertEqual(self.get_data(paginator), self.get_expected([], count=0))
+
+    def test_page_number_pagination_without_page_size(self):
+        self.assertEqual(self.get_data(PageNumberPagination()), self.get_expected(self.models))
+
+    def test_limit_offset_pagination_with_count_and_page_queries(self):
+        with self.assertNumQueries(2):
+            response = self.get_data(LimitOffsetPagination(), '?limit=2&offset=1')
+        self.assertEqual(response, self.get_expected(self.models[1:3], count=5))
+
+    def test_cursor_pagination(self):
+        paginator = CursorPagination()
+        paginator.page_size = 3
+        paginator.ordering = 'pk'
+        values = [(model.pk, model.is_active) for model in self.models[:3]]
+        self.assertEqual(self.get_data(paginator), str((None, values)))
+
+
+class RetrieveModelFieldsKeyBitTest(TestCase):
+    def setUp(self):
+        self.kwargs = {
+            'params': ['is_active'],
+            'view_instance': Mock(),
+            'view_method': None,
+            'request': None,
+            'args': None,
+            'kwargs': None
+        }
+        self.kwargs['view_instance'].kwargs = {'id': 123}
+        self.kwargs['view_instance'].lookup_field = 'id'
+        self.kwargs['view_instance'].lookup_url_kwarg = None
+        self.kwargs['view_instance'].get_queryset = Mock(return_value=BitTestModel.objects.all())
+        self.kwargs['view_instance'].filter_queryset = lambda x: x.filter(is_active=True)
+
+    def test_should_return_values_of_fields_with_single_query(self):
+        model = BitTestModel.objects.create(is_active=True)
+        self.kwargs['view_instance'].kwargs = {'id': model.id}
+        self.kwargs['params'] = ['id', 'is_active']
+        with self.assertNumQueries(1):
+            response = RetrieveModelFieldsKeyBit().get_data(**self.kwargs)
+        self.assertEqual(response, [str(model.id), 'True'])
+
+    def test_with_bad_lookup_value(self):
+        self.kwargs['view_instance'].kwargs = {'id': "I'm ganna hack u are!"}
+        self.assertEqual(RetrieveModelFieldsKeyBit().get_data(**self.kwargs), None)
+
+    def test_should_return_none_if_there_is_no_object(self):
+        BitTestModel.objects.create(is_active=False)
+        self.assertEqual(RetrieveModelFieldsKeyBit().get_data(**self.kwargs), None)
+
+
+class ListModelAggregateKeyBitTest(TestCase):
+    def setUp(self):
+        self.kwargs = {
+            'params': ['id'],
+            'view_instance': Mock(),
+            'view_method': None,
+            'request': None,
+            'args': None,
+            'kwargs': None
+        }
+        self.kwargs['view_instance'].get_queryset = Mock(return_value=BitTestModel.objects.all())
+        self.kwargs['view_instance'].filter_queryset = lambda x: x.filter(is_active=True)
+
+    def test_should_return_count_and_max_values_with_single_query(self):
+        BitTestModel.objects.create(is_active=True)
+        model = BitTestModel.objects.create(is_active=True)
+        BitTestModel.objects.create(is_active=False)
+        with self.assertNumQueries(1):
+            response = ListModelAggregateKeyBit().get_data(**self.kwargs)
+        self.assertEqual(response, {'count': '2', 'id': str(model.id)})
+
+    def test_empty_queryset(self):
+        response = ListModelAggregateKeyBit().get_data(**self.kwargs)
+        self.assertEqual(response, {'count': '0', 'id': 'None'})
+
+
+class CacheTagVersionKeyBitTest(TestCase):
+    def setUp(self):
+        self.kwargs = {
+            'params': ['books', 'authors'],
+            'view_instance': None,
+            'view_method': None,
+            'request': None,
+            'args': None,
+            'kwargs': None
+        }
+        self.bit = CacheTagVersionKeyBit()
+        self.bit.cache_key_prefix = 'tests.{0}.'.format(id(self))
+
+    def test_should_return_stable_versions(self):
+        response = self.bit.get_data(**self.kwargs)
+        self.assertEqual(sorted(response.keys()), ['authors', 'books'])
+        self.assertEqual(self.bit.get_data(**self.kwargs), response)
+
+    def test_should_change_only_bumped_version(self):
+        response = self.bit.get_data(**self.kwargs)
+        self.bit.bump_version('books')
+        new_response = self.bit.get_data(**self.kwargs)
+        self.assertNotEqual(new_response['books'], response['books'])
+        self.assertEqual(new_response['authors'], response['authors'])
+
+    def test_should_not_repeat_evicted_version(self):
+        response = self.bit.get_data(**self.kwargs)
+        self.bit.get_cache().delete(self.bit.get_cache_key('books'))
+        self.bit.bump_version('books')
+        self.assertNotEqual(self.bit.get_data(**self.kwargs)['books'], response['books'])
+
+
+class ETagStoreKeyBitTest(TestCase):
+    def setUp(self):
+        self.kwargs = {
+            'params': None,
+            'view_instance': Mock(),
+            'view_method': None,
+            'request': None,
+            'args': None,
+            'kwargs': None
+        }
+        self.kwargs['view_instance'].kwargs = {'pk': 1}
+        self.kwargs['view_instance'].lookup_field = 'pk'
+        self.kwargs['view_instance'].lookup_url_kwarg = None
+        self.kwargs['view_instance'].get_queryset = Mock(return_value=BitTestModel.objects.all())
+
+    def test_should_return_tokens_of_registered_model(self):
+        etag_store.register(BitTestModel)
+        self.addCleanup(etag_store.unregister, BitTestModel)
+        self.assertEqual(
+            RetrieveETagStoreKeyBit().get_data(**self.kwargs),
+            etag_store.get_object_token(BitTestModel, 'pk', 1)
+        )
+        self.assertEqual(ListETagStoreKeyBit().get_data(**self.kwargs), etag_store.get_list_token(BitTestModel))
+
+    def test_should_require_registered_model(self):
+        self.assertRaises(AssertionError, RetrieveETagStoreKeyBit().get_data, **self.kwargs)
+        self.assertRaises(AssertionError, ListETagStoreKeyBit().get_data, **self.kwargs)
+
+    def test_should_require_registered_lookup_field(self):
+        etag_store.register(BitTestModel)
+        self.addCleanup(etag_store.unregister, BitTestModel)
+        self.kwargs['view_instance'].lookup_field = 'is_active'
+        self.assertRaises(AssertionError, RetrieveETagStoreKeyBit().get_data, **self.kwargs)
+
+
 class ArgsKeyBitTest(TestCase):
     def setUp(self):
         self.test_args = ['abc', 'foobar', 'xyz']
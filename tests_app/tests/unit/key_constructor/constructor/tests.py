@@ -8,10 +8,14 @@ except ImportError:
 
 from django.test import TestCase
 
-from rest_framework import viewsets
+from rest_framework import serializers, viewsets
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.request import Request
 
+from rest_framework_extensions.key_constructor.bits import KeyBitBase
 from rest_framework_extensions.key_constructor.constructors import (
     KeyConstructor,
+    DefaultAPIModelListPageKeyConstructor,
 )
 from rest_framework_extensions.utils import get_unique_method_id
 from rest_framework.test import APIRequestFactory
@@ -23,6 +27,8 @@ from tests_app.testutils import (
     TestLanguageKeyBit,
 )
 
+from ..bits.models import BitTestModel
+
 
 factory = APIRequestFactory()
 
@@ -273,3 +279,194 @@ class KeyConstructorTestBehavior__memoization(TestCase):
         self.kwargs['view_instance'] = view_2_instance.retrieve
         response_2 = constructor_instance(**self.kwargs)
         self.assertFalse(response_1 is response_2)
+
+
+class KeyConstructorTestBehavior__version(TestCase):
+    def setUp(self):
+        class MyKeyConstructor(KeyConstructor):
+            format = TestFormatKeyBit()
+            language = TestLanguageKeyBit()
+
+        class CommentSerializer(serializers.Serializer):
+            title = serializers.CharField()
+
+        class View(viewsets.ReadOnlyModelViewSet):
+            serializer_class = CommentSerializer
+
+        self.MyKeyConstructor = MyKeyConstructor
+        self.View = View
+        view_instance = View()
+        self.kwargs = {
+            'view_instance': view_instance,
+            'view_method': view_instance.retrieve,
+            'request': factory.get(''),
+            'args': None,
+            'kwargs': None
+        }
+        self.unversioned_key = MyKeyConstructor()(**self.kwargs)
+
+    def test_should_not_change_key_without_version(self):
+        self.assertEqual(
+            self.unversioned_key,
+            KeyConstructor().prepare_key({'format': u'json', 'language': u'ru'})
+        )
+
+    def test_should_change_key_with_constructor_version(self):
+        key_v1 = self.MyKeyConstructor(version=1)(**self.kwargs)
+        key_v2 = self.MyKeyConstructor(version=2)(**self.kwargs)
+        self.assertNotEqual(key_v1, self.unversioned_key)
+        self.assertNotEqual(key_v1, key_v2)
+        self.assertEqual(key_v1, self.MyKeyConstructor(version=1)(**self.kwargs))
+
+    @override_extensions_api_settings(DEFAULT_KEY_CONSTRUCTOR_VERSION='2024-01')
+    def test_should_use_version_from_settings(self):
+        self.assertEqual(
+            self.MyKeyConstructor()(**self.kwargs),
+            self.MyKeyConstructor(version='2024-01')(**self.kwargs)
+        )
+
+    def test_should_change_key_with_view_version(self):
+        self.kwargs['view_instance'].cache_key_version = 3
+        self.assertNotEqual(self.MyKeyConstructor()(**self.kwargs), self.unversioned_key)
+
+    def test_should_change_key_when_serializer_fields_change(self):
+        constructor_instance = self.MyKeyConstructor(serializer_fingerprint=True)
+        key = constructor_instance(**self.kwargs)
+        self.assertNotEqual(key, self.unversioned_key)
+        self.assertEqual(key, constructor_instance(**self.kwargs))
+
+        class ChangedCommentSerializer(serializers.Serializer):
+            title = serializers.CharField()
+            text = serializers.CharField()
+
+        self.kwargs['view_instance'].serializer_class = ChangedCommentSerializer
+        self.assertNotEqual(constructor_instance(**self.kwargs), key)
+
+    def test_should_build_serializer_fields_with_view_serializer_context(self):
+        class RequestCommentSerializer(serializers.Serializer):
+            title = serializers.CharField()
+
+            def get_fields(self):
+                fields = super().get_fields()
+                if self.context['request'].user.is_staff:
+                    fields['author'] = serializers.CharField()
+                return fields
+
+        view_instance = self.View(serializer_class=RequestCommentSerializer, format_kwarg=None)
+        view_instance.request = Mock(user=Mock(is_staff=False))
+        self.kwargs['view_instance'] = view_instance
+        constructor_instance = self.MyKeyConstructor(serializer_fingerprint=True)
+        self.assertNotEqual(constructor_instance(**self.kwargs), self.unversioned_key)
+
+    def test_should_describe_nested_serializer_fields(self):
+        class UserSerializer(serializers.Serializer):
+            name = serializers.CharField()
+
+        class CommentSerializer(serializers.Serializer):
+            users = UserSerializer(many=True)
+
+        self.assertEqual(
+            KeyConstructor()._describe_serializer_fields(CommentSerializer()),
+            [['users', 'ListSerializer', 'users', False, [['name', 'CharField', 'name', False]]]]
+        )
+
+
+class KeyConstructorTestBehavior__get_key_after_write(TestCase):
+    def setUp(self):
+        self.calls = []
+        calls = self.calls
+
+        class ReusableKeyBit(KeyBitBase):
+            reusable_after_write = True
+
+            def get_data(self, **kwargs):
+                calls.append('reusable')
+                return 'reusable-{0}'.format(len(calls))
+
+        class StateKeyBit(KeyBitBase):
+            def get_data(self, **kwargs):
+                calls.append('state')
+                return 'state-{0}'.format(len(calls))
+
+        class MyKeyConstructor(KeyConstructor):
+            reusable = ReusableKeyBit()
+            state = StateKeyBit()
+
+        self.constructor_instance = MyKeyConstructor()
+        view_instance = viewsets.ReadOnlyModelViewSet()
+        self.kwargs = {
+            'view_instance': view_instance,
+            'view_method': view_instance.retrieve,
+            'request': factory.put(''),
+            'args': None,
+            'kwargs': None
+        }
+
+    def test_should_calculate_only_not_reusable_bits(self):
+        self.constructor_instance(**self.kwargs)
+        self.assertEqual(self.calls, ['reusable', 'state'])
+        key = self.constructor_instance.get_key_after_write(**self.kwargs)
+        self.assertEqual(self.calls, ['reusable', 'state', 'state'])
+        self.assertEqual(key, self.constructor_instance.prepare_key({'reusable': 'reusable-1', 'state': 'state-3'}))
+
+    def test_should_calculate_all_bits_if_there_was_no_key_before_write(self):
+        self.constructor_instance.get_key_after_write(**self.kwargs)
+        self.assertEqual(sorted(self.calls), ['reusable', 'state'])
+
+    def test_should_not_remember_bits_data_for_safe_methods(self):
+        self.kwargs['request'] = factory.get('')
+        self.constructor_instance(**self.kwargs)
+        self.constructor_instance.get_key_after_write(**self.kwargs)
+        self.assertEqual(sorted(self.calls), ['reusable', 'reusable', 'state', 'state'])
+
+    def test_should_replace_memoized_key(self):
+        self.constructor_instance.memoize_for_request = True
+        key_before = self.constructor_instance(**self.kwargs)
+        key_after = self.constructor_instance.get_key_after_write(**self.kwargs)
+        self.assertNotEqual(key_before, key_after)
+        self.assertEqual(self.constructor_instance(**self.kwargs), key_after)
+
+
+class DefaultAPIModelListPageKeyConstructorTest(TestCase):
+    def setUp(self):
+        class Pagination(PageNumberPagination):
+            page_size = 2
+            page_size_query_param = 'page_size'
+
+        class View(viewsets.ReadOnlyModelViewSet):
+            queryset = BitTestModel.objects.order_by('pk')
+            pagination_class = Pagination
+
+        self.models = [BitTestModel.objects.create() for i in range(5)]
+        self.View = View
+        self.constructor_instance = DefaultAPIModelListPageKeyConstructor()
+
+    def get_key(self, query_params=''):
+        view_instance = self.View()
+        return self.constructor_instance(
+            view_instance=view_instance,
+            view_method=view_instance.list,
+            request=Request(factory.get('/' + query_params)),
+            args=None,
+            kwargs=None
+        )
+
+    def test_should_change_key_when_page_object_changes(self):
+        key = self.get_key()
+        self.models[0].is_active = True
+        self.models[0].save()
+        self.assertNotEqual(self.get_key(), key)
+
+    def test_should_not_change_key_when_object_on_other_page_changes(self):
+        key = self.get_key()
+        self.models[3].is_active = True
+        self.models[3].save()
+        self.assertEqual(self.get_key(), key)
+
+    def test_should_change_key_when_count_changes(self):
+        key = self.get_key()
+        self.models[4].delete()
+        self.assertNotEqual(self.get_key(), key)
+
+    def test_should_change_key_with_query_params(self):
+        self.assertNotEqual(self.get_key('?page_size=2'), self.get_key())
@@ -0,0 +1,130 @@
+import datetime
+
+from django.test import TestCase
+from django.utils.http import http_date
+
+from rest_framework import status, views
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+
+from rest_framework_extensions.last_modified.decorators import last_modified
+
+factory = APIRequestFactory()
+LAST_MODIFIED = datetime.datetime(2024, 5, 1, 12, 30, 15, tzinfo=datetime.timezone.utc)
+LAST_MODIFIED_TIMESTAMP = int(LAST_MODIFIED.timestamp())
+
+
+def last_modified_func(**kwargs):
+    return LAST_MODIFIED
+
+
+class LastModifiedProcessorTest(TestCase):
+    def setUp(self):
+        self.calls = []
+        calls = self.calls
+
+        class TestView(views.APIView):
+            @last_modified(last_modified_func)
+            def get(self, request, *args, **kwargs):
+                calls.append(request.method)
+                return Response('Response from method')
+
+            @last_modified(last_modified_func)
+            def put(self, request, *args, **kwargs):
+                calls.append(request.method)
+                return Response('Response from method')
+
+        self.view_instance = TestView()
+
+    def test_should_raise_assertion_error_if_func_not_specified(self):
+        with self.assertRaises(AssertionError):
+            last_modified()
+
+    def test_should_add_last_modified_header(self):
+        response = self.view_instance.get(factory.get(''))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Last-Modified'], http_date(LAST_MODIFIED_TIMESTAMP))
+
+    def test_should_not_add_header_if_func_returned_none(self):
+        class TestView(views.APIView):
+            @last_modified(lambda **kwargs: None)
+            def get(self, request, *args, **kwargs):
+                return Response('Response from method')
+
+        response = TestView().get(factory.get('', HTTP_IF_MODIFIED_SINCE=http_date(LAST_MODIFIED_TIMESTAMP)))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_should_use_method_from_view_if_func_is_string(self):
+        class TestView(views.APIView):
+            def calculate_last_modified(self, **kwargs):
+                return datetime.datetime(2024, 5, 1, 12, 30, 15)
+
+            @last_modified('calculate_last_modified')
+            def get(self, request, *args, **kwargs):
+                return Response('Response from method')
+
+        response = TestView().get(factory.get(''))
+        self.assertEqual(response['Last-Modified'], http_date(LAST_MODIFIED_TIMESTAMP))
+
+    def test_should_return_304_without_view_evaluation_if_not_modified(self):
+        for if_modified_since in (LAST_MODIFIED_TIMESTAMP, LAST_MODIFIED_TIMESTAMP + 60):
+            response = self.view_instance.get(factory.get('', HTTP_IF_MODIFIED_SINCE=http_date(if_modified_since)))
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(response['Last-Modified'], http_date(LAST_MODIFIED_TIMESTAMP))
+        self.assertEqual(self.calls, [])
+
+    def test_should_evaluate_view_if_modified(self):
+        response = self.view_instance.get(
+            factory.get('', HTTP_IF_MODIFIED_SINCE=http_date(LAST_MODIFIED_TIMESTAMP - 1)))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.calls, ['GET'])
+
+    def test_should_ignore_invalid_if_modified_since(self):
+        response = self.view_instance.get(factory.get('', HTTP_IF_MODIFIED_SINCE='yesterday'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_should_ignore_if_modified_since_if_there_is_if_none_match(self):
+        response = self.view_instance.get(factory.get(
+            '',
+            HTTP_IF_MODIFIED_SINCE=http_date(LAST_MODIFIED_TIMESTAMP),
+            HTTP_IF_NONE_MATCH='"123"'
+        ))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_should_ignore_if_modified_since_for_unsafe_methods(self):
+        response = self.view_instance.put(
+            factory.put('', HTTP_IF_MODIFIED_SINCE=http_date(LAST_MODIFIED_TIMESTAMP)))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_should_return_412_if_modified_after_if_unmodified_since(self):
+        with self.assertLogs('django.request', level='WARNING'):
+            response = self.view_instance.put(
+                factory.put('', HTTP_IF_UNMODIFIED_SINCE=http_date(LAST_MODIFIED_TIMESTAMP - 1)))
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(self.calls, [])
+
+    def test_should_evaluate_view_if_unmodified_since(self):
+        response = self.view_instance.put(
+            factory.put('', HTTP_IF_UNMODIFIED_SINCE=http_date(LAST_MODIFIED_TIMESTAMP)))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.calls, ['PUT'])
+
+    def test_should_ignore_if_unmodified_since_if_there_is_if_match(self):
+        response = self.view_instance.put(factory.put(
+            '',
+            HTTP_IF_UNMODIFIED_SINCE=http_date(LAST_MODIFIED_TIMESTAMP - 1),
+            HTTP_IF_MATCH='"123"'
+        ))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_should_rebuild_after_method_evaluation_if_it_asked(self):
+        values = [LAST_MODIFIED, LAST_MODIFIED + datetime.timedelta(minutes=1)]
+
+        class TestView(views.APIView):
+            @last_modified(lambda **kwargs: values.pop(0), rebuild_after_method_evaluation=True)
+            def put(self, request, *args, **kwargs):
+                return Response('Response from method')
+
+        response = TestView().put(factory.put(''))
+        self.assertEqual(response['Last-Modified'], http_date(LAST_MODIFIED_TIMESTAMP + 60))
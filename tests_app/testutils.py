@@ -1,11 +1,12 @@
 import base64
 try:
-    from unittest.mock import patch
+    from unittest.mock import Mock, patch
 except ImportError:
-    from mock import patch
+    from mock import Mock, patch
 
 from rest_framework import HTTP_HEADER_ENCODING
 
+from rest_framework_extensions.bulk_operations.signals import post_bulk_change
 from rest_framework_extensions.key_constructor import bits
 from rest_framework_extensions.key_constructor.constructors import KeyConstructor
 
@@ -24,6 +25,13 @@ def override_extensions_api_settings(**kwargs):
     )
 
 
+def connect_bulk_change_receiver(test_case, model):
+    receiver = Mock()
+    post_bulk_change.connect(receiver, sender=model, weak=False)
+    test_case.addCleanup(post_bulk_change.disconnect, receiver, sender=model)
+    return receiver
+
+
 def basic_auth_header(username, password):
     credentials = ('%s:%s' % (username, password))
     base64_credentials = base64.b64encode(